@@ -1,15 +1,28 @@
 """Authentication helpers for verifying Supabase JWTs."""
 
+import hashlib
+import hmac
 import os
+import secrets
 from typing import Optional
 
 import jwt
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Query, Request, status
 from jwt import InvalidTokenError
 
+from services.cache_backend import CacheBackendError, cache_backend
+
 # Shared secret for Supabase JWTs (service role secret or anon/public JWT secret).
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "dev-secret-key-for-testing-only")
 
+# Bearer token for the operator-only /metrics routes (e.g. the Prometheus scraper).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+_LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+# Lifetime of the single-use tickets that authenticate EventSource streams.
+STREAM_TICKET_SECONDS = 30.0
+
 
 def get_bearer_token(authorization: Optional[str]) -> str:
     """Extract Bearer token from Authorization header."""
@@ -78,4 +91,79 @@ def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
             detail="Invalid token payload",
         )
 
-    return user_id
\ No newline at end of file
+    return user_id
+
+
+def _stream_ticket_key(ticket: str) -> str:
+    return f"wealthwise:stream-ticket:{hashlib.sha256(ticket.encode()).hexdigest()}"
+
+
+def issue_stream_ticket(user_id: str) -> str:
+    """Create a ticket that opens one stream for ``user_id`` within STREAM_TICKET_SECONDS.
+
+    Tickets live in the cache backend, so with CACHE_URL set any worker can
+    redeem them.
+    """
+    ticket = secrets.token_urlsafe(32)
+    try:
+        cache_backend.set(_stream_ticket_key(ticket), user_id.encode(), STREAM_TICKET_SECONDS)
+    except CacheBackendError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Stream tickets are unavailable",
+        ) from exc
+    return ticket
+
+
+def redeem_stream_ticket(ticket: str) -> Optional[str]:
+    """Return the ticket's user id the first time it is redeemed, else None."""
+    key = _stream_ticket_key(ticket)
+    try:
+        user_id = cache_backend.get_many([key])[0]
+        # Claiming the redemption is atomic, so two workers cannot both accept it.
+        if user_id is None or not cache_backend.add(f"{key}:redeemed", b"1", STREAM_TICKET_SECONDS):
+            return None
+        cache_backend.delete([key])
+    except CacheBackendError:
+        return None
+    return user_id.decode()
+
+
+def get_stream_user_id(
+    authorization: Optional[str] = Header(None),
+    ticket: Optional[str] = Query(None),
+) -> str:
+    """Like get_current_user_id, but also accepts ``?ticket=`` from POST /live/ticket.
+
+    Browsers cannot set headers on an EventSource, so streaming endpoints
+    take a short-lived, single-use ticket in the query string instead of
+    the JWT; URLs end up in access logs.
+    """
+    if authorization or not ticket:
+        return get_current_user_id(authorization)
+    user_id = redeem_stream_ticket(ticket)
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired stream ticket",
+        )
+    return user_id
+
+
+def require_metrics_access(request: Request, authorization: Optional[str] = Header(None)) -> None:
+    """Allow /metrics only to operators.
+
+    With METRICS_TOKEN set, the request must carry it as a Bearer token.
+    Without it, only direct loopback requests are served; anything that came
+    through a proxy (X-Forwarded-For) is refused.
+    """
+    if METRICS_TOKEN:
+        token = authorization.split(" ", 1)[1].strip() if authorization and authorization.lower().startswith("bearer ") else ""
+        if hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+            return
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+    client_host = request.client.host if request.client else None
+    if client_host in _LOOPBACK_HOSTS and "x-forwarded-for" not in request.headers:
+        return
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Metrics are only served on localhost")
@@ -0,0 +1 @@
+"""Local benchmarks; run from backend/ with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,210 @@
+"""Rolling-origin backtest of the expense forecasters: accuracy and latency.
+
+    python -m benchmarks.backtest [--users 200] [--months 36] [--save results.json]
+    python -m benchmarks.backtest --compare results.json
+
+Every series is replayed month by month: at each origin the forecasters
+see the history so far and predict the next month, which is then
+revealed. Reports MAPE and MAE per (dataset, model) and the fit+predict
+time per forecast. The datasets are synthetic (trend, seasonal, spiky,
+short histories) or, with ``--csv``, exported monthly totals with
+columns user_id, year, month, amount (rupees).
+
+``--compare`` re-runs against saved results and exits with status 1 if
+any model's MAPE grows by more than ``--mape-tolerance`` points or its
+latency by more than ``--latency-tolerance`` times.
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+from benchmarks.prediction import synthetic_cases
+from services.prediction_service import forecast_expenses, monthly_matrix, predict_next_month_expense
+
+
+# A forecaster takes equal-length histories and returns one next-month value per history.
+Forecaster = Callable[[List[List[float]]], List[float]]
+
+# Latencies below this are timer resolution, not a measurement worth gating on.
+MIN_GATED_US = 1.0
+
+
+def _linear_trend(histories):
+    return [predict_next_month_expense(list(range(1, len(history) + 1)), history) for history in histories]
+
+
+def _holt_winters(histories):
+    # One call per series, as the insights endpoint fits a single user.
+    return [forecast_expenses({0: history})[0]["forecast"][0] for history in histories]
+
+
+def _holt_winters_batch(histories):
+    # All series in one call, as the nightly job fits a chunk of users.
+    forecasts = forecast_expenses(dict(enumerate(histories)))
+    return [forecasts[index]["forecast"][0] for index in range(len(histories))]
+
+
+MODELS: Dict[str, Forecaster] = {
+    "last_month": lambda histories: [history[-1] for history in histories],
+    "linear_trend": _linear_trend,
+    "holt_winters": _holt_winters,
+    "holt_winters_batch": _holt_winters_batch,
+}
+
+
+def synthetic_datasets(users: int, months: int, seed: int = 7) -> Dict[str, List[List[float]]]:
+    """Monthly expense series per dataset; every series in a dataset has the same length."""
+    rng = random.Random(seed)
+    seasonal, spiky = [], []
+    for _ in range(users):
+        base = rng.uniform(15000, 80000)
+        festive = rng.uniform(0.5, 2.0)
+        seasonal.append([
+            round(base * (1 + festive * (month % 12 == 9)) + rng.gauss(0, base * 0.08), 2)
+            for month in range(months)
+        ])
+        spiky.append([
+            round(base + rng.gauss(0, base * 0.1) + (base * rng.uniform(2, 5) if rng.random() < 0.08 else 0), 2)
+            for month in range(months)
+        ])
+    return {
+        "trend": [expenses for _, expenses in synthetic_cases(months, count=users, seed=seed)],
+        "seasonal": seasonal,
+        "spiky": spiky,
+        "short": [expenses for _, expenses in synthetic_cases(9, count=users, seed=seed + 1)],
+    }
+
+
+def csv_datasets(path: str) -> Dict[str, List[List[float]]]:
+    """Exported (user_id, year, month, amount) rows, one dataset per history length."""
+    rows_by_user: Dict[str, list] = {}
+    with open(path, newline="") as handle:
+        for row in csv.DictReader(handle):
+            rows_by_user.setdefault(row["user_id"], []).append(
+                (int(row["year"]), int(row["month"]), "total", float(row["amount"]))
+            )
+    datasets: Dict[str, List[List[float]]] = {}
+    for rows in rows_by_user.values():
+        _, series = monthly_matrix(rows)
+        history = series["total"]
+        datasets.setdefault(f"csv_{len(history)}m", []).append(history)
+    return datasets
+
+
+def backtest(
+    series: Sequence[Sequence[float]],
+    forecaster: Forecaster,
+    min_history: int = 3,
+    repeat: int = 3,
+) -> Dict:
+    """Rolling-origin one-month-ahead errors of ``forecaster`` over equal-length ``series``.
+
+    MAPE skips months whose actual expense is 0. Each origin is timed
+    ``repeat`` times and the fastest run counts, which keeps scheduler noise
+    out of the latency.
+    """
+    absolute_errors: List[float] = []
+    percentage_errors: List[float] = []
+    elapsed = 0.0
+    for origin in range(min_history, len(series[0]) if series else 0):
+        histories = [list(values[:origin]) for values in series]
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            predictions = forecaster(histories)
+            best = min(best, time.perf_counter() - start)
+        elapsed += best
+        for values, predicted in zip(series, predictions):
+            actual = values[origin]
+            absolute_errors.append(abs(predicted - actual))
+            if actual:
+                percentage_errors.append(abs(predicted - actual) / abs(actual))
+    count = len(absolute_errors)
+    return {
+        "forecasts": count,
+        "mape": round(100 * sum(percentage_errors) / len(percentage_errors), 2) if percentage_errors else None,
+        "mae": round(sum(absolute_errors) / count, 2) if count else None,
+        "us_per_forecast": round(elapsed / count * 1e6, 1) if count else None,
+    }
+
+
+def run(
+    datasets: Dict[str, List[List[float]]],
+    models: Dict[str, Forecaster],
+    min_history: int = 3,
+    repeat: int = 3,
+) -> Dict:
+    """``{dataset: {model: backtest result}}``."""
+    results = {}
+    for dataset, series in datasets.items():
+        for forecaster in models.values():
+            forecaster(series[:1])  # warm-up: lazy imports, caches
+        results[dataset] = {
+            name: backtest(series, forecaster, min_history, repeat) for name, forecaster in models.items()
+        }
+    return results
+
+
+def regressions(baseline: Dict, current: Dict, mape_tolerance: float, latency_tolerance: float) -> List[str]:
+    """Human-readable list of models that got less accurate or slower than ``baseline``."""
+    found = []
+    for dataset, models in current.items():
+        for name, result in models.items():
+            before = baseline.get(dataset, {}).get(name)
+            if not before:
+                continue
+            mape_before, mape_now = before["mape"], result["mape"]
+            if mape_before is not None and mape_now is not None and mape_now > mape_before + mape_tolerance:
+                found.append(f"{dataset}/{name}: MAPE {mape_before}% -> {mape_now}%")
+            us_before, us_now = before["us_per_forecast"] or 0.0, result["us_per_forecast"] or 0.0
+            if us_before >= MIN_GATED_US and us_now > us_before * latency_tolerance:
+                found.append(f"{dataset}/{name}: {us_before} -> {us_now} us/forecast")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="synthetic series per dataset")
+    parser.add_argument("--months", type=int, default=36, help="length of the synthetic series")
+    parser.add_argument("--min-history", type=int, default=3, help="months seen before the first forecast")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per origin; the fastest counts")
+    parser.add_argument("--csv", help="replay exported monthly totals instead of synthetic data")
+    parser.add_argument("--model", action="append", choices=sorted(MODELS), help="limit to these models")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--compare", help="fail on regressions against saved JSON results")
+    parser.add_argument("--mape-tolerance", type=float, default=0.5, help="allowed MAPE increase, in points")
+    parser.add_argument("--latency-tolerance", type=float, default=2.0, help="allowed latency ratio")
+    args = parser.parse_args(argv)
+
+    datasets = csv_datasets(args.csv) if args.csv else synthetic_datasets(args.users, args.months, args.seed)
+    models = {name: MODELS[name] for name in args.model or MODELS}
+    results = run(datasets, models, args.min_history, args.repeat)
+
+    print(f"{'dataset':<12} {'model':<20} {'forecasts':>9} {'MAPE %':>8} {'MAE':>10} {'us/forecast':>12}")
+    for dataset, by_model in results.items():
+        for name, result in by_model.items():
+            print(
+                f"{dataset:<12} {name:<20} {result['forecasts']:>9} {result['mape'] or 0:>8.2f}"
+                f" {result['mae'] or 0:>10.2f} {result['us_per_forecast'] or 0:>12.1f}"
+            )
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(results, handle, indent=2)
+    if args.compare:
+        with open(args.compare) as handle:
+            found = regressions(json.load(handle), results, args.mape_tolerance, args.latency_tolerance)
+        for line in found:
+            print(f"regression: {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Closed-form NumPy forecast vs the previous pandas + scikit-learn version.
+
+    python -m benchmarks.prediction [--series 12] [--repeat 2000]
+
+Reports import cost (time and peak RSS, each in a fresh interpreter),
+per-call latency, and the largest difference between the two
+predictions. The legacy side needs ``pip install pandas scikit-learn``;
+without them only the NumPy side is measured.
+"""
+
+import argparse
+import random
+import subprocess
+import sys
+import time
+import warnings
+
+from services.prediction_service import predict_next_month_expense
+
+
+_IMPORT_PROBE = """
+import resource, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+IMPORTS = {
+    "numpy": "import services.prediction_service",
+    "pandas+sklearn": "import pandas\nfrom sklearn.linear_model import LinearRegression",
+}
+
+
+def legacy_predict_next_month_expense(months, expenses):
+    """The implementation this module replaced, kept for comparison only."""
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    if not months or not expenses or len(months) != len(expenses):
+        return 0.0
+    if len(months) < 2:
+        return round(float(expenses[-1]), 2)
+    df = pd.DataFrame({"month": months, "expense": expenses})
+    model = LinearRegression()
+    model.fit(df[["month"]], df["expense"])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)  # "X does not have valid feature names"
+        return round(float(model.predict([[max(months) + 1]])[0]), 2)
+
+
+def import_cost(imports: str):
+    """(seconds, peak RSS in KiB) to import ``imports`` in a fresh interpreter, or None."""
+    probe = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE.format(imports=imports)],
+        capture_output=True,
+        text=True,
+    )
+    if probe.returncode != 0:
+        return None
+    seconds, rss = probe.stdout.split()
+    return float(seconds), int(rss)
+
+
+def time_per_call(predict, cases, repeat: int) -> float:
+    predict(*cases[0])  # warm-up: lazy imports, caches
+    start = time.perf_counter()
+    for index in range(repeat):
+        months, expenses = cases[index % len(cases)]
+        predict(months, expenses)
+    return (time.perf_counter() - start) / repeat
+
+
+def synthetic_cases(n_points: int, count: int = 50, seed: int = 7):
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        base, trend = rng.uniform(10000, 80000), rng.uniform(-500, 1500)
+        expenses = [round(base + trend * month + rng.gauss(0, base * 0.1), 2) for month in range(n_points)]
+        cases.append((list(range(1, n_points + 1)), expenses))
+    return cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=12, help="points per series (months)")
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per timing run")
+    args = parser.parse_args(argv)
+
+    print("import cost (fresh interpreter):")
+    for name, imports in IMPORTS.items():
+        cost = import_cost(imports)
+        if cost is None:
+            print(f"  {name:<15} not installed")
+        else:
+            print(f"  {name:<15} {cost[0] * 1000:8.1f} ms   peak RSS {cost[1] / 1024:7.1f} MiB")
+
+    cases = synthetic_cases(args.series)
+    numpy_call = time_per_call(predict_next_month_expense, cases, args.repeat)
+    print(f"\nper call, {args.series} points:")
+    print(f"  {'numpy':<15} {numpy_call * 1e6:8.1f} us")
+
+    if import_cost(IMPORTS["pandas+sklearn"]) is None:
+        return
+    legacy_call = time_per_call(legacy_predict_next_month_expense, cases, max(args.repeat // 10, 1))
+    print(f"  {'pandas+sklearn':<15} {legacy_call * 1e6:8.1f} us   ({legacy_call / numpy_call:.0f}x)")
+    worst = max(
+        abs(predict_next_month_expense(*case) - legacy_predict_next_month_expense(*case)) for case in cases
+    )
+    print(f"\nlargest prediction difference: {worst:.2f}")
+
+
+if __name__ == "__main__":
+    main()
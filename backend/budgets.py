@@ -7,7 +7,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, field_validator
 
 from auth import get_current_user_id
+from data_versions import data_changed, etag_guard
 from database import get_db_connection
+from services.categories import category_directory
+from services.money import from_minor, to_minor, to_minor_or_none
 
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
@@ -24,10 +27,14 @@ class BudgetCreate(BaseModel):
 	@field_validator("amount")
 	@classmethod
 	def validate_amount(cls, value: float) -> float:
-		if value <= 0:
+		if to_minor(value) <= 0:
 			raise ValueError("Amount must be greater than zero")
 		return value
 
+	@property
+	def amount_minor(self) -> int:
+		return to_minor(self.amount)
+
 	@field_validator("budget_type")
 	@classmethod
 	def validate_type(cls, value: str) -> str:
@@ -64,10 +71,14 @@ class BudgetUpdate(BaseModel):
 	@field_validator("amount")
 	@classmethod
 	def validate_amount(cls, value: Optional[float]) -> Optional[float]:
-		if value is not None and value <= 0:
+		if value is not None and to_minor(value) <= 0:
 			raise ValueError("Amount must be greater than zero")
 		return value
 
+	@property
+	def amount_minor(self) -> Optional[int]:
+		return to_minor_or_none(self.amount)
+
 	@field_validator("budget_type")
 	@classmethod
 	def validate_type(cls, value: Optional[str]) -> Optional[str]:
@@ -106,7 +117,7 @@ def _row_to_budget(row: tuple) -> Dict[str, Any]:
 		"user_id": user_id,
 		"category": category,
 		"budget_type": budget_type,
-		"amount": float(amount),
+		"amount": from_minor(amount),
 		"start_date": start_date.isoformat() if start_date else None,
 		"alert_threshold": alert_threshold,
 		"custom_category_name": custom_category_name,
@@ -116,7 +127,7 @@ def _row_to_budget(row: tuple) -> Dict[str, Any]:
 
 
 def _calculate_spent_for_budget(user_id: str, category: str, budget_type: str, start_date: date) -> float:
-	"""Calculate total spent for a budget by querying transactions."""
+	"""Calculate total spent (in rupees) for a budget by querying transactions."""
 	conn = get_db_connection()
 	try:
 		with conn.cursor() as cur:
@@ -152,11 +163,36 @@ def _calculate_spent_for_budget(user_id: str, category: str, budget_type: str, s
 				)
 			
 			result = cur.fetchone()
-			return float(result[0]) if result else 0.0
+			return from_minor(result[0]) if result else 0.0
 	finally:
 		conn.close()
 
 
+def _spent_by_budget(cur, user_id: str, budget_ids: List[int]) -> Dict[int, int]:
+	"""Spent (in paise) per budget id, like _calculate_spent_for_budget, in one query on ``cur``."""
+	if not budget_ids:
+		return {}
+	cur.execute(
+		"""
+		SELECT b.id, COALESCE(SUM(t.amount), 0)
+		FROM budgets b
+		LEFT JOIN transactions t
+			ON t.user_id = b.user_id
+			AND t.category = CASE WHEN b.category = 'others' THEN b.custom_category_name ELSE b.category END
+			AND t.txn_type = 'expense'
+			AND CASE
+				WHEN b.budget_type = 'Monthly'
+					THEN t.month = EXTRACT(MONTH FROM b.start_date) AND t.year = EXTRACT(YEAR FROM b.start_date)
+				ELSE t.txn_date >= b.start_date AND t.txn_date < b.start_date + 7
+			END
+		WHERE b.user_id = %s AND b.id = ANY(%s)
+		GROUP BY b.id;
+		""",
+		(user_id, list(budget_ids)),
+	)
+	return {budget_id: int(spent) for budget_id, spent in cur.fetchall()}
+
+
 # --- Routes ------------------------------------------------------------------
 
 
@@ -169,16 +205,20 @@ def create_budget(payload: BudgetCreate, user_id: str = Depends(get_current_user
 			cur.execute(
 				"""
 				INSERT INTO budgets (
-					user_id, category, budget_type, amount, start_date, alert_threshold, custom_category_name, created_at, updated_at
+					user_id, category, category_id, budget_type, amount, start_date, alert_threshold, custom_category_name, created_at, updated_at
 				)
-				VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+				VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
 				RETURNING id, user_id, category, budget_type, amount, start_date, alert_threshold, custom_category_name, created_at, updated_at;
 				""",
 				(
 					user_id,
 					payload.category,
+					# 'others' budgets track their custom category
+					category_directory.resolve(
+						cur, payload.custom_category_name if payload.category == "others" else payload.category
+					),
 					payload.budget_type,
-					payload.amount,
+					payload.amount_minor,
 					payload.start_date,
 					payload.alert_threshold,
 					payload.custom_category_name,
@@ -186,6 +226,7 @@ def create_budget(payload: BudgetCreate, user_id: str = Depends(get_current_user
 			)
 			row = cur.fetchone()
 		conn.commit()
+		data_changed(user_id, "budgets")
 		budget = _row_to_budget(row)
 		
 		# Add spent amount
@@ -218,6 +259,7 @@ def list_budgets(
 	month: Optional[int] = None,
 	year: Optional[int] = None,
 	user_id: str = Depends(get_current_user_id),
+	etag: str = Depends(etag_guard("budgets", "transactions")),
 ):
 	"""List all budgets for a user with optional filters."""
 	where_clauses: List[str] = ["user_id = %s"]
@@ -382,7 +424,7 @@ def update_budget(budget_id: int, payload: BudgetUpdate, user_id: str = Depends(
 
 	if payload.amount is not None:
 		set_clauses.append("amount = %s")
-		params.append(payload.amount)
+		params.append(payload.amount_minor)
 	if payload.budget_type is not None:
 		set_clauses.append("budget_type = %s")
 		params.append(payload.budget_type)
@@ -392,20 +434,24 @@ def update_budget(budget_id: int, payload: BudgetUpdate, user_id: str = Depends(
 	if payload.start_date is not None:
 		set_clauses.append("start_date = %s")
 		params.append(payload.start_date)
-	if payload.custom_category_name is not None:
-		set_clauses.append("custom_category_name = %s")
-		params.append(payload.custom_category_name)
 
-	if not set_clauses:
+	if not set_clauses and payload.custom_category_name is None:
 		raise HTTPException(status_code=400, detail="No fields to update")
 
-	set_clauses.append("updated_at = NOW()")
-	set_sql = ", ".join(set_clauses)
-	params.extend([budget_id, user_id])
-
 	conn = get_db_connection()
 	try:
 		with conn.cursor() as cur:
+			if payload.custom_category_name is not None:
+				set_clauses.append("custom_category_name = %s")
+				params.append(payload.custom_category_name)
+				# Only 'others' budgets are keyed by their custom name
+				set_clauses.append("category_id = CASE WHEN category = 'others' THEN %s ELSE category_id END")
+				params.append(category_directory.resolve(cur, payload.custom_category_name))
+
+			set_clauses.append("updated_at = NOW()")
+			set_sql = ", ".join(set_clauses)
+			params.extend([budget_id, user_id])
+
 			cur.execute(
 				f"""
 				UPDATE budgets
@@ -419,6 +465,7 @@ def update_budget(budget_id: int, payload: BudgetUpdate, user_id: str = Depends(
 			if not row:
 				raise HTTPException(status_code=404, detail="Budget not found")
 			conn.commit()
+			data_changed(user_id, "budgets")
 			
 			budget = _row_to_budget(row)
 			
@@ -458,6 +505,7 @@ def delete_budget(budget_id: int, user_id: str = Depends(get_current_user_id)):
 			if not row:
 				raise HTTPException(status_code=404, detail="Budget not found")
 			conn.commit()
+			data_changed(user_id, "budgets")
 			return {"status": "deleted", "id": row[0]}
 	except Exception as exc:
 		conn.rollback()
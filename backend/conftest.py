@@ -0,0 +1,6 @@
+"""Make backend modules (services/, routes/) importable from tests/."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
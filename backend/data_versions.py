@@ -0,0 +1,207 @@
+"""Per-user data version counters and conditional GET support.
+
+Database triggers bump a counter for the domain a write touched
+("transactions", "incomes", "budgets", "goals") inside the same
+transaction and publish the change on the LISTEN/NOTIFY change feed.
+Read endpoints derive a weak ETag from the counters they depend on, so
+a poll carrying a matching ``If-None-Match`` is answered with ``304 Not
+Modified`` after a single primary-key lookup, without running any
+aggregate query.
+
+The triggers live in migrations/SETUP_CHANGE_FEED.sql. If they are missing
+(:func:`check_change_triggers` runs at startup), ``data_changed`` bumps the
+counters itself so API writes still change the ETag.
+"""
+
+import hashlib
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from auth import get_current_user_id
+from database import get_db_connection
+from services.cache_backend import CacheBackendError, cache_backend
+from services.categorizer import category_engine
+from services.change_feed import ChangeEvent, ChangeFeed
+from services.result_cache import ResultCache, report_cache
+
+
+DOMAINS = ("transactions", "incomes", "budgets", "goals")
+
+# Cached copy of the counters so a matching poll does not touch Postgres.
+# data_changed() and the change feed drop it in every worker; the short
+# TTL bounds staleness if an invalidation is lost.
+version_cache = ResultCache(max_entries=10_000, ttl_seconds=30.0, name="versions", backend=cache_backend)
+
+# Created by migrations/SETUP_CHANGE_FEED.sql; one per table and statement type.
+CHANGE_TRIGGERS = tuple(
+    f"trigger_{domain}_changes_{op}" for domain in DOMAINS for op in ("insert", "update", "delete")
+)
+
+# Set by check_change_triggers() when the triggers are missing.
+_bump_on_change = False
+
+# How long the first worker's claim on a change feed event is remembered.
+_CHANGE_CLAIM_SECONDS = 300.0
+
+
+def check_change_triggers() -> List[str]:
+    """Return the change feed triggers missing from the database.
+
+    Without them no write bumps data_versions and conditional GETs would
+    answer 304 on stale data indefinitely, so ``data_changed`` takes over
+    the bump until the migration is run. Writes made outside the API are
+    still not seen. If the database cannot be checked, the triggers are
+    assumed missing.
+    """
+    global _bump_on_change
+    try:
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT tgname FROM pg_trigger WHERE NOT tgisinternal AND tgname = ANY(%s);",
+                    (list(CHANGE_TRIGGERS),),
+                )
+                found = {row[0] for row in cur.fetchall()}
+        finally:
+            conn.close()
+    except Exception:
+        found = set()
+    missing = [name for name in CHANGE_TRIGGERS if name not in found]
+    _bump_on_change = bool(missing)
+    return missing
+
+
+def _bump_data_versions(user_id: str, domains: Iterable[str]) -> None:
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            for domain in domains:
+                cur.execute(
+                    """
+                    INSERT INTO data_versions (user_id, domain, version, updated_at)
+                    VALUES (%s, %s, 1, NOW())
+                    ON CONFLICT (user_id, domain)
+                    DO UPDATE SET version = data_versions.version + 1, updated_at = NOW();
+                    """,
+                    (user_id, domain),
+                )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def data_changed(user_id: str, *domains: str) -> None:
+    """Call after committing a write: drops cached versions and reports.
+
+    The change feed delivers the same invalidation to every worker shortly
+    after; calling this directly keeps the writer's next read consistent.
+    """
+    if _bump_on_change:
+        _bump_data_versions(user_id, domains)
+    version_cache.invalidate(user_id, domains)
+    report_cache.invalidate(user_id, domains)
+
+
+def _claim_change(event: ChangeEvent) -> bool:
+    # True for exactly one worker per event where the backend can tell.
+    if not cache_backend.shared:
+        return False
+    if event.version is None:
+        return True
+    key = f"wealthwise:change:{event.user_id}:{event.domain}:{event.version}"
+    try:
+        return cache_backend.add(key, b"1", _CHANGE_CLAIM_SECONDS)
+    except CacheBackendError:
+        return True
+
+
+def _apply_change(event: ChangeEvent) -> None:
+    # Every worker receives the notification and drops its own copies; only
+    # the worker that claims the event bumps the shared generations.
+    version_cache.invalidate(event.user_id, [event.domain], broadcast=False)
+    report_cache.invalidate(event.user_id, [event.domain], broadcast=False)
+    if _claim_change(event):
+        version_cache.invalidate_shared(event.user_id, [event.domain])
+        report_cache.invalidate_shared(event.user_id, [event.domain])
+    if event.domain == "transactions":
+        category_engine.invalidate_local(event.user_id)
+
+
+def _resync() -> None:
+    # Notifications sent while disconnected are lost; forget everything local.
+    version_cache.clear()
+    report_cache.clear()
+
+
+# Started and stopped by the application lifecycle hooks in main.py.
+change_feed = ChangeFeed(lambda: get_db_connection(pooled=False))
+change_feed.subscribe(_apply_change)
+change_feed.on_resync(_resync)
+
+
+def fetch_data_versions(user_id: str, domains: Iterable[str]) -> Dict[str, int]:
+    """Return {domain: version} for the user; unseen domains are 0."""
+    domains = tuple(domains)
+    return version_cache.get_or_compute(
+        user_id, "versions", {"domains": domains}, domains,
+        lambda: _query_data_versions(user_id, domains),
+    )
+
+
+def _query_data_versions(user_id: str, domains: Iterable[str]) -> Dict[str, int]:
+    domains = list(domains)
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT domain, version FROM data_versions WHERE user_id = %s AND domain = ANY(%s);",
+                (user_id, domains),
+            )
+            found = dict(cur.fetchall())
+    finally:
+        conn.close()
+    return {domain: int(found.get(domain, 0)) for domain in domains}
+
+
+def make_etag(user_id: str, versions: Dict[str, int]) -> str:
+    # Today's date is included because several reports are relative to it.
+    raw = "|".join(
+        [user_id, date.today().isoformat()]
+        + [f"{domain}:{versions[domain]}" for domain in sorted(versions)]
+    )
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip() for tag in header.split(",")}
+    # Weak comparison: W/"x" and "x" are the same validator.
+    return etag in candidates or etag[2:] in candidates
+
+
+def etag_guard(*domains: str):
+    """Dependency factory: 304 when If-None-Match matches, else set ETag.
+
+    Usage: ``etag: str = Depends(etag_guard("transactions"))``.
+    """
+    domains = domains or DOMAINS
+
+    def dependency(
+        request: Request,
+        response: Response,
+        user_id: str = Depends(get_current_user_id),
+    ) -> str:
+        etag = make_etag(user_id, fetch_data_versions(user_id, domains))
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return dependency
@@ -1,18 +1,57 @@
 """Database connection helper for Supabase PostgreSQL."""
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import psycopg2
 from dotenv import load_dotenv
+from psycopg2 import pool as pg_pool
 from psycopg2.extensions import connection as PGConnection
 
 
 # Load environment variables from a .env file if present.
 load_dotenv()
 
+# Maximum pooled connections per worker; 0 disables pooling.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
 
-def get_db_connection() -> PGConnection:
-	"""Create and return a new psycopg2 connection using env variables."""
+_pool: Optional[pg_pool.ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+class PooledConnection(PGConnection):
+	"""Connection whose close() hands it back to the pool instead of closing it.
+
+	Callers keep the usual ``try/finally: conn.close()`` pattern.
+	"""
+
+	pool: Optional[pg_pool.ThreadedConnectionPool] = None
+	_returning = False
+
+	def close(self) -> None:
+		if self.pool is None or self._returning or self.closed:
+			super().close()
+			return
+		self._returning = True
+		try:
+			if not self.autocommit:
+				self.rollback()
+			# Undo per-request session tweaks such as set_session(readonly=True).
+			self.autocommit = False
+			self.isolation_level = None
+			self.readonly = None
+			self.deferrable = None
+			self.pool.putconn(self)
+		except Exception:
+			super().close()
+			self.pool.putconn(self, close=True)
+		finally:
+			self._returning = False
+
+
+def _connection_params() -> dict:
 	conn_params = {
 		"host": os.getenv("DB_HOST"),
 		"database": os.getenv("DB_NAME"),
@@ -24,5 +63,61 @@ def get_db_connection() -> PGConnection:
 	missing = [key for key, value in conn_params.items() if not value]
 	if missing:
 		raise RuntimeError(f"Missing database environment variables: {', '.join(missing)}")
+	return conn_params
+
+
+def _get_pool() -> pg_pool.ThreadedConnectionPool:
+	global _pool
+	with _pool_lock:
+		if _pool is None:
+			_pool = pg_pool.ThreadedConnectionPool(
+				0, DB_POOL_SIZE, connection_factory=PooledConnection, **_connection_params()
+			)
+		return _pool
+
+
+def get_db_connection(pooled: bool = True) -> PGConnection:
+	"""Return a psycopg2 connection using env variables.
+
+	Connections come from a per-worker pool and go back to it on close().
+	When the pool is exhausted, or ``pooled`` is False (for long-lived
+	connections such as LISTEN), a dedicated connection is opened instead.
+	"""
+	if pooled and DB_POOL_SIZE > 0:
+		pool = _get_pool()
+		try:
+			conn = pool.getconn()
+		except pg_pool.PoolError:
+			return psycopg2.connect(**_connection_params())
+		if conn.closed:
+			pool.putconn(conn, close=True)
+			return get_db_connection(pooled)
+		conn.pool = pool
+		return conn
+
+	return psycopg2.connect(**_connection_params())
+
+
+# Runs independent read queries in parallel, each on its own pooled connection.
+_query_executor = ThreadPoolExecutor(max_workers=max(DB_POOL_SIZE, 4), thread_name_prefix="db-query")
+
+
+def _fetch_all(sql: str, params: Sequence) -> List[tuple]:
+	conn = get_db_connection()
+	try:
+		with conn.cursor() as cur:
+			cur.execute(sql, tuple(params))
+			return cur.fetchall()
+	finally:
+		conn.close()
+
+
+def fetch_all_concurrently(queries: Dict[str, Tuple[str, Sequence]]) -> Dict[str, List[tuple]]:
+	"""Run independent ``{name: (sql, params)}`` queries at once; return rows by name.
 
-	return psycopg2.connect(**conn_params)
+	Latency is that of the slowest query instead of the sum. The queries do
+	not share a snapshot, so only use this for reads that need not be
+	mutually consistent.
+	"""
+	futures = {name: _query_executor.submit(_fetch_all, sql, params) for name, (sql, params) in queries.items()}
+	return {name: future.result() for name, future in futures.items()}
@@ -8,7 +8,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, field_validator
 
 from auth import get_current_user_id
+from data_versions import data_changed, etag_guard
 from database import get_db_connection
+from services.money import from_minor, to_minor, to_minor_or_none
 
 
 router = APIRouter(prefix="/goals", tags=["goals"])
@@ -26,7 +28,7 @@ class GoalCreate(BaseModel):
 	@field_validator("target_amount")
 	@classmethod
 	def validate_target_amount(cls, value: float) -> float:
-		if value <= 0:
+		if to_minor(value) <= 0:
 			raise ValueError("Target amount must be positive")
 		return value
 
@@ -37,6 +39,14 @@ class GoalCreate(BaseModel):
 			raise ValueError("Current amount cannot be negative")
 		return value
 
+	@property
+	def target_amount_minor(self) -> int:
+		return to_minor(self.target_amount)
+
+	@property
+	def current_amount_minor(self) -> int:
+		return to_minor(self.current_amount)
+
 
 class GoalUpdate(BaseModel):
 	name: Optional[str] = None
@@ -47,10 +57,14 @@ class GoalUpdate(BaseModel):
 	@field_validator("target_amount")
 	@classmethod
 	def validate_target_amount(cls, value: Optional[float]) -> Optional[float]:
-		if value is not None and value <= 0:
+		if value is not None and to_minor(value) <= 0:
 			raise ValueError("Target amount must be positive")
 		return value
 
+	@property
+	def target_amount_minor(self) -> Optional[int]:
+		return to_minor_or_none(self.target_amount)
+
 
 class AddSavingsRequest(BaseModel):
 	amount: float
@@ -59,10 +73,14 @@ class AddSavingsRequest(BaseModel):
 	@field_validator("amount")
 	@classmethod
 	def validate_amount(cls, value: float) -> float:
-		if value <= 0:
+		if to_minor(value) <= 0:
 			raise ValueError("Savings amount must be positive")
 		return value
 
+	@property
+	def amount_minor(self) -> int:
+		return to_minor(self.amount)
+
 
 class GoalResponse(BaseModel):
 	id: str
@@ -82,65 +100,78 @@ class GoalResponse(BaseModel):
 
 # Helper functions
 def _get_available_balance(user_id: str) -> float:
-	"""Calculate available balance: Income - Expenses - Goals"""
+	"""Available balance in rupees (see _get_available_balance_minor)."""
+	return from_minor(_get_available_balance_minor(user_id))
+
+
+def _get_available_balance_minor(user_id: str) -> int:
+	"""Calculate available balance in paise: Income - Expenses - Goals"""
 	conn = get_db_connection()
 	try:
 		with conn.cursor() as cur:
-			total_income = 0
-			total_expenses = 0
-			total_goals = 0
-			
-			# Get total income for current month
-			cur.execute(
-				"""
-				SELECT COALESCE(SUM(amount), 0)
-				FROM incomes
-				WHERE user_id = %s 
-				AND month = EXTRACT(MONTH FROM CURRENT_DATE)::INTEGER
-				AND year = EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER;
-				""",
-				(user_id,),
-			)
-			income_result = cur.fetchone()
-			total_income = float(income_result[0]) if income_result and income_result[0] else 0
-			
-			# Get total expenses for current month
-			cur.execute(
-				"""
-				SELECT COALESCE(SUM(amount), 0)
-				FROM transactions
-				WHERE user_id = %s AND txn_type = 'expense'
-				AND EXTRACT(YEAR FROM txn_date) = EXTRACT(YEAR FROM CURRENT_DATE)
-				AND EXTRACT(MONTH FROM txn_date) = EXTRACT(MONTH FROM CURRENT_DATE);
-				""",
-				(user_id,),
-			)
-			expense_result = cur.fetchone()
-			total_expenses = float(expense_result[0]) if expense_result and expense_result[0] else 0
-			
-			# Get remaining amount to save for ACTIVE goals only
-			# For each active goal, calculate how much is left to save (target - current)
-			cur.execute(
-				"""
-				SELECT COALESCE(SUM(target_amount - current_amount), 0)
-				FROM goals
-				WHERE user_id = %s AND current_amount < target_amount;
-				""",
-				(user_id,),
-			)
-			goals_result = cur.fetchone()
-			total_goals_remaining = float(goals_result[0]) if goals_result and goals_result[0] else 0
-			
-			# Calculate: Income - Expenses - Remaining Goals to Save
-			available = total_income - total_expenses - total_goals_remaining
-			return max(0, available)  # Return at least 0
+			return _available_balance_minor(cur, user_id)
 	finally:
 		conn.close()
 
 
+def _available_balance_minor(cur, user_id: str) -> int:
+	"""_get_available_balance_minor on an open cursor (and its snapshot)."""
+	total_income = 0
+	total_expenses = 0
+	total_goals = 0
+	
+	# Get total income for current month
+	cur.execute(
+		"""
+		SELECT COALESCE(SUM(amount), 0)
+		FROM incomes
+		WHERE user_id = %s 
+		AND month = EXTRACT(MONTH FROM CURRENT_DATE)::INTEGER
+		AND year = EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER;
+		""",
+		(user_id,),
+	)
+	income_result = cur.fetchone()
+	total_income = int(income_result[0]) if income_result and income_result[0] else 0
+	
+	# Get total expenses for current month
+	cur.execute(
+		"""
+		SELECT COALESCE(SUM(amount), 0)
+		FROM transactions
+		WHERE user_id = %s AND txn_type = 'expense'
+		AND EXTRACT(YEAR FROM txn_date) = EXTRACT(YEAR FROM CURRENT_DATE)
+		AND EXTRACT(MONTH FROM txn_date) = EXTRACT(MONTH FROM CURRENT_DATE);
+		""",
+		(user_id,),
+	)
+	expense_result = cur.fetchone()
+	total_expenses = int(expense_result[0]) if expense_result and expense_result[0] else 0
+	
+	# Get remaining amount to save for ACTIVE goals only
+	# For each active goal, calculate how much is left to save (target - current)
+	cur.execute(
+		"""
+		SELECT COALESCE(SUM(target_amount - current_amount), 0)
+		FROM goals
+		WHERE user_id = %s AND current_amount < target_amount;
+		""",
+		(user_id,),
+	)
+	goals_result = cur.fetchone()
+	total_goals_remaining = int(goals_result[0]) if goals_result and goals_result[0] else 0
+	
+	# Calculate: Income - Expenses - Remaining Goals to Save
+	available = total_income - total_expenses - total_goals_remaining
+	return max(0, available)  # Return at least 0
+
+
 # Endpoints
 @router.get("")
-def get_all_goals(user_id: str = Depends(get_current_user_id)):
+def get_all_goals(
+	user_id: str = Depends(get_current_user_id),
+	etag: str = Depends(etag_guard("goals", "transactions", "incomes")),
+):
 	"""Fetch all goals for the current user."""
 	conn = get_db_connection()
 	try:
@@ -163,8 +194,8 @@ def get_all_goals(user_id: str = Depends(get_current_user_id)):
 					"user_id": row[1],
 					"name": row[2],
 					"category": row[3],
-					"target_amount": float(row[4]),
-					"current_amount": float(row[5]),
+					"target_amount": from_minor(row[4]),
+					"current_amount": from_minor(row[5]),
 					"deadline": row[6],
 					"notes": row[7],
 					"created_at": row[8],
@@ -181,18 +212,18 @@ def create_goal(
 	user_id: str = Depends(get_current_user_id),
 ):
 	"""Create a new goal."""
-	if goal_data.current_amount > goal_data.target_amount:
+	if goal_data.current_amount_minor > goal_data.target_amount_minor:
 		raise HTTPException(
 			status_code=400,
 			detail="Current amount cannot exceed target amount",
 		)
 
 	# Validate available balance
-	available = _get_available_balance(user_id)
-	if goal_data.current_amount > available:
+	available = _get_available_balance_minor(user_id)
+	if goal_data.current_amount_minor > available:
 		raise HTTPException(
 			status_code=400,
-			detail=f"Amount exceeds available balance. Available: ₹{available:.2f}",
+			detail=f"Amount exceeds available balance. Available: ₹{from_minor(available):.2f}",
 		)
 
 	goal_id = str(uuid4())
@@ -210,22 +241,23 @@ def create_goal(
 					user_id,
 					goal_data.name,
 					goal_data.category,
-					goal_data.target_amount,
-					goal_data.current_amount,
+					goal_data.target_amount_minor,
+					goal_data.current_amount_minor,
 					goal_data.deadline,
 					goal_data.notes,
 				),
 			)
 			result = cur.fetchone()
 			conn.commit()
+			data_changed(user_id, "goals")
 
 			return {
 				"id": str(result[0]),
 				"user_id": result[1],
 				"name": result[2],
 				"category": result[3],
-				"target_amount": float(result[4]),
-				"current_amount": float(result[5]),
+				"target_amount": from_minor(result[4]),
+				"current_amount": from_minor(result[5]),
 				"deadline": result[6],
 				"notes": result[7],
 				"created_at": result[8],
@@ -262,8 +294,8 @@ def get_goal(goal_id: str, user_id: str = Depends(get_current_user_id)):
 				"user_id": row[1],
 				"name": row[2],
 				"category": row[3],
-				"target_amount": float(row[4]),
-				"current_amount": float(row[5]),
+				"target_amount": from_minor(row[4]),
+				"current_amount": from_minor(row[5]),
 				"deadline": row[6],
 				"notes": row[7],
 				"created_at": row[8],
@@ -299,7 +331,7 @@ def update_goal(
 				params.append(goal_data.name)
 			if goal_data.target_amount is not None:
 				updates.append("target_amount = %s")
-				params.append(goal_data.target_amount)
+				params.append(goal_data.target_amount_minor)
 			if goal_data.deadline is not None:
 				updates.append("deadline = %s")
 				params.append(goal_data.deadline)
@@ -323,14 +355,15 @@ def update_goal(
 			cur.execute(query, params)
 			result = cur.fetchone()
 			conn.commit()
+			data_changed(user_id, "goals")
 
 			return {
 				"id": str(result[0]),
 				"user_id": result[1],
 				"name": result[2],
 				"category": result[3],
-				"target_amount": float(result[4]),
-				"current_amount": float(result[5]),
+				"target_amount": from_minor(result[4]),
+				"current_amount": from_minor(result[5]),
 				"deadline": result[6],
 				"notes": result[7],
 				"created_at": result[8],
@@ -358,6 +391,7 @@ def delete_goal(goal_id: str, user_id: str = Depends(get_current_user_id)):
 			if cur.rowcount == 0:
 				raise HTTPException(status_code=404, detail="Goal not found")
 			conn.commit()
+			data_changed(user_id, "goals")
 			return {"message": "Goal deleted successfully"}
 	except HTTPException:
 		raise
@@ -388,13 +422,13 @@ def add_savings_to_goal(
 				raise HTTPException(status_code=404, detail="Goal not found")
 
 			current_amount, target_amount = row
-			new_amount = float(current_amount) + savings_data.amount
+			new_amount = current_amount + savings_data.amount_minor
 
-			# Validate it doesn't exceed target
+			# Validate it doesn't exceed target (exact: both sides are paise)
 			if new_amount > target_amount:
 				raise HTTPException(
 					status_code=400,
-					detail=f"Amount would exceed target. Remaining: ₹{target_amount - float(current_amount):.2f}",
+					detail=f"Amount would exceed target. Remaining: ₹{from_minor(target_amount - current_amount):.2f}",
 				)
 
 			# Update goal's current_amount
@@ -409,14 +443,15 @@ def add_savings_to_goal(
 			)
 			result = cur.fetchone()
 			conn.commit()
+			data_changed(user_id, "goals")
 
 			return {
 				"id": str(result[0]),
 				"user_id": result[1],
 				"name": result[2],
 				"category": result[3],
-				"target_amount": float(result[4]),
-				"current_amount": float(result[5]),
+				"target_amount": from_minor(result[4]),
+				"current_amount": from_minor(result[5]),
 				"deadline": result[6],
 				"notes": result[7],
 				"created_at": result[8],
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, field_validator
 
 from auth import get_current_user_id
+from data_versions import data_changed, etag_guard
 from database import get_db_connection
+from services.money import from_minor, to_minor
 
 
 router = APIRouter(prefix="/income", tags=["income"])
@@ -27,6 +29,10 @@ class IncomeCreate(BaseModel):
 			raise ValueError("Income cannot be negative")
 		return value
 
+	@property
+	def amount_minor(self) -> int:
+		return to_minor(self.amount)
+
 
 class IncomeUpdate(BaseModel):
 	amount: float
@@ -42,6 +48,10 @@ class IncomeUpdate(BaseModel):
 			raise ValueError("Income cannot be negative")
 		return value
 
+	@property
+	def amount_minor(self) -> int:
+		return to_minor(self.amount)
+
 
 def _fetch_latest_income(user_id: str) -> Optional[dict]:
 	"""Return latest income record for user or None."""
@@ -63,7 +73,7 @@ def _fetch_latest_income(user_id: str) -> Optional[dict]:
 				return None
 			amount, income_type, source, note, received_date = row
 			return {
-				"amount": float(amount),
+				"amount": from_minor(amount),
 				"income_type": income_type,
 				"source": source,
 				"note": note,
@@ -87,7 +97,7 @@ def _fetch_monthly_total(user_id: str, month: int, year: int) -> float:
 				(user_id, month, year),
 			)
 			row = cur.fetchone()
-			return float(row[0]) if row else 0.0
+			return from_minor(row[0]) if row else 0.0
 	finally:
 		conn.close()
 
@@ -121,7 +131,7 @@ def list_incomes(user_id: str = Depends(get_current_user_id)):
 			{
 				"id": row[0],
 				"user_id": user_id,
-				"amount": float(row[1]),
+				"amount": from_minor(row[1]),
 				"income_type": row[2],
 				"source": row[3],
 				"note": row[4],
@@ -144,6 +154,7 @@ def get_income_total(
 	user_id: str = Depends(get_current_user_id),
 	month: int | None = None,
 	year: int | None = None,
+	etag: str = Depends(etag_guard("incomes")),
 ):
 	"""Return summed income for the specified month/year, or all-time if both are None."""
 	conn = get_db_connection()
@@ -160,7 +171,7 @@ def get_income_total(
 					(user_id,),
 				)
 				row = cur.fetchone()
-				total = float(row[0]) if row else 0.0
+				total = from_minor(row[0]) if row else 0.0
 				return {"user_id": user_id, "total": total}
 			else:
 				# Return monthly total
@@ -171,6 +182,8 @@ def get_income_total(
 				return {"user_id": user_id, "total": total, "month": month, "year": year}
 	except Exception as exc:  # pragma: no cover - runtime guard
 		raise HTTPException(status_code=500, detail=f"Failed to fetch income total: {exc}") from exc
+	finally:
+		conn.close()
 
 
 @router.post("/")
@@ -190,7 +203,7 @@ def create_income(payload: IncomeCreate, user_id: str = Depends(get_current_user
 				""",
 				(
 					user_id,
-					payload.amount,
+					payload.amount_minor,
 					payload.income_type,
 					payload.source,
 					payload.note,
@@ -201,10 +214,11 @@ def create_income(payload: IncomeCreate, user_id: str = Depends(get_current_user
 			)
 			new_id, amount, income_type, source, note, received_date, month, year = cur.fetchone()
 		conn.commit()
+		data_changed(user_id, "incomes")
 		return {
 			"id": new_id,
 			"user_id": user_id,
-			"amount": float(amount),
+			"amount": from_minor(amount),
 			"income_type": income_type,
 			"source": source,
 			"note": note,
@@ -243,7 +257,7 @@ def update_income(income_id: int, payload: IncomeUpdate, user_id: str = Depends(
 				RETURNING id, amount, income_type, source, note, received_date, month, year;
 				""",
 				(
-					payload.amount,
+					payload.amount_minor,
 					payload.income_type,
 					payload.source,
 					payload.note,
@@ -258,10 +272,11 @@ def update_income(income_id: int, payload: IncomeUpdate, user_id: str = Depends(
 			if not row:
 				raise HTTPException(status_code=404, detail="Income not found")
 		conn.commit()
+		data_changed(user_id, "incomes")
 		return {
 			"id": row[0],
 			"user_id": user_id,
-			"amount": float(row[1]),
+			"amount": from_minor(row[1]),
 			"income_type": row[2],
 			"source": row[3],
 			"note": row[4],
@@ -297,6 +312,7 @@ def delete_income(income_id: int, user_id: str = Depends(get_current_user_id)):
 			if not row:
 				raise HTTPException(status_code=404, detail="Income not found")
 		conn.commit()
+		data_changed(user_id, "incomes")
 		return {"success": True, "id": row[0]}
 	except HTTPException:
 		conn.rollback()
@@ -335,7 +351,7 @@ def copy_previous_income(user_id: str = Depends(get_current_user_id)):
 			return {
 				"id": income_id,
 				"user_id": user_id,
-				"amount": float(amount),
+				"amount": from_minor(amount),
 				"income_type": income_type,
 				"source": source,
 				"note": note,
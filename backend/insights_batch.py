@@ -0,0 +1,185 @@
+"""Nightly materialization of AI insight summaries into the ``insights`` table.
+
+    python insights_batch.py [--workers 4] [--chunk-users 500] [--all]
+
+Selects users whose transactions or incomes changed since their stored
+summary (every user with ``--all``), reads their monthly aggregates in
+chunks, computes each chunk's summaries in a process pool with
+services.insights.summarize_by_user and upserts them together with the
+data versions they were computed from. GET /reports/insights/summary
+serves a stored summary while those versions are current and computes on
+demand otherwise, so a run that is skipped or fails only costs latency.
+
+Users without a data_versions row (data written before the change feed
+triggers existed) are not picked up and keep being computed on demand.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Tuple
+
+from database import get_db_connection
+from services.insights import INSIGHT_DOMAINS, summarize_by_user
+
+
+CHUNK_USERS = 500
+
+_STALE_USERS_SQL = """
+    SELECT v.user_id
+    FROM (
+        SELECT
+            user_id,
+            COALESCE(MAX(version) FILTER (WHERE domain = 'transactions'), 0) AS transactions_version,
+            COALESCE(MAX(version) FILTER (WHERE domain = 'incomes'), 0) AS incomes_version
+        FROM data_versions
+        WHERE domain = ANY(%(domains)s)
+        GROUP BY user_id
+    ) v
+    LEFT JOIN insights i ON i.user_id = v.user_id
+    WHERE %(everyone)s
+        OR i.user_id IS NULL
+        OR (i.transactions_version, i.incomes_version) <> (v.transactions_version, v.incomes_version)
+    ORDER BY v.user_id;
+"""
+
+_VERSIONS_SQL = """
+    SELECT user_id, domain, version
+    FROM data_versions
+    WHERE user_id = ANY(%s) AND domain = ANY(%s);
+"""
+
+_EXPENSES_SQL = """
+    SELECT
+        t.user_id,
+        EXTRACT(YEAR FROM t.txn_date)::INTEGER as year,
+        EXTRACT(MONTH FROM t.txn_date)::INTEGER as month,
+        COALESCE(c.name, 'Uncategorized') as category,
+        SUM(t.amount) as total
+    FROM transactions t
+    LEFT JOIN categories c ON c.id = t.category_id
+    WHERE t.user_id = ANY(%s) AND t.txn_type = 'expense'
+    GROUP BY 1, 2, 3, 4;
+"""
+
+_INCOMES_SQL = """
+    SELECT user_id, year, month, SUM(amount) as total
+    FROM incomes
+    WHERE user_id = ANY(%s)
+    GROUP BY 1, 2, 3;
+"""
+
+_UPSERT_SQL = """
+    INSERT INTO insights (user_id, summary, transactions_version, incomes_version, computed_at)
+    VALUES (%s, %s::jsonb, %s, %s, NOW())
+    ON CONFLICT (user_id) DO UPDATE
+    SET summary = EXCLUDED.summary,
+        transactions_version = EXCLUDED.transactions_version,
+        incomes_version = EXCLUDED.incomes_version,
+        computed_at = EXCLUDED.computed_at
+    WHERE insights.transactions_version <= EXCLUDED.transactions_version
+        AND insights.incomes_version <= EXCLUDED.incomes_version;
+"""
+
+# (transactions_version, incomes_version) per user.
+Versions = Dict[str, Tuple[int, int]]
+
+
+def _stale_users(everyone: bool) -> List[str]:
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_STALE_USERS_SQL, {"domains": list(INSIGHT_DOMAINS), "everyone": everyone})
+            return [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def _read_chunk(conn, user_ids: List[str]) -> Tuple[Versions, Dict[str, Tuple[list, list]]]:
+    """Versions and monthly aggregates of ``user_ids``, all from one snapshot."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_VERSIONS_SQL, (user_ids, list(INSIGHT_DOMAINS)))
+            found = {(user_id, domain): int(version) for user_id, domain, version in cur.fetchall()}
+            data = {user_id: ([], []) for user_id in user_ids}
+            cur.execute(_EXPENSES_SQL, (user_ids,))
+            for user_id, year, month, category, total in cur.fetchall():
+                data[user_id][0].append((year, month, category, total))
+            cur.execute(_INCOMES_SQL, (user_ids,))
+            for user_id, year, month, total in cur.fetchall():
+                data[user_id][1].append((year, month, total))
+    finally:
+        conn.rollback()
+    versions = {
+        user_id: (found.get((user_id, "transactions"), 0), found.get((user_id, "incomes"), 0))
+        for user_id in user_ids
+    }
+    return versions, data
+
+
+def _store(conn, summaries: Dict[str, Dict], versions: Versions) -> None:
+    with conn.cursor() as cur:
+        cur.executemany(
+            _UPSERT_SQL,
+            [
+                (user_id, json.dumps(summary), *versions[user_id])
+                for user_id, summary in summaries.items()
+            ],
+        )
+    conn.commit()
+
+
+def run(workers: int, chunk_users: int = CHUNK_USERS, everyone: bool = False) -> int:
+    """Recompute stale summaries; returns the number of users written."""
+    user_ids = _stale_users(everyone)
+    chunks = [user_ids[start:start + chunk_users] for start in range(0, len(user_ids), chunk_users)]
+    written = 0
+
+    # Spawned workers hold no copy of this process's database connections.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        read_conn = get_db_connection(pooled=False)
+        write_conn = get_db_connection(pooled=False)
+        try:
+            # One short snapshot per chunk, so versions always match the data read with them.
+            read_conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+            pending = {}
+
+            def drain(limit):
+                nonlocal written
+                while len(pending) > limit:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        summaries = future.result()
+                        _store(write_conn, summaries, pending.pop(future))
+                        written += len(summaries)
+
+            # Read the next chunk while the pool works on earlier ones; at most
+            # two chunks per worker are held in memory.
+            for chunk in chunks:
+                versions, data = _read_chunk(read_conn, chunk)
+                pending[pool.submit(summarize_by_user, data)] = versions
+                drain(2 * workers)
+            drain(0)
+        finally:
+            read_conn.close()
+            write_conn.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-users", type=int, default=CHUNK_USERS, help="users per chunk")
+    parser.add_argument("--all", action="store_true", help="recompute every user, not only changed ones")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    written = run(args.workers, args.chunk_users, everyone=args.all)
+    print(f"insights: {written} users in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
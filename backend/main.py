@@ -13,6 +13,8 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 
+from auth import get_current_user_id
+from data_versions import change_feed, check_change_triggers
 from database import get_db_connection
 from income import router as income_router
 from transactions import router as transactions_router
@@ -21,10 +23,37 @@ from goals import router as goals_router
 from reports import router as reports_router
 from profile import router as profile_router
 from routes.ai_predictions import router as ai_predictions_router
+from routes.metrics import router as metrics_router
+from routes.live import router as live_router
+from routes.sync import router as sync_router
+from routes.dashboard import router as dashboard_router
+from routes.batch import router as batch_router
+from routes.exports import router as exports_router
+from services.cache_backend import cache_backend
+from services.idempotency import IdempotencyMiddleware
 
 
 app = FastAPI(title="WealthWise Backend")
 
+
+def _idempotency_caller(authorization):
+	"""User id for Idempotency-Key records; None lets the route answer 401."""
+	try:
+		return get_current_user_id(authorization)
+	except HTTPException:
+		return None
+
+
+# Replays retried POSTs that carry an Idempotency-Key. Added before CORS so
+# CORS stays the outermost layer and replayed responses get its headers too.
+# Records go to the shared cache tier when CACHE_URL points at one, so a retry
+# on another worker is recognised as well.
+app.add_middleware(
+	IdempotencyMiddleware,
+	caller_id=_idempotency_caller,
+	backend=cache_backend if cache_backend.shared else None,
+)
+
 # CORS for frontend apps - MUST be added before routes
 app.add_middleware(
 	CORSMiddleware,
@@ -44,6 +73,32 @@ app.include_router(goals_router)
 app.include_router(reports_router)
 app.include_router(profile_router)
 app.include_router(ai_predictions_router)
+app.include_router(metrics_router)
+app.include_router(live_router)
+app.include_router(sync_router)
+app.include_router(dashboard_router)
+app.include_router(batch_router)
+app.include_router(exports_router)
+
+
+@app.on_event("startup")
+def verify_change_triggers():
+	"""Without the change feed triggers, writes would not change any ETag."""
+	missing = check_change_triggers()
+	if missing:
+		print(f">>> WARNING: change feed triggers missing ({', '.join(missing)}); run migrations/SETUP_CHANGE_FEED.sql. Data versions are bumped by the API until then.")
+
+
+@app.on_event("startup")
+def start_change_feed():
+	"""Listen for data changes made by any worker or directly in the database."""
+	if os.getenv("CHANGE_FEED_ENABLED", "1") != "0":
+		change_feed.start()
+
+
+@app.on_event("shutdown")
+def stop_change_feed():
+	change_feed.stop()
 
 
 @app.get("/")
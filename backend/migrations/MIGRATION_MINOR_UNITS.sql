@@ -0,0 +1,44 @@
+-- Migration: Store money as BIGINT minor units (paise)
+-- Every amount column switches from DECIMAL/NUMERIC rupees to an integer
+-- count of paise (1 rupee = 100 paise). The API still sends and receives
+-- rupees; the backend converts at the boundary (services/money.py).
+-- Safe to re-run: columns that are already BIGINT are skipped.
+-- Deploy the matching backend at the same time; older code reads paise as rupees.
+
+DO $$
+DECLARE
+  target RECORD;
+BEGIN
+  FOR target IN
+    SELECT table_name, column_name
+    FROM information_schema.columns
+    WHERE table_schema = 'public'
+      AND data_type = 'numeric'
+      AND (table_name, column_name) IN (
+        ('transactions', 'amount'),
+        ('incomes', 'amount'),
+        ('budgets', 'amount'),
+        ('goals', 'target_amount'),
+        ('goals', 'current_amount')
+      )
+  LOOP
+    EXECUTE format(
+      'ALTER TABLE public.%I ALTER COLUMN %I TYPE BIGINT USING round(%I * 100)::BIGINT',
+      target.table_name, target.column_name, target.column_name
+    );
+  END LOOP;
+END;
+$$;
+
+COMMENT ON COLUMN transactions.amount IS 'Transaction amount in paise (minor units)';
+COMMENT ON COLUMN incomes.amount IS 'Income amount in paise (minor units)';
+COMMENT ON COLUMN budgets.amount IS 'Budget limit in paise (minor units)';
+COMMENT ON COLUMN goals.target_amount IS 'Goal target in paise (minor units)';
+COMMENT ON COLUMN goals.current_amount IS 'Amount saved towards the goal in paise (minor units)';
+
+-- Verify the conversion
+SELECT table_name, column_name, data_type
+FROM information_schema.columns
+WHERE table_schema = 'public'
+  AND column_name IN ('amount', 'target_amount', 'current_amount')
+  AND table_name IN ('transactions', 'incomes', 'budgets', 'goals');
@@ -0,0 +1,108 @@
+-- Categories Dimension Setup for WealthWise
+-- Run this script in Supabase SQL Editor (PostgreSQL 13+)
+-- Free-text categories ("groceries", "Restaurant", "Diwali 2025") are
+-- normalized once, at write time, into a small categories table. Reports
+-- group by the integer category_id instead of normalizing every row.
+-- Re-running the script is safe; the backfill only touches rows whose
+-- category_id is still NULL.
+
+-- 1. Normalized labels. category_label() mirrors
+-- services/categories.normalize_category; keep the alias list in sync
+-- with CATEGORY_MAP.
+CREATE TABLE IF NOT EXISTS categories (
+  id SERIAL PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE,
+  created_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE categories IS 'Normalized category labels; transactions/budgets reference them by category_id';
+
+CREATE OR REPLACE FUNCTION category_label(raw TEXT)
+RETURNS TEXT AS $$
+  SELECT CASE
+    WHEN raw IS NULL OR btrim(raw) = '' THEN 'Uncategorized'
+    WHEN raw ~ '[0-9]' THEN 'Personal'
+    ELSE COALESCE(
+      (SELECT aliases.label FROM (VALUES
+      ('food', 'Food'), ('restaurant', 'Food'), ('groceries', 'Food'), ('transport', 'Transport'),
+      ('travel', 'Transport'), ('taxi', 'Transport'), ('uber', 'Transport'), ('healthcare', 'Healthcare'),
+      ('medical', 'Healthcare'), ('doctor', 'Healthcare'), ('entertainment', 'Entertainment'), ('movie', 'Entertainment'),
+      ('games', 'Entertainment'), ('shopping', 'Shopping'), ('clothes', 'Shopping'), ('fashion', 'Shopping'),
+      ('bills', 'Bills'), ('utilities', 'Bills'), ('electricity', 'Bills'), ('education', 'Education'),
+      ('school', 'Education'), ('course', 'Education'), ('personal', 'Personal'), ('gifts', 'Personal')
+      ) AS aliases(alias, label) WHERE aliases.alias = lower(btrim(raw))),
+      initcap(btrim(raw))
+    )
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+INSERT INTO categories (name)
+VALUES ('Bills'), ('Education'), ('Entertainment'), ('Food'), ('Healthcare'), ('Personal'), ('Shopping'), ('Transport'), ('Uncategorized')
+ON CONFLICT (name) DO NOTHING;
+
+-- 2. Dictionary keys on the fact tables
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS category_id INT REFERENCES categories(id);
+ALTER TABLE budgets ADD COLUMN IF NOT EXISTS category_id INT REFERENCES categories(id);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_category_id ON transactions(user_id, category_id);
+CREATE INDEX IF NOT EXISTS idx_budgets_user_category_id ON budgets(user_id, category_id);
+
+-- 3. Backfill existing rows (new rows are resolved by the API at write time).
+-- Budgets in the 'others' category are keyed by their custom name.
+INSERT INTO categories (name)
+SELECT DISTINCT category_label(category) FROM transactions WHERE category_id IS NULL
+UNION
+SELECT DISTINCT category_label(CASE WHEN category = 'others' THEN custom_category_name ELSE category END)
+FROM budgets WHERE category_id IS NULL
+ON CONFLICT (name) DO NOTHING;
+
+UPDATE transactions AS t
+SET category_id = c.id
+FROM categories AS c
+WHERE t.category_id IS NULL AND c.name = category_label(t.category);
+
+UPDATE budgets AS b
+SET category_id = c.id
+FROM categories AS c
+WHERE b.category_id IS NULL
+  AND c.name = category_label(CASE WHEN b.category = 'others' THEN b.custom_category_name ELSE b.category END);
+
+-- 4. Safety net for writes that bypass the API (SQL editor, imports):
+-- fill category_id when it is missing or the category text changed alone.
+CREATE OR REPLACE FUNCTION fill_category_id()
+RETURNS TRIGGER AS $$
+DECLARE
+  raw TEXT;
+BEGIN
+  IF TG_OP = 'UPDATE' AND NEW.category_id IS DISTINCT FROM OLD.category_id THEN
+    RETURN NEW;
+  END IF;
+  IF TG_OP = 'UPDATE' AND NEW.category IS NOT DISTINCT FROM OLD.category
+     AND (TG_TABLE_NAME <> 'budgets' OR to_jsonb(NEW) -> 'custom_category_name' IS NOT DISTINCT FROM to_jsonb(OLD) -> 'custom_category_name') THEN
+    RETURN NEW;
+  END IF;
+  IF TG_OP = 'INSERT' AND NEW.category_id IS NOT NULL THEN
+    RETURN NEW;
+  END IF;
+
+  raw := NEW.category;
+  IF TG_TABLE_NAME = 'budgets' AND NEW.category = 'others' THEN
+    raw := to_jsonb(NEW) ->> 'custom_category_name';
+  END IF;
+
+  INSERT INTO categories (name) VALUES (category_label(raw))
+  ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+  RETURNING id INTO NEW.category_id;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_transactions_category_id ON transactions;
+CREATE TRIGGER trigger_transactions_category_id
+  BEFORE INSERT OR UPDATE ON transactions
+  FOR EACH ROW EXECUTE FUNCTION fill_category_id();
+
+DROP TRIGGER IF EXISTS trigger_budgets_category_id ON budgets;
+CREATE TRIGGER trigger_budgets_category_id
+  BEFORE INSERT OR UPDATE ON budgets
+  FOR EACH ROW EXECUTE FUNCTION fill_category_id();
@@ -0,0 +1,83 @@
+-- Running Category Statistics Setup for WealthWise
+-- Run this script in Supabase SQL Editor after SETUP_CATEGORIES.sql
+-- One row per (user, category) with the count, mean and M2 (Welford) and an
+-- exponentially weighted average of expense amounts, in paise. The API keeps
+-- the rows current on every transaction write (services/running_stats.py).
+-- Re-running the script rebuilds every row from the transactions table, which
+-- also repairs stats after writes that bypassed the API.
+
+CREATE TABLE IF NOT EXISTS category_stats (
+  user_id TEXT NOT NULL,
+  category_id INT NOT NULL REFERENCES categories(id),
+  count BIGINT NOT NULL DEFAULT 0,
+  mean DOUBLE PRECISION NOT NULL DEFAULT 0,
+  m2 DOUBLE PRECISION NOT NULL DEFAULT 0,
+  ewma DOUBLE PRECISION,
+  updated_at TIMESTAMP DEFAULT NOW(),
+  PRIMARY KEY (user_id, category_id)
+);
+
+COMMENT ON TABLE category_stats IS 'Running expense statistics per user and category; amounts in paise';
+COMMENT ON COLUMN category_stats.m2 IS 'Sum of squared deviations from the mean (Welford); sample variance = m2 / (count - 1)';
+COMMENT ON COLUMN category_stats.ewma IS 'Exponentially weighted average amount, alpha = 0.2 (services/running_stats.EWMA_ALPHA)';
+
+-- Rebuild, in one transaction so readers never see half-rebuilt stats.
+BEGIN;
+
+-- Pairs without expense rows any more (deleted outside the API, or
+-- recategorized) are not touched by the upsert below: reset them to the
+-- empty state (services/running_stats.RunningStats()).
+UPDATE category_stats s
+SET count = 0, mean = 0, m2 = 0, ewma = NULL, updated_at = NOW()
+WHERE NOT EXISTS (
+  SELECT 1
+  FROM transactions t
+  WHERE t.user_id = s.user_id
+    AND t.category_id = s.category_id
+    AND t.txn_type = 'expense'
+)
+AND (s.count <> 0 OR s.mean <> 0 OR s.m2 <> 0 OR s.ewma IS NOT NULL);
+
+-- The EWMA of x1..xn seeded with x1 is
+-- (1 - a)^(n-1) * x1 + sum over i >= 2 of a * (1 - a)^(n-i) * xi;
+-- weights older than 200 amounts are below 1e-19 and are dropped.
+WITH ranked AS (
+  SELECT
+    user_id,
+    category_id,
+    amount,
+    row_number() OVER w - 1 AS age,
+    count(*) OVER (PARTITION BY user_id, category_id) AS n
+  FROM transactions
+  WHERE txn_type = 'expense' AND category_id IS NOT NULL
+  WINDOW w AS (PARTITION BY user_id, category_id ORDER BY txn_date DESC, id DESC)
+)
+INSERT INTO category_stats (user_id, category_id, count, mean, m2, ewma, updated_at)
+SELECT
+  user_id,
+  category_id,
+  count(*),
+  avg(amount),
+  COALESCE(var_pop(amount) * count(*), 0),
+  sum(amount * CASE
+    WHEN age > 200 THEN 0
+    WHEN age = n - 1 THEN power(0.8, age)
+    ELSE 0.2 * power(0.8, age)
+  END),
+  NOW()
+FROM ranked
+GROUP BY user_id, category_id
+ON CONFLICT (user_id, category_id) DO UPDATE
+SET count = EXCLUDED.count,
+    mean = EXCLUDED.mean,
+    m2 = EXCLUDED.m2,
+    ewma = EXCLUDED.ewma,
+    updated_at = EXCLUDED.updated_at;
+
+COMMIT;
+
+-- Verify
+SELECT category_id, count, round(mean) AS mean_paise, round(sqrt(m2 / GREATEST(count - 1, 1))) AS std_dev_paise
+FROM category_stats
+ORDER BY user_id, category_id
+LIMIT 20;
@@ -0,0 +1,78 @@
+-- Change Feed Setup for WealthWise
+-- Run this script in Supabase SQL Editor after SETUP_DATA_VERSIONS.sql
+-- Statement-level triggers on transactions, incomes, budgets and goals bump
+-- the per-user data_versions counters and publish one compact event per
+-- user and statement on the 'wealthwise_changes' channel. Every backend
+-- worker LISTENs on it, so changes made by other workers, migrations or
+-- the Supabase dashboard invalidate caches and reach live clients.
+
+CREATE OR REPLACE FUNCTION publish_data_change()
+RETURNS TRIGGER AS $$
+DECLARE
+  change RECORD;
+  new_version BIGINT;
+BEGIN
+  FOR change IN
+    SELECT user_id, array_agg(id ORDER BY id) AS ids, COUNT(*) AS row_count
+    FROM changed_rows
+    GROUP BY user_id
+  LOOP
+    INSERT INTO data_versions (user_id, domain, version, updated_at)
+    VALUES (change.user_id, TG_ARGV[0], 1, NOW())
+    ON CONFLICT (user_id, domain)
+    DO UPDATE SET version = data_versions.version + 1, updated_at = NOW()
+    RETURNING version INTO new_version;
+
+    -- NOTIFY payloads are capped at 8000 bytes: large batches send ids = null.
+    PERFORM pg_notify(
+      'wealthwise_changes',
+      json_build_object(
+        'user_id', change.user_id,
+        'domain', TG_ARGV[0],
+        'op', lower(TG_OP),
+        'version', new_version,
+        'ids', CASE WHEN change.row_count <= 100 THEN to_json(change.ids) END
+      )::text
+    );
+  END LOOP;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger, hence three per table.
+DO $$
+DECLARE
+  target RECORD;
+BEGIN
+  FOR target IN
+    SELECT * FROM (VALUES
+      ('transactions', 'transactions'),
+      ('incomes', 'incomes'),
+      ('budgets', 'budgets'),
+      ('goals', 'goals')
+    ) AS t(table_name, domain)
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_changes_insert ON %I', target.table_name, target.table_name);
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_changes_update ON %I', target.table_name, target.table_name);
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_changes_delete ON %I', target.table_name, target.table_name);
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_changes_insert AFTER INSERT ON %I
+       REFERENCING NEW TABLE AS changed_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION publish_data_change(%L)',
+      target.table_name, target.table_name, target.domain
+    );
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_changes_update AFTER UPDATE ON %I
+       REFERENCING NEW TABLE AS changed_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION publish_data_change(%L)',
+      target.table_name, target.table_name, target.domain
+    );
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_changes_delete AFTER DELETE ON %I
+       REFERENCING OLD TABLE AS changed_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION publish_data_change(%L)',
+      target.table_name, target.table_name, target.domain
+    );
+  END LOOP;
+END;
+$$;
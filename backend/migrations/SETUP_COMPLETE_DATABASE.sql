@@ -31,7 +31,7 @@ DROP TABLE IF EXISTS public.incomes CASCADE;
 CREATE TABLE public.incomes (
   id SERIAL PRIMARY KEY,
   user_id TEXT NOT NULL,
-  amount DECIMAL(10, 2) NOT NULL CHECK (amount >= 0),
+  amount BIGINT NOT NULL CHECK (amount >= 0), -- paise
   income_type VARCHAR(100) NOT NULL,
   source VARCHAR(255),
   note TEXT,
@@ -55,7 +55,7 @@ DROP TABLE IF EXISTS public.transactions CASCADE;
 CREATE TABLE public.transactions (
   id SERIAL PRIMARY KEY,
   user_id TEXT NOT NULL,
-  amount DECIMAL(10, 2) NOT NULL CHECK (amount > 0),
+  amount BIGINT NOT NULL CHECK (amount > 0), -- paise
   txn_type VARCHAR(20) NOT NULL CHECK (txn_type IN ('income', 'expense')),
   category VARCHAR(100),
   description TEXT,
@@ -85,7 +85,7 @@ CREATE TABLE public.budgets (
   id SERIAL PRIMARY KEY,
   user_id TEXT NOT NULL,
   category VARCHAR(255) NOT NULL,
-  amount DECIMAL(10, 2) NOT NULL CHECK (amount > 0),
+  amount BIGINT NOT NULL CHECK (amount > 0), -- paise
   budget_type VARCHAR(20) DEFAULT 'Monthly' CHECK (budget_type IN ('Monthly', 'Weekly')),
   alert_threshold INT DEFAULT 80 CHECK (alert_threshold >= 0 AND alert_threshold <= 100),
   start_date DATE DEFAULT CURRENT_DATE,
@@ -108,8 +108,8 @@ CREATE TABLE public.goals (
   user_id TEXT NOT NULL,
   name TEXT NOT NULL,
   category TEXT NOT NULL CHECK (category IN ('emergency', 'travel', 'education', 'gadget', 'home', 'other')),
-  target_amount NUMERIC(12, 2) NOT NULL CHECK (target_amount > 0),
-  current_amount NUMERIC(12, 2) NOT NULL DEFAULT 0 CHECK (current_amount >= 0),
+  target_amount BIGINT NOT NULL CHECK (target_amount > 0), -- paise
+  current_amount BIGINT NOT NULL DEFAULT 0 CHECK (current_amount >= 0), -- paise
   deadline DATE NOT NULL,
   notes TEXT,
   created_at TIMESTAMP DEFAULT NOW(),
@@ -121,6 +121,21 @@ CREATE INDEX IF NOT EXISTS idx_goals_deadline ON public.goals(deadline);
 
 COMMENT ON TABLE public.goals IS 'Stores user financial goals';
 
+-- ============================================================================
+-- 6. DATA VERSIONS TABLE
+-- ============================================================================
+DROP TABLE IF EXISTS public.data_versions CASCADE;
+
+CREATE TABLE public.data_versions (
+  user_id TEXT NOT NULL,
+  domain VARCHAR(20) NOT NULL CHECK (domain IN ('transactions', 'incomes', 'budgets', 'goals')),
+  version BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP DEFAULT NOW(),
+  PRIMARY KEY (user_id, domain)
+);
+
+COMMENT ON TABLE public.data_versions IS 'Per-user data version counters used for ETags and cache invalidation';
+
 -- ============================================================================
 -- TRIGGERS FOR AUTO-UPDATING updated_at
 -- ============================================================================
@@ -162,6 +177,289 @@ BEFORE UPDATE ON public.goals
 FOR EACH ROW
 EXECUTE FUNCTION update_updated_at_column();
 
+-- ============================================================================
+-- CHANGE FEED TRIGGERS (data_versions bumps + NOTIFY wealthwise_changes)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION publish_data_change()
+RETURNS TRIGGER AS $$
+DECLARE
+  change RECORD;
+  new_version BIGINT;
+BEGIN
+  FOR change IN
+    SELECT user_id, array_agg(id ORDER BY id) AS ids, COUNT(*) AS row_count
+    FROM changed_rows
+    GROUP BY user_id
+  LOOP
+    INSERT INTO public.data_versions (user_id, domain, version, updated_at)
+    VALUES (change.user_id, TG_ARGV[0], 1, NOW())
+    ON CONFLICT (user_id, domain)
+    DO UPDATE SET version = data_versions.version + 1, updated_at = NOW()
+    RETURNING version INTO new_version;
+
+    -- NOTIFY payloads are capped at 8000 bytes: large batches send ids = null.
+    PERFORM pg_notify(
+      'wealthwise_changes',
+      json_build_object(
+        'user_id', change.user_id,
+        'domain', TG_ARGV[0],
+        'op', lower(TG_OP),
+        'version', new_version,
+        'ids', CASE WHEN change.row_count <= 100 THEN to_json(change.ids) END
+      )::text
+    );
+  END LOOP;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger, hence three per table.
+DO $$
+DECLARE
+  target RECORD;
+BEGIN
+  FOR target IN
+    SELECT * FROM (VALUES
+      ('transactions', 'transactions'),
+      ('incomes', 'incomes'),
+      ('budgets', 'budgets'),
+      ('goals', 'goals')
+    ) AS t(table_name, domain)
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_changes_insert ON public.%I', target.table_name, target.table_name);
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_changes_update ON public.%I', target.table_name, target.table_name);
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_changes_delete ON public.%I', target.table_name, target.table_name);
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_changes_insert AFTER INSERT ON public.%I
+       REFERENCING NEW TABLE AS changed_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION publish_data_change(%L)',
+      target.table_name, target.table_name, target.domain
+    );
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_changes_update AFTER UPDATE ON public.%I
+       REFERENCING NEW TABLE AS changed_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION publish_data_change(%L)',
+      target.table_name, target.table_name, target.domain
+    );
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_changes_delete AFTER DELETE ON public.%I
+       REFERENCING OLD TABLE AS changed_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION publish_data_change(%L)',
+      target.table_name, target.table_name, target.domain
+    );
+  END LOOP;
+END;
+$$;
+
+-- ============================================================================
+-- DELTA SYNC (change_xid markers + deleted_rows tombstones)
+-- ============================================================================
+
+-- 1. Change markers on the synced tables
+CREATE OR REPLACE FUNCTION stamp_change_xid()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.change_xid = pg_current_xact_id();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE public.transactions ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE public.incomes ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE public.budgets ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE public.goals ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_change ON public.transactions(user_id, change_xid);
+CREATE INDEX IF NOT EXISTS idx_incomes_user_change ON public.incomes(user_id, change_xid);
+CREATE INDEX IF NOT EXISTS idx_budgets_user_change ON public.budgets(user_id, change_xid);
+CREATE INDEX IF NOT EXISTS idx_goals_user_change ON public.goals(user_id, change_xid);
+
+-- 2. Tombstones for deleted rows
+CREATE TABLE IF NOT EXISTS public.deleted_rows (
+  user_id TEXT NOT NULL,
+  domain VARCHAR(20) NOT NULL CHECK (domain IN ('transactions', 'incomes', 'budgets', 'goals')),
+  row_id TEXT NOT NULL,
+  change_xid xid8 NOT NULL DEFAULT pg_current_xact_id(),
+  deleted_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_user_change ON public.deleted_rows(user_id, change_xid);
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_deleted_at ON public.deleted_rows(deleted_at);
+
+COMMENT ON TABLE public.deleted_rows IS 'Tombstones for delta sync; purge rows older than 30 days';
+
+CREATE OR REPLACE FUNCTION record_deleted_rows()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO public.deleted_rows (user_id, domain, row_id)
+  SELECT user_id, TG_ARGV[0], id::text FROM changed_rows;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. Triggers
+DO $$
+DECLARE
+  target TEXT;
+BEGIN
+  FOREACH target IN ARRAY ARRAY['transactions', 'incomes', 'budgets', 'goals']
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_change_xid ON public.%I', target, target);
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_change_xid BEFORE INSERT OR UPDATE ON public.%I
+       FOR EACH ROW EXECUTE FUNCTION stamp_change_xid()',
+      target, target
+    );
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_tombstones ON public.%I', target, target);
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_tombstones AFTER DELETE ON public.%I
+       REFERENCING OLD TABLE AS changed_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION record_deleted_rows(%L)',
+      target, target, target
+    );
+  END LOOP;
+END;
+$$;
+
+-- 4. Retention (schedule daily, e.g. with pg_cron). Clients whose token is
+-- older than the retention window get a full snapshot instead of a delta.
+-- DELETE FROM deleted_rows WHERE deleted_at < NOW() - INTERVAL '30 days';
+
+-- ============================================================================
+-- CATEGORIES (normalized labels referenced by transactions/budgets)
+-- ============================================================================
+
+-- 1. Normalized labels. category_label() mirrors
+-- services/categories.normalize_category; keep the alias list in sync
+-- with CATEGORY_MAP.
+CREATE TABLE IF NOT EXISTS public.categories (
+  id SERIAL PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE,
+  created_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE public.categories IS 'Normalized category labels; transactions/budgets reference them by category_id';
+
+CREATE OR REPLACE FUNCTION category_label(raw TEXT)
+RETURNS TEXT AS $$
+  SELECT CASE
+    WHEN raw IS NULL OR btrim(raw) = '' THEN 'Uncategorized'
+    WHEN raw ~ '[0-9]' THEN 'Personal'
+    ELSE COALESCE(
+      (SELECT aliases.label FROM (VALUES
+      ('food', 'Food'), ('restaurant', 'Food'), ('groceries', 'Food'), ('transport', 'Transport'),
+      ('travel', 'Transport'), ('taxi', 'Transport'), ('uber', 'Transport'), ('healthcare', 'Healthcare'),
+      ('medical', 'Healthcare'), ('doctor', 'Healthcare'), ('entertainment', 'Entertainment'), ('movie', 'Entertainment'),
+      ('games', 'Entertainment'), ('shopping', 'Shopping'), ('clothes', 'Shopping'), ('fashion', 'Shopping'),
+      ('bills', 'Bills'), ('utilities', 'Bills'), ('electricity', 'Bills'), ('education', 'Education'),
+      ('school', 'Education'), ('course', 'Education'), ('personal', 'Personal'), ('gifts', 'Personal')
+      ) AS aliases(alias, label) WHERE aliases.alias = lower(btrim(raw))),
+      initcap(btrim(raw))
+    )
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+INSERT INTO public.categories (name)
+VALUES ('Bills'), ('Education'), ('Entertainment'), ('Food'), ('Healthcare'), ('Personal'), ('Shopping'), ('Transport'), ('Uncategorized')
+ON CONFLICT (name) DO NOTHING;
+
+-- 2. Dictionary keys on the fact tables
+ALTER TABLE public.transactions ADD COLUMN IF NOT EXISTS category_id INT REFERENCES public.categories(id);
+ALTER TABLE public.budgets ADD COLUMN IF NOT EXISTS category_id INT REFERENCES public.categories(id);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_category_id ON public.transactions(user_id, category_id);
+CREATE INDEX IF NOT EXISTS idx_budgets_user_category_id ON public.budgets(user_id, category_id);
+
+-- 3. Backfill existing rows (new rows are resolved by the API at write time).
+-- Budgets in the 'others' category are keyed by their custom name.
+INSERT INTO public.categories (name)
+SELECT DISTINCT category_label(category) FROM public.transactions WHERE category_id IS NULL
+UNION
+SELECT DISTINCT category_label(CASE WHEN category = 'others' THEN custom_category_name ELSE category END)
+FROM public.budgets WHERE category_id IS NULL
+ON CONFLICT (name) DO NOTHING;
+
+UPDATE public.transactions AS t
+SET category_id = c.id
+FROM public.categories AS c
+WHERE t.category_id IS NULL AND c.name = category_label(t.category);
+
+UPDATE public.budgets AS b
+SET category_id = c.id
+FROM public.categories AS c
+WHERE b.category_id IS NULL
+  AND c.name = category_label(CASE WHEN b.category = 'others' THEN b.custom_category_name ELSE b.category END);
+
+-- 4. Safety net for writes that bypass the API (SQL editor, imports):
+-- fill category_id when it is missing or the category text changed alone.
+CREATE OR REPLACE FUNCTION fill_category_id()
+RETURNS TRIGGER AS $$
+DECLARE
+  raw TEXT;
+BEGIN
+  IF TG_OP = 'UPDATE' AND NEW.category_id IS DISTINCT FROM OLD.category_id THEN
+    RETURN NEW;
+  END IF;
+  IF TG_OP = 'UPDATE' AND NEW.category IS NOT DISTINCT FROM OLD.category
+     AND (TG_TABLE_NAME <> 'budgets' OR to_jsonb(NEW) -> 'custom_category_name' IS NOT DISTINCT FROM to_jsonb(OLD) -> 'custom_category_name') THEN
+    RETURN NEW;
+  END IF;
+  IF TG_OP = 'INSERT' AND NEW.category_id IS NOT NULL THEN
+    RETURN NEW;
+  END IF;
+
+  raw := NEW.category;
+  IF TG_TABLE_NAME = 'budgets' AND NEW.category = 'others' THEN
+    raw := to_jsonb(NEW) ->> 'custom_category_name';
+  END IF;
+
+  INSERT INTO public.categories (name) VALUES (category_label(raw))
+  ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+  RETURNING id INTO NEW.category_id;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_transactions_category_id ON public.transactions;
+CREATE TRIGGER trigger_transactions_category_id
+  BEFORE INSERT OR UPDATE ON public.transactions
+  FOR EACH ROW EXECUTE FUNCTION fill_category_id();
+
+DROP TRIGGER IF EXISTS trigger_budgets_category_id ON public.budgets;
+CREATE TRIGGER trigger_budgets_category_id
+  BEFORE INSERT OR UPDATE ON public.budgets
+  FOR EACH ROW EXECUTE FUNCTION fill_category_id();
+
+-- ============================================================================
+-- CATEGORY STATS (running per-category expense statistics, in paise)
+-- ============================================================================
+-- Kept current by the API on every transaction write; re-run
+-- migrations/SETUP_CATEGORY_STATS.sql to rebuild from transactions.
+
+CREATE TABLE IF NOT EXISTS public.category_stats (
+  user_id TEXT NOT NULL,
+  category_id INT NOT NULL REFERENCES public.categories(id),
+  count BIGINT NOT NULL DEFAULT 0,
+  mean DOUBLE PRECISION NOT NULL DEFAULT 0,
+  m2 DOUBLE PRECISION NOT NULL DEFAULT 0,  -- Welford: sample variance = m2 / (count - 1)
+  ewma DOUBLE PRECISION,  -- alpha = 0.2
+  updated_at TIMESTAMP DEFAULT NOW(),
+  PRIMARY KEY (user_id, category_id)
+);
+
+-- ============================================================================
+-- INSIGHTS (nightly AI insight summaries, see backend/insights_batch.py)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS public.insights (
+  user_id TEXT PRIMARY KEY,
+  summary JSONB NOT NULL,
+  transactions_version BIGINT NOT NULL,  -- data_versions the summary was computed from
+  incomes_version BIGINT NOT NULL,
+  computed_at TIMESTAMP DEFAULT NOW()
+);
+
 -- ============================================================================
 -- SAMPLE DATA (Optional - Uncomment to insert test data)
 -- ============================================================================
@@ -170,22 +468,22 @@ EXECUTE FUNCTION update_updated_at_column();
 -- VALUES ('test_user_123', 'Demo User', 'demo@wealthwise.com');
 
 -- INSERT INTO public.incomes (user_id, amount, income_type, source, received_date, month, year)
--- VALUES ('test_user_123', 50000, 'Salary', 'Tech Corp', '2026-02-01', 2, 2026);
+-- VALUES ('test_user_123', 5000000, 'Salary', 'Tech Corp', '2026-02-01', 2, 2026);
 
 -- INSERT INTO public.transactions (user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year)
 -- VALUES 
---   ('test_user_123', 5000, 'expense', 'groceries', 'Weekly groceries', 'Credit Card', '2026-02-10', 2, 2026),
---   ('test_user_123', 2000, 'expense', 'transportation', 'Fuel', 'Cash', '2026-02-08', 2, 2026);
+--   ('test_user_123', 500000, 'expense', 'groceries', 'Weekly groceries', 'Credit Card', '2026-02-10', 2, 2026),
+--   ('test_user_123', 200000, 'expense', 'transportation', 'Fuel', 'Cash', '2026-02-08', 2, 2026);
 
 -- INSERT INTO public.budgets (user_id, category, amount, budget_type, alert_threshold, start_date)
 -- VALUES 
---   ('test_user_123', 'groceries', 15000, 'Monthly', 80, '2026-02-01'),
---   ('test_user_123', 'entertainment', 5000, 'Monthly', 75, '2026-02-01');
+--   ('test_user_123', 'groceries', 1500000, 'Monthly', 80, '2026-02-01'),
+--   ('test_user_123', 'entertainment', 500000, 'Monthly', 75, '2026-02-01');
 
 -- INSERT INTO public.goals (user_id, name, category, target_amount, current_amount, deadline, notes)
 -- VALUES 
---   ('test_user_123', 'Emergency Fund', 'emergency', 50000, 30000, '2026-06-15', 'Build 6 months emergency fund'),
---   ('test_user_123', 'Europe Vacation', 'travel', 100000, 40000, '2026-04-01', 'Summer trip');
+--   ('test_user_123', 'Emergency Fund', 'emergency', 5000000, 3000000, '2026-06-15', 'Build 6 months emergency fund'),
+--   ('test_user_123', 'Europe Vacation', 'travel', 10000000, 4000000, '2026-04-01', 'Summer trip');
 
 -- ============================================================================
 -- VERIFICATION QUERIES
@@ -198,3 +496,5 @@ EXECUTE FUNCTION update_updated_at_column();
 -- SELECT * FROM public.transactions;
 -- SELECT * FROM public.budgets;
 -- SELECT * FROM public.goals;
+-- SELECT * FROM public.data_versions;
+-- SELECT * FROM public.deleted_rows;
@@ -0,0 +1,15 @@
+-- Data Versions Table Setup for WealthWise
+-- Run this script in Supabase SQL Editor
+-- Per-user, per-domain counters bumped on every write (see SETUP_CHANGE_FEED.sql).
+-- Read endpoints build ETags from them and answer 304 Not Modified
+-- without re-running their queries.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+  user_id TEXT NOT NULL,
+  domain VARCHAR(20) NOT NULL CHECK (domain IN ('transactions', 'incomes', 'budgets', 'goals')),
+  version BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP DEFAULT NOW(),
+  PRIMARY KEY (user_id, domain)
+);
+
+COMMENT ON TABLE data_versions IS 'Per-user data version counters used for ETags and cache invalidation';
@@ -0,0 +1,76 @@
+-- Delta Sync Setup for WealthWise
+-- Run this script in Supabase SQL Editor (PostgreSQL 13+)
+-- Every row of transactions, incomes, budgets and goals records the id of
+-- the transaction that last wrote it (change_xid). Deletes leave a
+-- tombstone in deleted_rows. GET /sync returns the rows whose change_xid
+-- is at or after the client's token, plus the tombstones since then.
+
+-- 1. Change markers on the synced tables
+CREATE OR REPLACE FUNCTION stamp_change_xid()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.change_xid = pg_current_xact_id();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE incomes ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE budgets ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE goals ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_change ON transactions(user_id, change_xid);
+CREATE INDEX IF NOT EXISTS idx_incomes_user_change ON incomes(user_id, change_xid);
+CREATE INDEX IF NOT EXISTS idx_budgets_user_change ON budgets(user_id, change_xid);
+CREATE INDEX IF NOT EXISTS idx_goals_user_change ON goals(user_id, change_xid);
+
+-- 2. Tombstones for deleted rows
+CREATE TABLE IF NOT EXISTS deleted_rows (
+  user_id TEXT NOT NULL,
+  domain VARCHAR(20) NOT NULL CHECK (domain IN ('transactions', 'incomes', 'budgets', 'goals')),
+  row_id TEXT NOT NULL,
+  change_xid xid8 NOT NULL DEFAULT pg_current_xact_id(),
+  deleted_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_user_change ON deleted_rows(user_id, change_xid);
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_deleted_at ON deleted_rows(deleted_at);
+
+COMMENT ON TABLE deleted_rows IS 'Tombstones for delta sync; purge rows older than 30 days';
+
+CREATE OR REPLACE FUNCTION record_deleted_rows()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO deleted_rows (user_id, domain, row_id)
+  SELECT user_id, TG_ARGV[0], id::text FROM changed_rows;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. Triggers
+DO $$
+DECLARE
+  target TEXT;
+BEGIN
+  FOREACH target IN ARRAY ARRAY['transactions', 'incomes', 'budgets', 'goals']
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_change_xid ON %I', target, target);
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_change_xid BEFORE INSERT OR UPDATE ON %I
+       FOR EACH ROW EXECUTE FUNCTION stamp_change_xid()',
+      target, target
+    );
+    EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_tombstones ON %I', target, target);
+    EXECUTE format(
+      'CREATE TRIGGER trigger_%s_tombstones AFTER DELETE ON %I
+       REFERENCING OLD TABLE AS changed_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION record_deleted_rows(%L)',
+      target, target, target
+    );
+  END LOOP;
+END;
+$$;
+
+-- 4. Retention (schedule daily, e.g. with pg_cron). Clients whose token is
+-- older than the retention window get a full snapshot instead of a delta.
+-- DELETE FROM deleted_rows WHERE deleted_at < NOW() - INTERVAL '30 days';
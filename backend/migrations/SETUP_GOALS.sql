@@ -7,8 +7,8 @@ CREATE TABLE IF NOT EXISTS goals (
   user_id TEXT NOT NULL,
   name TEXT NOT NULL,
   category TEXT NOT NULL CHECK (category IN ('emergency', 'travel', 'education', 'gadget', 'home', 'other')),
-  target_amount NUMERIC(12, 2) NOT NULL CHECK (target_amount > 0),
-  current_amount NUMERIC(12, 2) NOT NULL DEFAULT 0 CHECK (current_amount >= 0),
+  target_amount BIGINT NOT NULL CHECK (target_amount > 0),  -- paise
+  current_amount BIGINT NOT NULL DEFAULT 0 CHECK (current_amount >= 0),  -- paise
   deadline DATE NOT NULL,
   notes TEXT,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
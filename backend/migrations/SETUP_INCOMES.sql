@@ -4,7 +4,7 @@
 CREATE TABLE IF NOT EXISTS incomes (
     id SERIAL PRIMARY KEY,
     user_id TEXT NOT NULL REFERENCES user_profiles(user_id) ON DELETE CASCADE,
-    amount DECIMAL(12, 2) NOT NULL CHECK (amount > 0),
+    amount BIGINT NOT NULL CHECK (amount > 0),  -- paise
     income_type VARCHAR(100),
     source VARCHAR(255),
     note TEXT,
@@ -0,0 +1,16 @@
+-- Materialized Insights Table Setup for WealthWise
+-- Run this script in Supabase SQL Editor after SETUP_DATA_VERSIONS.sql
+-- One row per user holding the GET /reports/insights/summary payload, written
+-- by the nightly job (backend/insights_batch.py). The versions are the user's
+-- data_versions counters the summary was computed from; the API serves the
+-- row only while they are still current.
+
+CREATE TABLE IF NOT EXISTS insights (
+  user_id TEXT PRIMARY KEY,
+  summary JSONB NOT NULL,
+  transactions_version BIGINT NOT NULL,
+  incomes_version BIGINT NOT NULL,
+  computed_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE insights IS 'Precomputed AI insight summaries, valid while the recorded data versions are current';
@@ -4,7 +4,7 @@
 CREATE TABLE IF NOT EXISTS transactions (
     id SERIAL PRIMARY KEY,
     user_id TEXT NOT NULL REFERENCES user_profiles(user_id) ON DELETE CASCADE,
-    amount DECIMAL(12, 2) NOT NULL CHECK (amount > 0),
+    amount BIGINT NOT NULL CHECK (amount > 0),  -- paise
     txn_type VARCHAR(20) NOT NULL CHECK (txn_type IN ('income', 'expense')),
     category VARCHAR(100),
     description TEXT,
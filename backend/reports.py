@@ -1,19 +1,39 @@
 """Reports & Analytics feature routes for WealthWise backend."""
 
+import uuid
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional
 from decimal import Decimal
-from collections import defaultdict
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from auth import get_current_user_id
-from database import get_db_connection
+from data_versions import etag_guard
+from database import fetch_all_concurrently, get_db_connection
+from services.anomalies import detect_anomalies
+from services.exports import (
+    COLUMNAR_MEDIA_TYPES,
+    EXPORT_SPECS,
+    ColumnarUnavailable,
+    arrow_schema,
+    iter_columnar,
+    iter_csv,
+)
+from services.money import from_minor
+from services.recurring import detect_recurring
+from services.result_cache import cached_report
+from services.running_stats import RunningStats
 
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+# Rows fetched per round trip by the streaming exports.
+EXPORT_CHUNK_ROWS = 2000
+# Rows per Parquet row group / Arrow record batch.
+EXPORT_ROW_GROUP_ROWS = 50000
+
 
 # ======================== Response Models ========================
 
@@ -123,7 +143,7 @@ def _get_top_transactions(user_id: str, limit: int = 10, txn_type: str = "expens
             return [
                 {
                     "id": row[0],
-                    "amount": float(row[1]),
+                    "amount": from_minor(row[1]),
                     "category": row[2],
                     "description": row[3],
                     "date": str(row[4]),
@@ -135,92 +155,63 @@ def _get_top_transactions(user_id: str, limit: int = 10, txn_type: str = "expens
         conn.close()
 
 
-def _detect_recurring_expenses(user_id: str, min_occurrences: int = 2) -> List[Dict]:
-    """Detect recurring expenses based on description patterns."""
+_RECURRING_CANDIDATES_SQL = """
+    SELECT description, category, amount, txn_date
+    FROM transactions
+    WHERE user_id = %s AND txn_type = 'expense' AND description IS NOT NULL
+    ORDER BY txn_date;
+"""
+
+
+def _detect_recurring_expenses(user_id: str) -> List[Dict]:
+    """Detect recurring expenses: fuzzy merchant match, amount clusters and cadence."""
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            # Get all expenses with description
-            cur.execute(
-                """
-                SELECT description, category, amount, COUNT(*) as count
-                FROM transactions
-                WHERE user_id = %s AND txn_type = 'expense' AND description IS NOT NULL
-                GROUP BY description, category, amount
-                HAVING COUNT(*) >= %s
-                ORDER BY COUNT(*) DESC;
-                """,
-                (user_id, min_occurrences),
-            )
+            cur.execute(_RECURRING_CANDIDATES_SQL, (user_id,))
             rows = cur.fetchall()
-            return [
-                {
-                    "description": row[0],
-                    "category": row[1],
-                    "average_amount": float(row[2]),
-                    "frequency": row[3],
-                }
-                for row in rows
-            ]
     finally:
         conn.close()
+    return detect_recurring(rows)
+
+
+_ANOMALY_CANDIDATES_SQL = """
+    SELECT t.id, COALESCE(c.name, 'Uncategorized'), t.amount, t.txn_date
+    FROM transactions t
+    LEFT JOIN categories c ON c.id = t.category_id
+    WHERE t.user_id = %s AND t.txn_type = 'expense';
+"""
+
 
+def _with_month_labels(found: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Add the 'Jan 2026' label and 'average' key the category-month list has always had."""
+    for item in found["category_months"]:
+        year, month = (int(part) for part in item["period"].split("-"))
+        item["month"] = _format_month_year(year, month)
+        item["average"] = item["baseline"]
+    return found
 
-def _detect_spending_anomalies(user_id: str) -> List[Dict]:
-    """Detect unusual spending patterns (high/low spikes)."""
+
+def _detect_spending_anomalies(user_id: str) -> Dict[str, List[Dict]]:
+    """Detect unusual transactions and category-months (robust per-category baselines)."""
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            # Get monthly spending totals
-            cur.execute(
-                """
-                SELECT 
-                    EXTRACT(YEAR FROM txn_date)::INTEGER as year,
-                    EXTRACT(MONTH FROM txn_date)::INTEGER as month,
-                    SUM(amount) as total
-                FROM transactions
-                WHERE user_id = %s AND txn_type = 'expense'
-                GROUP BY EXTRACT(YEAR FROM txn_date), EXTRACT(MONTH FROM txn_date)
-                ORDER BY EXTRACT(YEAR FROM txn_date), EXTRACT(MONTH FROM txn_date);
-                """,
-                (user_id,),
-            )
+            cur.execute(_ANOMALY_CANDIDATES_SQL, (user_id,))
             rows = cur.fetchall()
-            
-            if len(rows) < 2:
-                return []
-            
-            # Calculate average and standard deviation
-            amounts = [float(row[2]) for row in rows]
-            avg = sum(amounts) / len(amounts)
-            variance = sum((x - avg) ** 2 for x in amounts) / len(amounts)
-            std_dev = variance ** 0.5
-            
-            # Flag anomalies (> 1.5 standard deviations)
-            anomalies = []
-            for i, row in enumerate(rows):
-                amount = float(row[2])
-                if abs(amount - avg) > 1.5 * std_dev:
-                    anomaly_type = "High Spending" if amount > avg else "Low Spending"
-                    anomalies.append({
-                        "month": _format_month_year(row[0], row[1]),
-                        "amount": amount,
-                        "average": avg,
-                        "type": anomaly_type,
-                        "deviation_percentage": round(((amount - avg) / avg * 100), 2),
-                    })
-            
-            return anomalies
     finally:
         conn.close()
+    return _with_month_labels(detect_anomalies(rows))
 
 
 # ======================== L1: Core Analytics Endpoints ========================
 
 @router.get("/trends/income-vs-expense")
+@cached_report("transactions", "incomes")
 def get_income_vs_expense_trends(
     months: int = Query(12, ge=1, le=60),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions", "incomes")),
 ):
     """
     LEVEL 1: Get income vs expense trends for last N months (line chart data).
@@ -241,7 +232,7 @@ def get_income_vs_expense_trends(
                     """,
                     (user_id, month, year),
                 )
-                income = float(cur.fetchone()[0])
+                income = int(cur.fetchone()[0])
                 
                 # Get expenses for month
                 cur.execute(
@@ -254,13 +245,13 @@ def get_income_vs_expense_trends(
                     """,
                     (user_id, month, year),
                 )
-                expense = float(cur.fetchone()[0])
+                expense = int(cur.fetchone()[0])
                 
                 trends.append({
                     "month": _format_month_year(year, month),
-                    "income": income,
-                    "expense": expense,
-                    "net_savings": income - expense,
+                    "income": from_minor(income),
+                    "expense": from_minor(expense),
+                    "net_savings": from_minor(income - expense),
                 })
         
         return trends
@@ -269,10 +260,12 @@ def get_income_vs_expense_trends(
 
 
 @router.get("/breakdown/category-spending")
+@cached_report("transactions")
 def get_category_spending_breakdown(
     year: int = Query(None, description="Filter by year"),
     month: int = Query(None, description="Filter by month (1-12)"),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions")),
 ):
     """
     LEVEL 1: Get detailed category-wise spending breakdown.
@@ -309,29 +302,31 @@ def get_category_spending_breakdown(
             rows = cur.fetchall()
             
             # Calculate total for percentages
-            total = sum(float(row[1]) for row in rows)
+            total = sum(int(row[1]) for row in rows)
             
             breakdown = [
                 {
                     "category": row[0],
-                    "total_amount": float(row[1]),
-                    "percentage": round((float(row[1]) / total * 100), 2) if total > 0 else 0,
+                    "total_amount": from_minor(row[1]),
+                    "percentage": round((int(row[1]) / total * 100), 2) if total > 0 else 0,
                     "transaction_count": row[2],
-                    "average_transaction": round(float(row[3]), 2),
+                    "average_transaction": round(from_minor(row[3]), 2),
                 }
                 for row in rows
             ]
             
-            return {"breakdown": breakdown, "total_spent": total}
+            return {"breakdown": breakdown, "total_spent": from_minor(total)}
     finally:
         conn.close()
 
 
 @router.get("/breakdown/payment-mode")
+@cached_report("transactions")
 def get_payment_mode_breakdown(
     year: int = Query(None),
     month: int = Query(None),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions")),
 ):
     """
     LEVEL 1: Get payment mode distribution (Cash/Card/UPI/Bank Transfer).
@@ -364,13 +359,13 @@ def get_payment_mode_breakdown(
             )
             
             rows = cur.fetchall()
-            total = sum(float(row[1]) for row in rows)
+            total = sum(int(row[1]) for row in rows)
             
             breakdown = [
                 {
                     "mode": row[0] or "Not Specified",
-                    "amount": float(row[1]),
-                    "percentage": round((float(row[1]) / total * 100), 2) if total > 0 else 0,
+                    "amount": from_minor(row[1]),
+                    "percentage": round((int(row[1]) / total * 100), 2) if total > 0 else 0,
                     "transaction_count": row[2],
                 }
                 for row in rows
@@ -382,7 +377,11 @@ def get_payment_mode_breakdown(
 
 
 @router.get("/goals/progress")
-def get_goals_progress(user_id: str = Depends(get_current_user_id)):
+@cached_report("goals")
+def get_goals_progress(
+    user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("goals")),
+):
     """
     LEVEL 1: Get detailed goal progress tracking.
     """
@@ -402,9 +401,9 @@ def get_goals_progress(user_id: str = Depends(get_current_user_id)):
             
             goals = []
             for row in rows:
-                target = float(row[3])
-                current = float(row[4])
-                progress_pct = (current / target * 100) if target > 0 else 0
+                target = from_minor(row[3])
+                current = from_minor(row[4])
+                progress_pct = (row[4] / row[3] * 100) if row[3] > 0 else 0
                 
                 goals.append({
                     "goal_id": str(row[0]),
@@ -423,10 +422,12 @@ def get_goals_progress(user_id: str = Depends(get_current_user_id)):
 
 
 @router.get("/budgets/performance")
+@cached_report("budgets", "transactions")
 def get_budgets_performance(
     year: int = Query(None),
     month: int = Query(None),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("budgets", "transactions")),
 ):
     """
     LEVEL 1: Get budget vs actual performance for the selected period.
@@ -461,7 +462,7 @@ def get_budgets_performance(
             
             for budget in budgets:
                 budget_id, category, budget_amount, budget_type, start_date, alert_threshold = budget
-                budget_amount_value = float(budget_amount) if budget_amount is not None else 0.0
+                budget_amount = budget_amount or 0
                 
                 # Use category for spending
                 spending_category = category
@@ -488,8 +489,8 @@ def get_budgets_performance(
                         (user_id, spending_category),
                     )
                 
-                actual_spent = float(cur.fetchone()[0])
-                percentage_used = (actual_spent / budget_amount_value * 100) if budget_amount_value > 0 else 0
+                actual_spent = int(cur.fetchone()[0])
+                percentage_used = (actual_spent / budget_amount * 100) if budget_amount > 0 else 0
                 
                 # Determine status
                 if actual_spent > budget_amount:
@@ -502,8 +503,8 @@ def get_budgets_performance(
                 performance.append({
                     "budget_id": str(budget_id),
                     "category": category,
-                    "budget_amount": budget_amount_value,
-                    "actual_spent": actual_spent,
+                    "budget_amount": from_minor(budget_amount),
+                    "actual_spent": from_minor(actual_spent),
                     "percentage_used": round(percentage_used, 2),
                     "status": status,
                     "alert_threshold": alert_threshold,
@@ -517,9 +518,11 @@ def get_budgets_performance(
 # ======================== L2: Advanced Analytics Endpoints ========================
 
 @router.get("/trends/savings-rate")
+@cached_report("transactions", "incomes")
 def get_savings_rate_trend(
     months: int = Query(12, ge=1, le=60),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions", "incomes")),
 ):
     """
     LEVEL 2: Get savings rate (% of income saved) for last N months.
@@ -540,7 +543,7 @@ def get_savings_rate_trend(
                     """,
                     (user_id, month, year),
                 )
-                income = float(cur.fetchone()[0])
+                income = int(cur.fetchone()[0])
                 
                 # Get expenses
                 cur.execute(
@@ -553,16 +556,16 @@ def get_savings_rate_trend(
                     """,
                     (user_id, month, year),
                 )
-                expense = float(cur.fetchone()[0])
+                expense = int(cur.fetchone()[0])
                 
                 net_savings = income - expense
                 savings_rate = (net_savings / income * 100) if income > 0 else 0
                 
                 trends.append({
                     "month": _format_month_year(year, month),
-                    "income": income,
-                    "expense": expense,
-                    "net_savings": net_savings,
+                    "income": from_minor(income),
+                    "expense": from_minor(expense),
+                    "net_savings": from_minor(net_savings),
                     "savings_rate_percentage": round(savings_rate, 2),
                 })
         
@@ -572,10 +575,12 @@ def get_savings_rate_trend(
 
 
 @router.get("/breakdown/top-transactions")
+@cached_report("transactions")
 def get_top_transactions_report(
     limit: int = Query(10, ge=1, le=50),
     txn_type: str = Query("expense", description="'expense' or 'income'"),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions")),
 ):
     """
     LEVEL 2: Get top N transactions by amount.
@@ -590,8 +595,10 @@ def get_top_transactions_report(
 
 
 @router.get("/trends/monthly-comparison")
+@cached_report("transactions", "incomes")
 def get_monthly_comparison(
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions", "incomes")),
 ):
     """
     LEVEL 2: Get month-over-month comparison (current vs previous months).
@@ -621,7 +628,7 @@ def get_monthly_comparison(
                     """,
                     (user_id, month, year),
                 )
-                income = float(cur.fetchone()[0])
+                income = int(cur.fetchone()[0])
                 
                 # Get expenses
                 cur.execute(
@@ -634,13 +641,13 @@ def get_monthly_comparison(
                     """,
                     (user_id, month, year),
                 )
-                expense = float(cur.fetchone()[0])
+                expense = int(cur.fetchone()[0])
                 
                 comparison.append({
                     "month": _format_month_year(year, month),
-                    "income": income,
-                    "expense": expense,
-                    "net_savings": income - expense,
+                    "income": from_minor(income),
+                    "expense": from_minor(expense),
+                    "net_savings": from_minor(income - expense),
                 })
             
             return comparison
@@ -649,11 +656,13 @@ def get_monthly_comparison(
 
 
 @router.get("/patterns/recurring-expenses")
+@cached_report("transactions")
 def get_recurring_expenses_report(
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions")),
 ):
     """
-    LEVEL 2: Detect recurring expenses (same description/category/amount).
+    LEVEL 2: Detect recurring expenses (weekly, monthly or annual payments to the same merchant).
     """
     return {
         "recurring_expenses": _detect_recurring_expenses(user_id),
@@ -661,394 +670,402 @@ def get_recurring_expenses_report(
 
 
 @router.get("/patterns/spending-anomalies")
+@cached_report("transactions")
 def get_spending_anomalies_report(
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions")),
 ):
     """
-    LEVEL 2: Detect unusual spending patterns (high/low spikes).
+    LEVEL 2: Detect unusual spending patterns: category-months far from their
+    (seasonal) baseline, and single transactions far above the category's norm.
     """
+    found = _detect_spending_anomalies(user_id)
     return {
-        "anomalies": _detect_spending_anomalies(user_id),
+        "anomalies": found["category_months"],
+        "transaction_anomalies": found["transactions"],
     }
 
 
-@router.get("/summary/detailed")
-def get_detailed_summary(
-    year: int = Query(None),
-    month: int = Query(None),
+@router.get("/stats/categories")
+@cached_report("transactions")
+def get_category_stats(
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions")),
 ):
     """
-    LEVEL 2: Get comprehensive summary with all key metrics.
+    LEVEL 2: Running expense statistics per category (count, average, spread,
+    recent average), maintained on every transaction write.
     """
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            where_clause = "user_id = %s AND txn_type = 'expense'"
-            params = [user_id]
-            
-            if year and month:
-                where_clause += " AND EXTRACT(YEAR FROM txn_date) = %s AND EXTRACT(MONTH FROM txn_date) = %s"
-                params.extend([year, month])
-            elif year:
-                where_clause += " AND EXTRACT(YEAR FROM txn_date) = %s"
-                params.append(year)
-            
-            # Total expenses
             cur.execute(
-                f"SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE {where_clause};",
-                tuple(params),
-            )
-            total_expense = float(cur.fetchone()[0])
-            
-            # Total income
-            if year and month:
-                cur.execute(
-                    "SELECT COALESCE(SUM(amount), 0) FROM incomes WHERE user_id = %s AND month = %s AND year = %s;",
-                    (user_id, month, year),
-                )
-            else:
-                cur.execute(
-                    "SELECT COALESCE(SUM(amount), 0) FROM incomes WHERE user_id = %s;",
-                    (user_id,),
-                )
-            total_income = float(cur.fetchone()[0])
-            
-            # Transaction count
-            cur.execute(
-                f"SELECT COUNT(*) FROM transactions WHERE {where_clause};",
-                tuple(params),
-            )
-            txn_count = cur.fetchone()[0]
-            
-            # Average transaction
-            avg_txn = (total_expense / txn_count) if txn_count > 0 else 0
-            
-            # Number of categories
-            cur.execute(
-                f"SELECT COUNT(DISTINCT category) FROM transactions WHERE {where_clause};",
-                tuple(params),
+                """
+                SELECT c.name, s.count, s.mean, s.m2, s.ewma
+                FROM category_stats s
+                JOIN categories c ON c.id = s.category_id
+                WHERE s.user_id = %s AND s.count > 0
+                ORDER BY s.count * s.mean DESC;
+                """,
+                (user_id,),
             )
-            category_count = cur.fetchone()[0]
-            
-            return {
-                "total_income": total_income,
-                "total_expense": total_expense,
-                "net_savings": total_income - total_expense,
-                "savings_percentage": round((total_income - total_expense) / total_income * 100, 2) if total_income > 0 else 0,
-                "transaction_count": txn_count,
-                "average_transaction": round(avg_txn, 2),
-                "category_count": category_count,
-            }
+            rows = cur.fetchall()
     finally:
         conn.close()
+    return {
+        "categories": [
+            {"category": row[0], **RunningStats(row[1], row[2], row[3], row[4]).to_dict()}
+            for row in rows
+        ]
+    }
 
 
-# ======================== Export Endpoints ========================
-
-@router.get("/export/csv")
-def export_to_csv(
+@router.get("/summary/detailed")
+@cached_report("transactions", "incomes")
+def get_detailed_summary(
     year: int = Query(None),
     month: int = Query(None),
-    report_type: str = Query("transactions", description="transactions, budgets, or goals"),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions", "incomes")),
 ):
     """
-    EXPORT: Generate CSV data for download with normalized categories and cleaned descriptions.
-    Returns CSV-formatted data.
+    LEVEL 2: Get comprehensive summary with all key metrics.
     """
-    import csv
-    import io
-    
-    if report_type not in ["transactions", "budgets", "goals"]:
+    where_clause = "user_id = %s AND txn_type = 'expense'"
+    params = [user_id]
+
+    if year and month:
+        where_clause += " AND EXTRACT(YEAR FROM txn_date) = %s AND EXTRACT(MONTH FROM txn_date) = %s"
+        params.extend([year, month])
+    elif year:
+        where_clause += " AND EXTRACT(YEAR FROM txn_date) = %s"
+        params.append(year)
+
+    if year and month:
+        income_query = (
+            "SELECT COALESCE(SUM(amount), 0) FROM incomes WHERE user_id = %s AND month = %s AND year = %s;",
+            (user_id, month, year),
+        )
+    else:
+        income_query = ("SELECT COALESCE(SUM(amount), 0) FROM incomes WHERE user_id = %s;", (user_id,))
+
+    # Expense totals and income total are independent: run them in parallel.
+    results = fetch_all_concurrently({
+        "expenses": (
+            f"""
+            SELECT COALESCE(SUM(amount), 0), COUNT(*), COUNT(DISTINCT category)
+            FROM transactions
+            WHERE {where_clause};
+            """,
+            params,
+        ),
+        "income": income_query,
+    })
+    total_expense, txn_count, category_count = results["expenses"][0]
+    total_expense = int(total_expense)
+    total_income = int(results["income"][0][0])
+
+    # Average transaction
+    avg_txn = (total_expense / txn_count) if txn_count > 0 else 0
+
+    return {
+        "total_income": from_minor(total_income),
+        "total_expense": from_minor(total_expense),
+        "net_savings": from_minor(total_income - total_expense),
+        "savings_percentage": round((total_income - total_expense) / total_income * 100, 2) if total_income > 0 else 0,
+        "transaction_count": txn_count,
+        "average_transaction": round(from_minor(avg_txn), 2),
+        "category_count": category_count,
+    }
+
+
+# ======================== Export Endpoints ========================
+
+def _export_query(report_type: str, user_id: str, year: Optional[int], month: Optional[int]) -> tuple:
+    """Validate export params and return (sql, params) in EXPORT_SPECS column order."""
+    if report_type not in EXPORT_SPECS:
         raise HTTPException(status_code=400, detail="Invalid report_type")
-    
+
     # Validate January date range
     if year and month:
         if month < 1 or month > 12:
             raise HTTPException(status_code=400, detail="Invalid month. Must be between 1 and 12.")
         if month == 1 and year < 2000:
             raise HTTPException(status_code=400, detail="Invalid year for January.")
-    
-    # Category normalization map
-    category_map = {
-        'food': 'Food', 'restaurant': 'Food', 'groceries': 'Food',
-        'transport': 'Transport', 'travel': 'Transport', 'taxi': 'Transport', 'uber': 'Transport',
-        'healthcare': 'Healthcare', 'medical': 'Healthcare', 'doctor': 'Healthcare',
-        'entertainment': 'Entertainment', 'movie': 'Entertainment', 'games': 'Entertainment',
-        'shopping': 'Shopping', 'clothes': 'Shopping', 'fashion': 'Shopping',
-        'bills': 'Bills', 'utilities': 'Bills', 'electricity': 'Bills',
-        'education': 'Education', 'school': 'Education', 'course': 'Education',
-        'personal': 'Personal', 'gifts': 'Personal',
-    }
-    
-    def normalize_category(cat_name):
-        """Normalize category name to standard format."""
-        if not cat_name:
-            return "Uncategorized"
-        
-        cat_name = str(cat_name).strip()
-        cat_lower = cat_name.lower()
-        
-        # Check if it's in our mapping
-        normalized = category_map.get(cat_lower, cat_name.title())
-        
-        # Skip event-specific categories (containing numbers)
-        if any(char.isdigit() for char in cat_name):
-            normalized = 'Personal'
-        
-        return normalized
-    
-    def clean_description(desc):
-        """Clean and standardize description/merchant names."""
-        if not desc:
-            return "N/A"
-        
-        desc = str(desc).strip()
-        
-        # Remove placeholder descriptions
-        if desc.lower() in ['no description', 'none', '-', '', 'n/a', 'na']:
-            return "N/A"
-        
-        # Standardize merchant names - remove extra spaces
-        desc = ' '.join(desc.split())
-        
-        return desc
-    
+
+    if report_type == "transactions":
+        where_clause = "t.user_id = %s"
+        params = [user_id]
+
+        if year and month:
+            where_clause += " AND EXTRACT(YEAR FROM t.txn_date) = %s AND EXTRACT(MONTH FROM t.txn_date) = %s"
+            params.extend([year, month])
+
+        # Rows written before the categories backfill have no category_id.
+        return (
+            f"""
+            SELECT t.txn_date, COALESCE(c.name, 'Uncategorized'), t.amount, t.txn_type, t.description, t.payment_mode
+            FROM transactions t
+            LEFT JOIN categories c ON c.id = t.category_id
+            WHERE {where_clause}
+            ORDER BY t.txn_date DESC;
+            """,
+            tuple(params),
+        )
+    if report_type == "incomes":
+        where_clause = "user_id = %s"
+        params = [user_id]
+
+        if year and month:
+            where_clause += " AND year = %s AND month = %s"
+            params.extend([year, month])
+
+        return (
+            f"""
+            SELECT received_date, income_type, amount, source, note
+            FROM incomes
+            WHERE {where_clause}
+            ORDER BY received_date DESC;
+            """,
+            tuple(params),
+        )
+    if report_type == "budgets":
+        return (
+            """
+            SELECT COALESCE(c.name, 'Uncategorized'), b.budget_type, b.amount, b.start_date, b.alert_threshold
+            FROM budgets b
+            LEFT JOIN categories c ON c.id = b.category_id
+            WHERE b.user_id = %s
+            ORDER BY b.created_at DESC;
+            """,
+            (user_id,),
+        )
+    return (
+        """
+        SELECT name, category, target_amount, current_amount, deadline
+        FROM goals
+        WHERE user_id = %s
+        ORDER BY deadline ASC;
+        """,
+        (user_id,),
+    )
+
+
+def _iter_export_rows(sql: str, params: tuple, chunk_size: int = EXPORT_CHUNK_ROWS):
+    """Yield lists of rows from a server-side cursor, ``chunk_size`` at a time."""
     conn = get_db_connection()
     try:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        if report_type == "transactions":
-            writer.writerow(["Date", "Category", "Amount", "Type", "Description", "Payment Mode"])
-            
-            where_clause = "user_id = %s"
-            params = [user_id]
-            
-            if year and month:
-                where_clause += " AND EXTRACT(YEAR FROM txn_date) = %s AND EXTRACT(MONTH FROM txn_date) = %s"
-                params.extend([year, month])
-            
-            with conn.cursor() as cur:
-                cur.execute(
-                    f"""
-                    SELECT txn_date, category, amount, txn_type, description, payment_mode
-                    FROM transactions
-                    WHERE {where_clause}
-                    ORDER BY txn_date DESC;
-                    """,
-                    tuple(params),
-                )
-                for row in cur.fetchall():
-                    # Normalize category and clean description
-                    normalized_cat = normalize_category(row[1])
-                    cleaned_desc = clean_description(row[4])
-                    
-                    # Write cleaned row
-                    writer.writerow([
-                        row[0],  # Date
-                        normalized_cat,  # Normalized category
-                        row[2],  # Amount
-                        row[3],  # Type
-                        cleaned_desc,  # Cleaned description
-                        row[5] if row[5] else "N/A",  # Payment mode
-                    ])
-        
-        elif report_type == "budgets":
-            writer.writerow(["Category", "Budget Type", "Amount", "Start Date", "Alert Threshold %"])
-            
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT category, budget_type, amount, start_date, alert_threshold
-                    FROM budgets
-                    WHERE user_id = %s
-                    ORDER BY created_at DESC;
-                    """,
-                    (user_id,),
-                )
-                for row in cur.fetchall():
-                    # Normalize budget category
-                    normalized_cat = normalize_category(row[0])
-                    writer.writerow([
-                        normalized_cat,
-                        row[1],
-                        row[2],
-                        row[3],
-                        row[4]
-                    ])
-        
-        elif report_type == "goals":
-            writer.writerow(["Goal Name", "Category", "Target Amount", "Current Amount", "Progress %", "Deadline"])
-            
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT name, category, target_amount, current_amount, deadline
-                    FROM goals
-                    WHERE user_id = %s
-                    ORDER BY deadline ASC;
-                    """,
-                    (user_id,),
-                )
-                for row in cur.fetchall():
-                    progress = (float(row[3]) / float(row[2]) * 100) if float(row[2]) > 0 else 0
-                    normalized_cat = normalize_category(row[1])
-                    
-                    writer.writerow([
-                        row[0],  # Goal name
-                        normalized_cat,  # Normalized category
-                        row[2],  # Target amount
-                        row[3],  # Current amount
-                        f"{progress:.2f}%",  # Progress
-                        row[4]  # Deadline
-                    ])
-        
-        return {"csv": output.getvalue()}
+        # A named cursor keeps the result set on the server; only one chunk is held here.
+        with conn.cursor(name=f"export_{uuid.uuid4().hex}") as cur:
+            cur.itersize = chunk_size
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
     finally:
         conn.close()
 
 
+@router.get("/export/csv")
+def export_to_csv(
+    year: int = Query(None),
+    month: int = Query(None),
+    report_type: str = Query("transactions", description="transactions, incomes, budgets, or goals"),
+    user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard()),
+):
+    """
+    EXPORT: Generate CSV data for download with normalized categories and cleaned descriptions.
+    Returns CSV-formatted data wrapped in JSON; prefer /export/csv/stream for large exports.
+    """
+    sql, params = _export_query(report_type, user_id, year, month)
+    spec = EXPORT_SPECS[report_type]
+    csv_text = b"".join(iter_csv(spec, _iter_export_rows(sql, params))).decode("utf-8")
+    return {"csv": csv_text}
+
+
+@router.get("/export/csv/stream")
+def stream_csv_export(
+    year: int = Query(None),
+    month: int = Query(None),
+    report_type: str = Query("transactions", description="transactions, incomes, budgets, or goals"),
+    gzip: bool = Query(False, description="Compress the response with gzip"),
+    user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard()),
+):
+    """
+    EXPORT: Stream the same CSV as /export/csv as a text/csv download.
+    Rows are read from a server-side cursor and encoded chunk by chunk, so
+    memory stays flat regardless of the export size.
+    """
+    sql, params = _export_query(report_type, user_id, year, month)
+    filename = f"wealthwise-{report_type}-{date.today().isoformat()}.csv"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        iter_csv(EXPORT_SPECS[report_type], _iter_export_rows(sql, params), gzip=gzip),
+        media_type="text/csv; charset=utf-8",
+        headers=headers,
+    )
+
+
+def _columnar_export(file_format: str, report_type: str, user_id: str, year: Optional[int], month: Optional[int], etag: str):
+    sql, params = _export_query(report_type, user_id, year, month)
+    try:
+        arrow_schema(report_type)  # fail before the response starts if pyarrow is missing
+    except ColumnarUnavailable as exc:
+        raise HTTPException(status_code=501, detail=str(exc)) from exc
+
+    extension = "parquet" if file_format == "parquet" else "arrows"
+    filename = f"wealthwise-{report_type}-{date.today().isoformat()}.{extension}"
+    return StreamingResponse(
+        iter_columnar(report_type, _iter_export_rows(sql, params, EXPORT_ROW_GROUP_ROWS), file_format),
+        media_type=COLUMNAR_MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
+        },
+    )
+
+
+@router.get("/export/parquet")
+def export_to_parquet(
+    year: int = Query(None),
+    month: int = Query(None),
+    report_type: str = Query("transactions", description="transactions, incomes, budgets, or goals"),
+    user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard()),
+):
+    """
+    EXPORT: Stream a zstd-compressed Parquet file, one row group per cursor chunk.
+    Dates, decimal amounts and dictionary-encoded categories/payment modes keep
+    their types; values are normalized exactly as in the CSV export.
+    """
+    return _columnar_export("parquet", report_type, user_id, year, month, etag)
+
+
+@router.get("/export/arrow")
+def export_to_arrow(
+    year: int = Query(None),
+    month: int = Query(None),
+    report_type: str = Query("transactions", description="transactions, incomes, budgets, or goals"),
+    user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard()),
+):
+    """
+    EXPORT: Stream an Arrow IPC stream, one record batch per cursor chunk.
+    Same columns as /export/parquet; suited to loading straight into pandas/Polars.
+    """
+    return _columnar_export("arrow", report_type, user_id, year, month, etag)
+
+
 @router.get("/export/summary-data")
+@cached_report("transactions", "incomes", "budgets")
 def get_export_summary_data(
     year: int = Query(None),
     month: int = Query(None),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions", "incomes", "budgets")),
 ):
     """
     EXPORT: Get all data needed for PDF/Excel export in structured format.
     """
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            where_clause = "user_id = %s"
-            params = [user_id]
-            
-            if year and month:
-                where_clause += " AND EXTRACT(YEAR FROM txn_date) = %s AND EXTRACT(MONTH FROM txn_date) = %s"
-                params.extend([year, month])
-            
-            # Summary stats
-            cur.execute(
-                f"SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE {where_clause} AND txn_type = 'expense';",
-                tuple(params),
-            )
-            total_expense = float(cur.fetchone()[0])
-            
-            if year and month:
-                cur.execute(
-                    "SELECT COALESCE(SUM(amount), 0) FROM incomes WHERE user_id = %s AND month = %s AND year = %s;",
-                    (user_id, month, year),
-                )
-            else:
-                cur.execute(
-                    "SELECT COALESCE(SUM(amount), 0) FROM incomes WHERE user_id = %s;",
-                    (user_id,),
-                )
-            total_income = float(cur.fetchone()[0])
-            
-            # Category breakdown - normalize and clean
-            cur.execute(
-                f"""
-                SELECT category, SUM(amount)
+    where_clause = "user_id = %s"
+    params = [user_id]
+
+    if year and month:
+        where_clause += " AND EXTRACT(YEAR FROM txn_date) = %s AND EXTRACT(MONTH FROM txn_date) = %s"
+        params.extend([year, month])
+
+    if year and month:
+        income_query = (
+            "SELECT COALESCE(SUM(amount), 0) FROM incomes WHERE user_id = %s AND month = %s AND year = %s;",
+            (user_id, month, year),
+        )
+    else:
+        income_query = ("SELECT COALESCE(SUM(amount), 0) FROM incomes WHERE user_id = %s;", (user_id,))
+
+    # The five sections are independent: fetch them in parallel.
+    results = fetch_all_concurrently({
+        "total_expense": (
+            f"SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE {where_clause} AND txn_type = 'expense';",
+            params,
+        ),
+        "total_income": income_query,
+        "categories": (
+            f"""
+            SELECT c.name, totals.amount
+            FROM (
+                SELECT category_id, SUM(amount) AS amount
                 FROM transactions
                 WHERE {where_clause} AND txn_type = 'expense' AND category IS NOT NULL AND category != ''
-                GROUP BY category
-                ORDER BY SUM(amount) DESC;
-                """,
-                tuple(params),
-            )
-            
-            # Normalize category names
-            category_map = {
-                'food': 'Food', 'restaurant': 'Food', 'groceries': 'Food',
-                'transport': 'Transport', 'travel': 'Transport', 'taxi': 'Transport', 'uber': 'Transport',
-                'healthcare': 'Healthcare', 'medical': 'Healthcare', 'doctor': 'Healthcare',
-                'entertainment': 'Entertainment', 'movie': 'Entertainment', 'games': 'Entertainment',
-                'shopping': 'Shopping', 'clothes': 'Shopping', 'fashion': 'Shopping',
-                'bills': 'Bills', 'utilities': 'Bills', 'electricity': 'Bills',
-                'education': 'Education', 'school': 'Education', 'course': 'Education',
-                'personal': 'Personal', 'gifts': 'Personal',
-            }
-            
-            categories_raw = cur.fetchall()
-            category_totals = defaultdict(float)
-            
-            for row in categories_raw:
-                cat_name = str(row[0]).strip()
-                amount = float(row[1])
-                
-                # Normalize category name
-                cat_lower = cat_name.lower()
-                normalized = category_map.get(cat_lower, cat_name.title())
-                
-                # Skip event-specific categories (containing numbers or special patterns)
-                if any(char.isdigit() for char in cat_name):
-                    normalized = 'Personal'
-                
-                category_totals[normalized] += amount
-            
-            categories = [
-                {"name": cat, "amount": amt}
-                for cat, amt in sorted(category_totals.items(), key=lambda x: x[1], reverse=True)
-            ]
-            
-            # Recent transactions - limit to 10, clean descriptions
-            cur.execute(
-                f"""
-                SELECT txn_date, category, amount, txn_type, description
-                FROM transactions
-                WHERE {where_clause} AND category IS NOT NULL AND category != ''
-                ORDER BY txn_date DESC
-                LIMIT 10;
-                """,
-                tuple(params),
-            )
-            
-            transactions = []
-            for row in cur.fetchall():
-                cat_name = str(row[1]).strip()
-                cat_lower = cat_name.lower()
-                normalized_cat = category_map.get(cat_lower, cat_name.title())
-                
-                if any(char.isdigit() for char in cat_name):
-                    normalized_cat = 'Personal'
-                
-                desc = str(row[4]) if row[4] else "N/A"
-                if desc.lower() in ['no description', 'none', '-', '']:
-                    desc = "N/A"
-                
-                transactions.append({
-                    "date": str(row[0]),
-                    "category": normalized_cat,
-                    "amount": float(row[2]),
-                    "type": row[3],
-                    "description": desc[:50],  # Truncate long descriptions
-                })
-            
-            # Budgets
-            cur.execute(
-                """
-                SELECT category, amount
-                FROM budgets
-                WHERE user_id = %s;
-                """,
-                (user_id,),
-            )
-            budgets = [{"category": row[0], "amount": float(row[1])} for row in cur.fetchall()]
-            
-            return {
-                "summary": {
-                    "total_income": total_income,
-                    "total_expense": total_expense,
-                    "net_savings": total_income - total_expense,
-                },
-                "categories": categories,
-                "transactions": transactions,
-                "budgets": budgets,
-                "report_date": str(date.today()),
-                "report_period": f"{_format_month_year(year, month)}" if year and month else "All Time",
-            }
-    finally:
-        conn.close()
+                GROUP BY category_id
+            ) totals
+            JOIN categories c ON c.id = totals.category_id
+            ORDER BY totals.amount DESC;
+            """,
+            params,
+        ),
+        "transactions": (
+            f"""
+            SELECT t.txn_date, c.name, t.amount, t.txn_type, t.description
+            FROM transactions t
+            JOIN categories c ON c.id = t.category_id
+            WHERE {where_clause} AND t.category IS NOT NULL AND t.category != ''
+            ORDER BY t.txn_date DESC
+            LIMIT 10;
+            """,
+            params,
+        ),
+        "budgets": (
+            """
+            SELECT category, amount
+            FROM budgets
+            WHERE user_id = %s;
+            """,
+            (user_id,),
+        ),
+    })
+    total_expense = int(results["total_expense"][0][0])
+    total_income = int(results["total_income"][0][0])
+
+    # Grouped by category_id, so each row is already one normalized category.
+    categories = [{"name": row[0], "amount": from_minor(row[1])} for row in results["categories"]]
+
+    # Recent transactions - limit to 10, clean descriptions
+    transactions = []
+    for row in results["transactions"]:
+        desc = str(row[4]) if row[4] else "N/A"
+        if desc.lower() in ['no description', 'none', '-', '']:
+            desc = "N/A"
+
+        transactions.append({
+            "date": str(row[0]),
+            "category": row[1],
+            "amount": from_minor(row[2]),
+            "type": row[3],
+            "description": desc[:50],  # Truncate long descriptions
+        })
+
+    budgets = [{"category": row[0], "amount": from_minor(row[1])} for row in results["budgets"]]
+
+    return {
+        "summary": {
+            "total_income": from_minor(total_income),
+            "total_expense": from_minor(total_expense),
+            "net_savings": from_minor(total_income - total_expense),
+        },
+        "categories": categories,
+        "transactions": transactions,
+        "budgets": budgets,
+        "report_date": str(date.today()),
+        "report_period": f"{_format_month_year(year, month)}" if year and month else "All Time",
+    }
@@ -1,119 +1,153 @@
+from typing import Dict, Optional
+
 from fastapi import APIRouter, Depends, Query
 
 from auth import get_current_user_id
-from database import get_db_connection
-from services.prediction_service import (
-    detect_anomaly,
-    predict_next_month_expense,
-    savings_projection,
-)
+from data_versions import etag_guard, fetch_data_versions
+from database import fetch_all_concurrently, get_db_connection
+from reports import _calculate_months_remaining
+from services.insights import INSIGHT_DOMAINS, summarize
+from services.money import from_minor
+from services.prediction_service import MAX_SIMULATION_MONTHS, simulate_savings
+from services.result_cache import cached_report
 
 
 router = APIRouter(prefix="/reports/insights", tags=["reports"])
 
 
-def _format_month_label(year, month):
-    return f"{int(year):04d}-{int(month):02d}"
+def _stored_summary(user_id: str) -> Optional[Dict]:
+    """The summary materialized by insights_batch.py, unless its data changed since."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT summary, transactions_version, incomes_version FROM insights WHERE user_id = %s;",
+                (user_id,),
+            )
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    versions = fetch_data_versions(user_id, INSIGHT_DOMAINS)
+    if (row[1], row[2]) != (versions["transactions"], versions["incomes"]):
+        return None
+    return row[0]
 
 
 @router.get("/summary")
+@cached_report(*INSIGHT_DOMAINS)
 def get_ai_insights_summary(
     year: int = Query(None),
     month: int = Query(None),
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard(*INSIGHT_DOMAINS)),
 ):
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            where_clause = "user_id = %s AND txn_type = 'expense'"
-            expense_params = [user_id]
-
-            if year and month:
-                where_clause += """
-                    AND (
-                        EXTRACT(YEAR FROM txn_date)::INTEGER < %s
-                        OR (
-                            EXTRACT(YEAR FROM txn_date)::INTEGER = %s
-                            AND EXTRACT(MONTH FROM txn_date)::INTEGER <= %s
-                        )
-                    )
-                """
-                expense_params.extend([year, year, month])
-
-            cur.execute(
-                f"""
-                SELECT
-                    EXTRACT(YEAR FROM txn_date)::INTEGER as year,
-                    EXTRACT(MONTH FROM txn_date)::INTEGER as month,
-                    COALESCE(SUM(amount), 0) as total
-                FROM transactions
-                WHERE {where_clause}
-                GROUP BY EXTRACT(YEAR FROM txn_date), EXTRACT(MONTH FROM txn_date)
-                ORDER BY EXTRACT(YEAR FROM txn_date), EXTRACT(MONTH FROM txn_date);
-                """,
-                tuple(expense_params),
+    if not (year and month):
+        stored = _stored_summary(user_id)
+        if stored is not None:
+            return stored
+
+    where_clause = "t.user_id = %s AND t.txn_type = 'expense'"
+    expense_params = [user_id]
+
+    if year and month:
+        where_clause += """
+            AND (
+                EXTRACT(YEAR FROM t.txn_date)::INTEGER < %s
+                OR (
+                    EXTRACT(YEAR FROM t.txn_date)::INTEGER = %s
+                    AND EXTRACT(MONTH FROM t.txn_date)::INTEGER <= %s
+                )
             )
-            expense_rows = cur.fetchall()
-
-            monthly_expenses = []
-            expenses = []
-            for row in expense_rows:
-                month_label = _format_month_label(row[0], row[1])
-                amount = float(row[2])
-                monthly_expenses.append({"month": month_label, "expense": round(amount, 2)})
-                expenses.append(amount)
-
-            months = list(range(1, len(expenses) + 1))
-            average_expense = sum(expenses) / len(expenses) if expenses else 0.0
-            latest_expense = expenses[-1] if expenses else 0.0
-            past_expenses = expenses[:-1] if len(expenses) > 1 else expenses
-
-            next_month_prediction = predict_next_month_expense(months, expenses)
-            anomaly_flag = detect_anomaly(past_expenses, latest_expense)
-            anomaly_threshold = average_expense * 1.8 if average_expense > 0 else 0.0
-
-            income_where_clause = "user_id = %s"
-            income_params = [user_id]
-
-            if year and month:
-                income_where_clause += " AND (year < %s OR (year = %s AND month <= %s))"
-                income_params.extend([year, year, month])
-
-            cur.execute(
-                f"""
-                SELECT year, month, COALESCE(SUM(amount), 0) as total
-                FROM incomes
-                WHERE {income_where_clause}
-                GROUP BY year, month
-                ORDER BY year, month;
-                """,
-                tuple(income_params),
-            )
-            income_rows = cur.fetchall()
-            income_values = [float(row[2]) for row in income_rows]
-            average_income = sum(income_values) / len(income_values) if income_values else 0.0
-
-            projected_monthly_savings = average_income - average_expense
-            projected_savings_6_months = savings_projection(average_income, expenses, months=6)
-
-            return {
-                "monthly_expenses": monthly_expenses,
-                "spending_forecast": {
-                    "predicted_next_month": round(next_month_prediction, 2),
-                    "average_monthly_expense": round(average_expense, 2),
-                },
-                "anomaly_detection": {
-                    "latest_month_expense": round(latest_expense, 2),
-                    "average_expense": round(average_expense, 2),
-                    "threshold": round(anomaly_threshold, 2),
-                    "is_anomaly": anomaly_flag,
-                },
-                "savings_projection": {
-                    "average_income": round(average_income, 2),
-                    "average_expense": round(average_expense, 2),
-                    "projected_monthly_savings": round(projected_monthly_savings, 2),
-                    "projected_savings_6_months": round(projected_savings_6_months, 2),
-                },
-            }
-    finally:
-        conn.close()
+        """
+        expense_params.extend([year, year, month])
+
+    income_where_clause = "user_id = %s"
+    income_params = [user_id]
+
+    if year and month:
+        income_where_clause += " AND (year < %s OR (year = %s AND month <= %s))"
+        income_params.extend([year, year, month])
+
+    # Expense and income series are independent: fetch them in parallel.
+    # Expenses come per category; monthly totals are summed from them.
+    results = fetch_all_concurrently({
+        "expenses": (
+            f"""
+            SELECT
+                EXTRACT(YEAR FROM t.txn_date)::INTEGER as year,
+                EXTRACT(MONTH FROM t.txn_date)::INTEGER as month,
+                COALESCE(c.name, 'Uncategorized') as category,
+                COALESCE(SUM(t.amount), 0) as total
+            FROM transactions t
+            LEFT JOIN categories c ON c.id = t.category_id
+            WHERE {where_clause}
+            GROUP BY 1, 2, 3
+            ORDER BY 1, 2;
+            """,
+            expense_params,
+        ),
+        "incomes": (
+            f"""
+            SELECT year, month, COALESCE(SUM(amount), 0) as total
+            FROM incomes
+            WHERE {income_where_clause}
+            GROUP BY year, month
+            ORDER BY year, month;
+            """,
+            income_params,
+        ),
+    })
+
+    return summarize(results["expenses"], results["incomes"])
+
+
+@router.get("/savings-simulation")
+@cached_report("transactions", "incomes", "goals")
+def get_savings_simulation(
+    months: int = Query(6, ge=1, le=MAX_SIMULATION_MONTHS),
+    user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions", "incomes", "goals")),
+):
+    """Monte Carlo savings bands and goal hit probabilities from monthly history."""
+    results = fetch_all_concurrently({
+        "expenses": (
+            """
+            SELECT SUM(amount)
+            FROM transactions
+            WHERE user_id = %s AND txn_type = 'expense'
+            GROUP BY EXTRACT(YEAR FROM txn_date), EXTRACT(MONTH FROM txn_date);
+            """,
+            (user_id,),
+        ),
+        "incomes": (
+            """
+            SELECT SUM(amount)
+            FROM incomes
+            WHERE user_id = %s
+            GROUP BY year, month;
+            """,
+            (user_id,),
+        ),
+        "goals": (
+            """
+            SELECT id, name, target_amount, current_amount, deadline
+            FROM goals
+            WHERE user_id = %s
+            ORDER BY deadline ASC;
+            """,
+            (user_id,),
+        ),
+    })
+
+    goals = [
+        (str(row[0]), row[1], from_minor(max(row[2] - row[3], 0)), _calculate_months_remaining(row[4]))
+        for row in results["goals"]
+    ]
+    return simulate_savings(
+        [from_minor(row[0]) for row in results["incomes"]],
+        [from_minor(row[0]) for row in results["expenses"]],
+        months=months,
+        goals=goals,
+    )
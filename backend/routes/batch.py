@@ -0,0 +1,84 @@
+"""Run several GET requests in one HTTP round trip.
+
+POST /batch with ``{"requests": [{"id": "goal", "path": "/goals/<id>"},
+{"id": "progress", "path": "/reports/goals/progress"}]}`` returns
+``{"results": {"goal": {"status": 200, "body": {...}}, ...}}``. Items run
+concurrently inside this process with the caller's credentials. Each item
+has its own status, so one failing item does not fail the batch.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, field_validator
+
+from auth import get_current_user_id
+from services.batch import FORWARDED_HEADERS, run_batch
+
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+MAX_BATCH_ITEMS = 20
+# Streaming and batch endpoints cannot be buffered into a single response.
+_BLOCKED_PREFIXES = ("/batch", "/live", "/reports/export/csv", "/reports/export/parquet", "/reports/export/arrow")
+_BLOCKED_PATTERNS = (re.compile(r"^/exports/[^/]+/download$"),)
+
+
+def _is_blocked(path: str) -> bool:
+    path = path.split("?", 1)[0].rstrip("/")
+    return path.startswith(_BLOCKED_PREFIXES) or any(pattern.match(path) for pattern in _BLOCKED_PATTERNS)
+
+
+class BatchItem(BaseModel):
+    id: str
+    path: str
+    params: Optional[Dict[str, Any]] = None
+
+    @field_validator("path")
+    @classmethod
+    def validate_path(cls, value: str) -> str:
+        if not value.startswith("/") or value.startswith("//"):
+            raise ValueError("path must be an absolute path such as /goals")
+        if _is_blocked(value):
+            raise ValueError(f"{value} cannot be batched")
+        return value
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+    @field_validator("requests")
+    @classmethod
+    def validate_requests(cls, value: List[BatchItem]) -> List[BatchItem]:
+        if not value:
+            raise ValueError("requests must not be empty")
+        if len(value) > MAX_BATCH_ITEMS:
+            raise ValueError(f"At most {MAX_BATCH_ITEMS} requests per batch")
+        if len({item.id for item in value}) != len(value):
+            raise ValueError("request ids must be unique")
+        return value
+
+
+@router.post("")
+async def run_batch_requests(
+    payload: BatchRequest,
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Execute GET sub-requests concurrently and return results keyed by id."""
+    # Authenticated once here; sub-requests reuse the same credentials.
+    headers = [
+        (key, value)
+        for key, value in request.scope["headers"]
+        if key in FORWARDED_HEADERS
+    ]
+    try:
+        results = await run_batch(
+            request.app,
+            [item.model_dump() for item in payload.requests],
+            headers,
+        )
+    except Exception as exc:  # pragma: no cover - runtime guard
+        raise HTTPException(status_code=500, detail=f"Batch failed: {exc}") from exc
+    return {"results": results}
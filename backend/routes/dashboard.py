@@ -0,0 +1,177 @@
+"""Composite dashboard endpoint: every home-page widget in one request.
+
+Replaces the separate calls DashboardHome and Reports make on load
+(transaction summary, income totals, budgets, goals, recent transactions,
+trends, category breakdown and AI insights). Transactions and incomes are
+aggregated once per (year, month) and every widget is computed from that
+series; the remaining queries fetch budgets, goals and recent rows.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from auth import get_current_user_id
+from budgets import _row_to_budget
+from data_versions import etag_guard
+from database import get_db_connection
+from reports import _format_month_year, _get_last_n_months
+from services.dashboard import MonthlySeries
+from services.money import from_minor
+from services.result_cache import cached_report
+from transactions import _row_to_transaction
+
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+def _budget_spent(cur, series: MonthlySeries, user_id: str, budget: Dict[str, Any]) -> float:
+    category = budget["custom_category_name"] if budget["category"] == "others" else budget["category"]
+    start_date = datetime.fromisoformat(budget["start_date"]).date()
+    if budget["budget_type"] == "Monthly":
+        return series.category_expense(category, (start_date.year, start_date.month))
+    # Weekly windows do not line up with months, so they need their own sum.
+    cur.execute(
+        """
+        SELECT COALESCE(SUM(amount), 0)
+        FROM transactions
+        WHERE user_id = %s AND category = %s AND txn_type = 'expense'
+            AND txn_date >= %s AND txn_date < %s;
+        """,
+        (user_id, category, start_date, start_date + timedelta(days=7)),
+    )
+    return from_minor(cur.fetchone()[0])
+
+
+@router.get("")
+@cached_report("transactions", "incomes", "budgets", "goals")
+def get_dashboard(
+    month: int = Query(None, ge=1, le=12),
+    year: int = Query(None),
+    trend_months: int = Query(6, ge=1, le=60),
+    recent_limit: int = Query(5, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard()),
+):
+    """All dashboard widgets for the selected month (defaults to the current one)."""
+    today = datetime.utcnow()
+    month = month or today.month
+    year = year or today.year
+    period = (year, month)
+    current_period = (today.year, today.month)
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT year, month, txn_type, category, SUM(amount), COUNT(*)
+                FROM transactions
+                WHERE user_id = %s
+                GROUP BY year, month, txn_type, category;
+                """,
+                (user_id,),
+            )
+            txn_rows = cur.fetchall()
+
+            cur.execute(
+                """
+                SELECT year, month, COALESCE(SUM(amount), 0)
+                FROM incomes
+                WHERE user_id = %s
+                GROUP BY year, month;
+                """,
+                (user_id,),
+            )
+            series = MonthlySeries(txn_rows, cur.fetchall())
+
+            cur.execute(
+                """
+                SELECT id, user_id, category, budget_type, amount, start_date, alert_threshold, custom_category_name, created_at, updated_at
+                FROM budgets
+                WHERE user_id = %s
+                    AND EXTRACT(MONTH FROM start_date) = %s
+                    AND EXTRACT(YEAR FROM start_date) = %s
+                ORDER BY created_at DESC;
+                """,
+                (user_id, month, year),
+            )
+            budgets = []
+            for row in cur.fetchall():
+                budget = _row_to_budget(row)
+                budget["spent"] = _budget_spent(cur, series, user_id, budget)
+                budgets.append(budget)
+
+            cur.execute(
+                """
+                SELECT id, user_id, name, category, target_amount, current_amount,
+                       deadline, notes, created_at, updated_at
+                FROM goals
+                WHERE user_id = %s
+                ORDER BY deadline ASC;
+                """,
+                (user_id,),
+            )
+            goal_rows = cur.fetchall()
+            goals: List[Dict[str, Any]] = [
+                {
+                    "id": str(row[0]),
+                    "user_id": row[1],
+                    "name": row[2],
+                    "category": row[3],
+                    "target_amount": from_minor(row[4]),
+                    "current_amount": from_minor(row[5]),
+                    "deadline": row[6].isoformat() if row[6] else None,
+                    "notes": row[7],
+                    "created_at": row[8].isoformat() if row[8] else None,
+                    "updated_at": row[9].isoformat() if row[9] else None,
+                }
+                for row in goal_rows
+            ]
+
+            cur.execute(
+                """
+                SELECT id, user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at
+                FROM transactions
+                WHERE user_id = %s AND month = %s AND year = %s
+                ORDER BY txn_date DESC, created_at DESC
+                LIMIT %s;
+                """,
+                (user_id, month, year, recent_limit),
+            )
+            recent = [_row_to_transaction(row) for row in cur.fetchall()]
+    except Exception as exc:  # pragma: no cover - runtime guard
+        raise HTTPException(status_code=500, detail=f"Failed to build dashboard: {exc}") from exc
+    finally:
+        conn.close()
+
+    # Same formula as goals._get_available_balance_minor, in paise from the series above.
+    goals_remaining = sum(int(row[4]) - int(row[5]) for row in goal_rows if row[5] < row[4])
+    available_balance = from_minor(max(
+        0,
+        series.income_total_minor(current_period) - series.txn_total_minor("expense", current_period) - goals_remaining,
+    ))
+
+    trends = series.savings_trend(_get_last_n_months(trend_months))
+    for point in trends:
+        point["month"] = _format_month_year(point.pop("year"), point["month"])
+
+    return {
+        "month": month,
+        "year": year,
+        "income_total": {
+            "all_time": series.income_total(),
+            "month": series.income_total(period),
+        },
+        "transaction_summary": {
+            "all_time": series.transaction_summary(),
+            "month": series.transaction_summary(period),
+        },
+        "budgets": budgets,
+        "goals": {"goals": goals, "available_balance": available_balance},
+        "recent_transactions": recent,
+        "category_spending": series.category_breakdown(period),
+        "trends": trends,
+        "insights": series.insights(period),
+    }
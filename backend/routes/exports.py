@@ -0,0 +1,182 @@
+"""Background export jobs: build once, download (and resume) many times.
+
+POST /exports starts (or reuses) a job and returns its id. The id is the
+artifact's content address, so the same export of unchanged data comes
+back ``ready`` straight away. Poll GET /exports/{id} until ``ready``,
+then fetch GET /exports/{id}/download, which honours Range/If-Range so
+interrupted downloads can resume.
+"""
+
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, field_validator
+
+from auth import get_current_user_id
+from data_versions import _etag_matches, fetch_data_versions
+from reports import EXPORT_ROW_GROUP_ROWS, _export_query, _iter_export_rows, get_export_summary_data
+from services.export_jobs import (
+    READY,
+    RangeNotSatisfiable,
+    artifact_key,
+    export_jobs,
+    iter_file_range,
+    parse_range,
+)
+from services.exports import EXPORT_SPECS, ColumnarUnavailable, arrow_schema, iter_columnar, iter_csv, write_xlsx
+
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+    "json": "application/json",
+}
+# The "summary" format is the /reports/export/summary-data payload the PDF export renders.
+_EXTENSIONS = {"csv": "csv", "xlsx": "xlsx", "parquet": "parquet", "summary": "json"}
+_SUMMARY_DOMAINS = ("transactions", "incomes", "budgets")
+
+
+class ExportJobRequest(BaseModel):
+    report_type: str = "transactions"
+    format: str = "csv"
+    year: Optional[int] = None
+    month: Optional[int] = None
+
+    @field_validator("format")
+    @classmethod
+    def validate_format(cls, value: str) -> str:
+        if value not in _EXTENSIONS:
+            raise ValueError(f"format must be one of {', '.join(_EXTENSIONS)}")
+        return value
+
+
+def _job_response(job) -> dict:
+    data = job.to_dict()
+    if job.status == READY:
+        data["download_url"] = f"{router.prefix}/{job.id}/download"
+    return data
+
+
+def _row_builder(file_format: str, report_type: str, sql: str, params: tuple):
+    def build(fileobj):
+        if file_format == "xlsx":
+            write_xlsx(EXPORT_SPECS[report_type], _iter_export_rows(sql, params), fileobj, sheet_name=report_type.title())
+            return
+        if file_format == "parquet":
+            blocks = iter_columnar(report_type, _iter_export_rows(sql, params, EXPORT_ROW_GROUP_ROWS), "parquet")
+        else:
+            blocks = iter_csv(EXPORT_SPECS[report_type], _iter_export_rows(sql, params))
+        for block in blocks:
+            fileobj.write(block)
+
+    return build
+
+
+def _summary_builder(user_id: str, year: Optional[int], month: Optional[int]):
+    def build(fileobj):
+        data = get_export_summary_data(year=year, month=month, user_id=user_id, etag=None)
+        fileobj.write(json.dumps(data).encode("utf-8"))
+
+    return build
+
+
+@router.post("")
+def create_export_job(
+    payload: ExportJobRequest,
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Start an export build, or return the existing artifact if the data has not changed."""
+    if payload.format == "summary":
+        if payload.month is not None and not 1 <= payload.month <= 12:
+            raise HTTPException(status_code=400, detail="Invalid month. Must be between 1 and 12.")
+        params = {"format": "summary", "year": payload.year, "month": payload.month}
+        domains = _SUMMARY_DOMAINS
+        build = _summary_builder(user_id, payload.year, payload.month)
+    else:
+        sql, query_params = _export_query(payload.report_type, user_id, payload.year, payload.month)
+        if payload.format == "parquet":
+            try:
+                arrow_schema(payload.report_type)
+            except ColumnarUnavailable as exc:
+                raise HTTPException(status_code=501, detail=str(exc)) from exc
+        params = payload.model_dump()
+        domains = (payload.report_type,)
+        build = _row_builder(payload.format, payload.report_type, sql, query_params)
+
+    key = artifact_key(user_id, params, fetch_data_versions(user_id, domains))
+    job = export_jobs.submit(user_id, key, _EXTENSIONS[payload.format], build)
+    if job.status != READY:
+        response.status_code = 202
+    return _job_response(job)
+
+
+@router.get("/{job_id}")
+def get_export_job(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Status of an export job: queued, running, ready or failed."""
+    job = export_jobs.get(user_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return _job_response(job)
+
+
+@router.get("/{job_id}/download")
+def download_export(job_id: str, request: Request, user_id: str = Depends(get_current_user_id)):
+    """Download a finished artifact; supports single byte ranges for resuming."""
+    job = export_jobs.get(user_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if job.status != READY:
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+
+    # Artifacts are immutable, so the content address is a strong validator.
+    etag = f'"{job.id}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=86400, immutable",
+        "Content-Disposition": f'attachment; filename="wealthwise-export-{job.id[:12]}.{job.extension}"',
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+
+    # Opened before responding: a prune can remove the artifact at any time,
+    # but an open file stays readable until it is closed.
+    try:
+        fileobj = open(job.path, "rb")
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=410, detail="Export expired; request it again") from exc
+    size = os.fstat(fileobj.fileno()).st_size
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range.strip() == etag:
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except RangeNotSatisfiable as exc:
+            fileobj.close()
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"},
+            ) from exc
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file_range(fileobj, start, end),
+        status_code=status_code,
+        media_type=EXPORT_MEDIA_TYPES[job.extension],
+        headers=headers,
+    )
@@ -0,0 +1,177 @@
+"""Server-Sent Events stream of live updates for the signed-in user.
+
+Events are driven by the database change feed, so they arrive no matter
+which worker, device or tool made the change:
+
+- ``changed``: {domain, op, ids} for every change to the user's data
+- ``transaction_created``: each new OCR transaction
+- ``budget_alert``: an expense pushed a budget past its alert threshold or
+  limit (same payload as ``budget_warning`` on create)
+- ``summary``: current-month totals after transactions change
+- ``resync``: the client fell behind and should refetch
+
+Work happens only for users with an open stream on this worker.
+
+EventSource cannot send an Authorization header: clients first POST
+/live/ticket and open ``/live/stream?ticket=...`` with the single-use
+ticket it returns.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from auth import STREAM_TICKET_SECONDS, get_current_user_id, get_stream_user_id, issue_stream_ticket
+from data_versions import change_feed
+from database import get_db_connection
+from services.change_feed import ChangeEvent
+from services.live_events import live_hub
+from transactions import _check_budget_warning, _row_to_transaction, transaction_summary
+
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+# Change events are turned into live events off the listener thread. Events
+# for a user that is already queued are merged into the pending batch.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="live-events")
+_pending: Dict[str, List[ChangeEvent]] = {}
+_pending_lock = threading.Lock()
+
+
+def _current_summary(user_id: str) -> dict:
+    today = datetime.utcnow()
+    return transaction_summary(month=today.month, year=today.year, user_id=user_id, etag=None)
+
+
+def _fetch_transactions(user_id: str, ids: List[int]) -> List[dict]:
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT id, user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at
+                FROM transactions
+                WHERE user_id = %s AND id = ANY(%s)
+                ORDER BY id;
+                """,
+                (user_id, ids),
+            )
+            return [_row_to_transaction(row) for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def _budget_alerts(user_id: str, txns: List[dict]) -> List[dict]:
+    """Budget warnings for thresholds these transactions crossed.
+
+    Transactions are grouped per (category, month), so a bulk insert costs
+    one budget lookup per group rather than one per row.
+    """
+    groups: Dict[tuple, List[dict]] = {}
+    for txn in txns:
+        if txn["txn_type"] != "expense" or not txn["category"] or not txn["txn_date"]:
+            continue
+        txn_date = datetime.fromisoformat(txn["txn_date"]).date()
+        groups.setdefault((txn["category"], txn_date.year, txn_date.month), []).append(txn)
+
+    alerts = []
+    for (category, _, _), group in groups.items():
+        latest = max(group, key=lambda txn: (txn["txn_date"], txn["id"]))
+        # The rows are already committed, so they are included in current_spent.
+        warning = _check_budget_warning(user_id, category, 0, datetime.fromisoformat(latest["txn_date"]).date())
+        if not warning.get("warning"):
+            continue
+        before = (warning["current_spent"] - sum(float(txn["amount"]) for txn in group)) / warning["budget_amount"] * 100
+        limit = 100 if warning["warning"] == "budget_exceeded" else warning["alert_threshold"]
+        if before >= limit:
+            continue  # Already past this level before these transactions.
+        alerts.append({**warning, "category": category, "transaction_id": latest["id"]})
+    return alerts
+
+
+def _process(user_id: str) -> None:
+    with _pending_lock:
+        events = _pending.pop(user_id, [])
+    if not events or not live_hub.has_subscribers(user_id):
+        return
+    try:
+        refresh_summary = False
+        inserted: List[dict] = []
+        for event in events:
+            live_hub.publish(user_id, "changed", event.to_dict())
+            if event.domain != "transactions":
+                continue
+            refresh_summary = True
+            if event.op != "insert" or not event.ids:
+                continue
+            txns = _fetch_transactions(user_id, event.ids)
+            for txn in txns:
+                if txn["source"] == "ocr":
+                    live_hub.publish(user_id, "transaction_created", txn)
+            inserted.extend(txns)
+        for alert in _budget_alerts(user_id, inserted):
+            live_hub.publish(user_id, "budget_alert", alert)
+        if refresh_summary:
+            live_hub.publish(user_id, "summary", _current_summary(user_id), coalesce="summary")
+    except Exception as exc:  # pragma: no cover - runtime guard
+        print(f">>> LIVE: failed to build events for {user_id}: {exc}")
+        live_hub.publish(user_id, "resync", {"reason": "error"})
+
+
+def _on_change(event: ChangeEvent) -> None:
+    if not live_hub.has_subscribers(event.user_id):
+        return
+    with _pending_lock:
+        queued = event.user_id in _pending
+        _pending.setdefault(event.user_id, []).append(event)
+    if not queued:
+        _executor.submit(_process, event.user_id)
+
+
+change_feed.subscribe(_on_change)
+
+
+@router.post("/ticket")
+def stream_ticket(user_id: str = Depends(get_current_user_id)):
+    """Issue a short-lived, single-use ticket for opening /live/stream."""
+    return {"ticket": issue_stream_ticket(user_id), "expires_in": int(STREAM_TICKET_SECONDS)}
+
+
+async def _events(user_id: str):
+    """SSE frames for one connection.
+
+    The subscription is created and released inside the generator, so a
+    request cancelled or disconnected before streaming starts never holds
+    a connection slot.
+    """
+    try:
+        subscription = live_hub.subscribe(user_id)
+    except OverflowError:
+        return  # Lost the last slot to a concurrent request; EventSource reconnects.
+    try:
+        try:
+            summary = await run_in_threadpool(_current_summary, user_id)
+            subscription.push("summary", summary, coalesce="summary")
+        except Exception as exc:  # pragma: no cover - stream still works without it
+            print(f">>> LIVE: initial summary failed for {user_id}: {exc}")
+        async for frame in live_hub.stream(subscription):
+            yield frame
+    finally:
+        live_hub.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def live_stream(user_id: str = Depends(get_stream_user_id)):
+    """Open an SSE stream; the first event is the current summary."""
+    if not live_hub.has_capacity(user_id):
+        raise HTTPException(status_code=429, detail="Too many live connections for this user")
+    return StreamingResponse(
+        _events(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from auth import require_metrics_access
+from data_versions import change_feed, version_cache
+from services.export_jobs import export_jobs
+from services.live_events import live_hub
+from services.ocr_metrics import ocr_metrics
+from services.result_cache import report_cache
+
+
+# Operator-only: these expose server paths and per-process internals.
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_access)])
+
+
+@router.get("/ocr")
+def get_ocr_metrics(format: str = Query("json", description="'json' or 'prometheus'")):
+    """Aggregated receipt OCR latency and quality histograms."""
+    if format == "prometheus":
+        return PlainTextResponse(ocr_metrics.prometheus())
+    return ocr_metrics.snapshot()
+
+
+@router.get("/ocr/slow-scans")
+def get_slow_ocr_scans():
+    """Most recent scans slower than the configured threshold."""
+    return {
+        "threshold_ms": ocr_metrics.slow_threshold_ms,
+        "replay_dir": ocr_metrics.replay_dir,
+        "scans": ocr_metrics.slow_scans(),
+    }
+
+
+@router.get("/cache")
+def get_cache_metrics():
+    """Hit/miss/eviction counters for the in-process result caches."""
+    return {
+        "reports": report_cache.stats(),
+        "data_versions": version_cache.stats(),
+        "change_feed": change_feed.stats(),
+        "live_streams": live_hub.stats(),
+        "export_jobs": export_jobs.stats(),
+    }
@@ -0,0 +1,172 @@
+"""Delta sync: rows changed since a client's token, with tombstones for deletes.
+
+``GET /sync`` without a token returns a full snapshot of the user's
+transactions, incomes, budgets and goals. Later calls pass the returned
+``token`` back as ``since`` and get only the rows inserted or updated since
+then (``upserted``) and the ids deleted since then (``deleted``).
+Requires migrations/SETUP_DELTA_SYNC.sql.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from auth import get_current_user_id
+from budgets import _row_to_budget, _spent_by_budget
+from database import get_db_connection
+from goals import _available_balance_minor
+from services.delta_sync import (
+    SYNC_DOMAINS,
+    decode_sync_token,
+    encode_sync_token,
+    token_expired,
+)
+from services.money import from_minor
+from transactions import _row_to_transaction
+
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+# Column lists match the corresponding list endpoints.
+_QUERIES = {
+    "transactions": """
+        SELECT id, user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at
+        FROM transactions
+        WHERE user_id = %s AND (%s OR change_xid >= %s::text::xid8)
+        ORDER BY id;
+    """,
+    "incomes": """
+        SELECT id, amount, income_type, source, note, received_date, month, year, created_at
+        FROM incomes
+        WHERE user_id = %s AND (%s OR change_xid >= %s::text::xid8)
+        ORDER BY id;
+    """,
+    "budgets": """
+        SELECT id, user_id, category, budget_type, amount, start_date, alert_threshold, custom_category_name, created_at, updated_at
+        FROM budgets
+        WHERE user_id = %s AND (%s OR change_xid >= %s::text::xid8)
+        ORDER BY id;
+    """,
+    "goals": """
+        SELECT id, user_id, name, category, target_amount, current_amount, deadline, notes, created_at, updated_at
+        FROM goals
+        WHERE user_id = %s AND (%s OR change_xid >= %s::text::xid8)
+        ORDER BY id;
+    """,
+}
+
+
+def _row_to_income(row, user_id: str) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "user_id": user_id,
+        "amount": from_minor(row[1]),
+        "income_type": row[2],
+        "source": row[3],
+        "note": row[4],
+        "received_date": row[5].isoformat() if row[5] else None,
+        "month": row[6],
+        "year": row[7],
+        "created_at": row[8].isoformat() if row[8] else None,
+    }
+
+
+def _row_to_goal(row) -> Dict[str, Any]:
+    return {
+        "id": str(row[0]),
+        "user_id": row[1],
+        "name": row[2],
+        "category": row[3],
+        "target_amount": from_minor(row[4]),
+        "current_amount": from_minor(row[5]),
+        "deadline": row[6].isoformat() if row[6] else None,
+        "notes": row[7],
+        "created_at": row[8].isoformat() if row[8] else None,
+        "updated_at": row[9].isoformat() if row[9] else None,
+    }
+
+
+def _serialize(domain: str, row, user_id: str, spent: Dict[int, int]) -> Dict[str, Any]:
+    if domain == "transactions":
+        return _row_to_transaction(row)
+    if domain == "incomes":
+        return _row_to_income(row, user_id)
+    if domain == "budgets":
+        budget = _row_to_budget(row)
+        budget["spent"] = from_minor(spent.get(row[0], 0))
+        return budget
+    return _row_to_goal(row)
+
+
+def _deleted_id(domain: str, row_id: str):
+    return row_id if domain == "goals" else int(row_id)
+
+
+@router.get("")
+def sync_changes(
+    since: Optional[str] = Query(None, description="Token from the previous sync"),
+    user_id: str = Depends(get_current_user_id),
+):
+    full = since is None
+    xmin = 0
+    if since is not None:
+        try:
+            xmin, issued_at = decode_sync_token(since)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        # Tombstones may have been purged: fall back to a full snapshot.
+        full = token_expired(issued_at)
+
+    conn = get_db_connection()
+    try:
+        # One snapshot for every read, so the new token matches what was returned.
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text;")
+            next_xmin = int(cur.fetchone()[0])
+
+            deleted: Dict[str, List[Any]] = {domain: [] for domain in SYNC_DOMAINS}
+            if not full:
+                cur.execute(
+                    """
+                    SELECT domain, row_id
+                    FROM deleted_rows
+                    WHERE user_id = %s AND change_xid >= %s::text::xid8
+                    ORDER BY change_xid;
+                    """,
+                    (user_id, str(xmin)),
+                )
+                for domain, row_id in cur.fetchall():
+                    deleted[domain].append(_deleted_id(domain, row_id))
+
+            rows: Dict[str, List[tuple]] = {}
+            for domain in ("transactions", "incomes", "goals"):
+                cur.execute(_QUERIES[domain], (user_id, full, str(xmin)))
+                rows[domain] = cur.fetchall()
+            # Spent amounts depend on transactions, so send every budget when they changed.
+            transactions_changed = bool(rows["transactions"] or deleted["transactions"])
+            cur.execute(_QUERIES["budgets"], (user_id, full or transactions_changed, str(xmin)))
+            rows["budgets"] = cur.fetchall()
+            spent = _spent_by_budget(cur, user_id, [row[0] for row in rows["budgets"]])
+            # Goals carry the available balance, derived from income and expenses.
+            balance = None
+            if full or any(rows[domain] or deleted[domain] for domain in ("transactions", "incomes", "goals")):
+                balance = _available_balance_minor(cur, user_id)
+        conn.commit()
+
+        response: Dict[str, Any] = {"token": encode_sync_token(next_xmin), "full": full}
+        for domain in SYNC_DOMAINS:
+            response[domain] = {
+                "upserted": [_serialize(domain, row, user_id, spent) for row in rows[domain]],
+                "deleted": deleted[domain],
+            }
+        if balance is not None:
+            response["available_balance"] = from_minor(balance)
+        return response
+    except HTTPException:
+        raise
+    except Exception as exc:  # pragma: no cover - runtime guard
+        raise HTTPException(status_code=500, detail=f"Failed to sync changes: {exc}") from exc
+    finally:
+        conn.close()
@@ -0,0 +1,211 @@
+"""Robust spending-anomaly detection per user and category.
+
+Two kinds of anomaly are reported:
+
+* **Transactions** whose amount is far above what the user normally spends
+  in that category. Scores are robust z-scores of log amounts, so one
+  ₹50k purchase stands out against a history of ₹2k ones, and an outlier
+  in the history does not move the baseline.
+* **Category-months** whose total is far from the category's baseline.
+  The baseline is the median of the same calendar month in earlier years
+  when there are enough of them (seasonal spend such as festivals or
+  annual renewals), otherwise the median month for the category.
+
+Dispersion is the median absolute deviation (MAD) scaled to match a
+standard deviation. Every statistic is computed with NumPy sorts and
+reductions over the whole input, so a batch of all users costs the same
+passes as a single user.
+"""
+
+import warnings
+from datetime import date
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.money import from_minor
+
+
+# MAD * 1.4826 estimates the standard deviation for normally distributed data.
+MAD_SCALE = 1.4826
+# Robust z-score above which a value is flagged (Iglewicz & Hoaglin).
+SCORE_THRESHOLD = 3.5
+# History needed before a category is scored at all.
+MIN_CATEGORY_TRANSACTIONS = 5
+MIN_CATEGORY_MONTHS = 4
+# Same-calendar-month observations needed for a seasonal baseline, and how
+# many years back to look (also bounds the memory of the seasonal stack).
+MIN_SEASONAL_YEARS = 2
+MAX_SEASONAL_YEARS = 3
+# Floors on dispersion, so a category with identical amounts does not flag a 1% change:
+# 10% in log space for transactions, 10% of the baseline for months.
+MIN_LOG_MAD = np.log(1.1)
+MIN_MONTH_MAD_RATIO = 0.1
+
+# (txn_id, category, amount_minor, txn_date) for one user.
+ExpenseRow = Tuple[Any, Optional[str], int, date]
+# (user_id, txn_id, category, amount_minor, txn_date) for batch mode.
+UserExpenseRow = Tuple[Hashable, Any, Optional[str], int, date]
+
+
+def group_median(values: np.ndarray, groups: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Median of ``values`` per group id, and the group sizes (empty groups get NaN)."""
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    medians = np.full(n_groups, np.nan)
+    present = counts > 0
+    lower = starts[present] + (counts[present] - 1) // 2
+    upper = starts[present] + counts[present] // 2
+    medians[present] = (sorted_values[lower] + sorted_values[upper]) / 2
+    return medians, counts
+
+
+def _robust_scores(values: np.ndarray, baseline: np.ndarray, mad: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (values - baseline) / (MAD_SCALE * mad)
+
+
+def _seasonal_baseline(totals: np.ndarray, position: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Median and count of the same calendar month in earlier years, per cell.
+
+    ``totals`` holds every group's months end to end and ``position`` is each
+    cell's month index within its group, so the cell ``12 * k`` back belongs
+    to the same group exactly when ``position >= 12 * k``.
+    """
+    history = np.full((MAX_SEASONAL_YEARS, len(totals)), np.nan)
+    for years_back in range(1, MAX_SEASONAL_YEARS + 1):
+        lag = 12 * years_back
+        cells = np.flatnonzero(position >= lag)
+        history[years_back - 1, cells] = totals[cells - lag]
+    return np.nanmedian(history, axis=0), np.sum(~np.isnan(history), axis=0)
+
+
+def detect_anomalies(
+    rows: Iterable[ExpenseRow],
+    as_of: Optional[date] = None,
+    threshold: float = SCORE_THRESHOLD,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Transaction and category-month anomalies in one user's expenses."""
+    batch = detect_anomalies_by_user(((None, *row) for row in rows), as_of=as_of, threshold=threshold)
+    return batch.get(None, {"transactions": [], "category_months": []})
+
+
+def detect_anomalies_by_user(
+    rows: Iterable[UserExpenseRow],
+    as_of: Optional[date] = None,
+    threshold: float = SCORE_THRESHOLD,
+) -> Dict[Hashable, Dict[str, List[Dict[str, Any]]]]:
+    """Batch mode: ``{user_id: {"transactions": [...], "category_months": [...]}}``."""
+    as_of = as_of or date.today()
+    groups: Dict[Tuple[Hashable, str], int] = {}
+    users: Dict[Hashable, int] = {}
+    kept: List[Sequence] = []
+    codes: List[int] = []
+    user_codes: List[int] = []
+    amounts: List[int] = []
+    months: List[int] = []
+    for row in rows:
+        user_id, _txn_id, category, amount, txn_date = row
+        if amount is None or amount <= 0 or txn_date is None:
+            continue
+        codes.append(groups.setdefault((user_id, category or "Uncategorized"), len(groups)))
+        user_codes.append(users.setdefault(user_id, len(users)))
+        amounts.append(int(amount))
+        months.append(txn_date.year * 12 + txn_date.month - 1)
+        kept.append(row)
+
+    results: Dict[Hashable, Dict[str, List[Dict[str, Any]]]] = {}
+    if not kept:
+        return results
+
+    code_arr = np.asarray(codes, dtype=np.int64)
+    amount_arr = np.asarray(amounts, dtype=np.int64)
+    month_arr = np.asarray(months, dtype=np.int64)
+    n_groups = len(groups)
+    group_keys = {code: key for key, code in groups.items()}
+
+    def bucket(user_id):
+        return results.setdefault(user_id, {"transactions": [], "category_months": []})
+
+    # ---- Transactions: robust z-score of log(amount) within (user, category).
+    log_amounts = np.log(amount_arr)
+    log_median, counts = group_median(log_amounts, code_arr, n_groups)
+    deviations = np.abs(log_amounts - log_median[code_arr])
+    log_mad, _ = group_median(deviations, code_arr, n_groups)
+    log_mad = np.maximum(log_mad, MIN_LOG_MAD)
+    txn_scores = _robust_scores(log_amounts, log_median[code_arr], log_mad[code_arr])
+    flagged = (counts[code_arr] >= MIN_CATEGORY_TRANSACTIONS) & (txn_scores > threshold)
+
+    for index in np.flatnonzero(flagged):
+        user_id, txn_id, _category, amount, txn_date = kept[index]
+        typical = float(np.exp(log_median[code_arr[index]]))
+        bucket(user_id)["transactions"].append({
+            "id": txn_id,
+            "category": group_keys[int(code_arr[index])][1],
+            "amount": from_minor(int(amount)),
+            "date": txn_date.isoformat(),
+            "typical_amount": from_minor(int(round(typical))),
+            "times_typical": round(amount / typical, 1),
+            "score": round(float(txn_scores[index]), 2),
+        })
+
+    # ---- Category-months: every month from each group's first month to its user's
+    # latest month (months with no spend count as zero), with the groups laid end to
+    # end. Each group only takes the cells of its own span, so one user's old row
+    # lengthens that group alone rather than widening a matrix shared by all.
+    first_month = np.full(n_groups, np.iinfo(np.int64).max)
+    np.minimum.at(first_month, code_arr, month_arr)
+    user_arr = np.asarray(user_codes, dtype=np.int64)
+    user_last = np.full(len(users), np.iinfo(np.int64).min)
+    np.maximum.at(user_last, user_arr, month_arr)
+    group_user = np.empty(n_groups, dtype=np.int64)
+    group_user[code_arr] = user_arr
+    lengths = user_last[group_user] - first_month + 1
+    offsets = np.cumsum(lengths) - lengths
+
+    cell_group = np.repeat(np.arange(n_groups), lengths)
+    position = np.arange(int(lengths.sum())) - offsets[cell_group]
+    cell_month = first_month[cell_group] + position
+    totals = np.zeros(len(cell_group))
+    np.add.at(totals, offsets[code_arr] + month_arr - first_month[code_arr], amount_arr)
+
+    month_median, _ = group_median(totals, cell_group, n_groups)
+    month_mad, _ = group_median(np.abs(totals - month_median[cell_group]), cell_group, n_groups)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # nanmedian of cells without history
+        seasonal_median, seasonal_count = _seasonal_baseline(totals, position)
+
+    use_seasonal = seasonal_count >= MIN_SEASONAL_YEARS
+    baseline = np.where(use_seasonal, seasonal_median, month_median[cell_group])
+    mad = np.maximum(month_mad[cell_group], MIN_MONTH_MAD_RATIO * np.abs(baseline))
+    month_scores = _robust_scores(totals, baseline, mad)
+
+    current_month = as_of.year * 12 + as_of.month - 1
+    complete = cell_month < current_month
+    eligible = (lengths[cell_group] >= MIN_CATEGORY_MONTHS) & (mad > 0)
+    # The current month is still in progress, so it can only be flagged high.
+    high = eligible & (month_scores > threshold)
+    low = eligible & complete & (month_scores < -threshold)
+
+    for cell in np.flatnonzero(high | low):
+        user_id, category = group_keys[int(cell_group[cell])]
+        year, month = divmod(int(cell_month[cell]), 12)
+        amount = float(totals[cell])
+        expected = float(baseline[cell])
+        bucket(user_id)["category_months"].append({
+            "category": category,
+            "period": f"{year:04d}-{month + 1:02d}",
+            "amount": from_minor(int(amount)),
+            "baseline": from_minor(int(round(expected))),
+            "seasonal": bool(use_seasonal[cell]),
+            "type": "High Spending" if high[cell] else "Low Spending",
+            "deviation_percentage": round((amount - expected) / expected * 100, 2) if expected else None,
+            "score": round(float(month_scores[cell]), 2),
+        })
+
+    for found in results.values():
+        found["transactions"].sort(key=lambda item: (item["date"], item["score"]), reverse=True)
+        found["category_months"].sort(key=lambda item: (item["period"], item["score"]), reverse=True)
+    return results
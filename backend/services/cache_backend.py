@@ -0,0 +1,341 @@
+"""Pluggable key-value backends for the result caches.
+
+``InProcessBackend`` keeps everything in this process and is the default.
+``RedisBackend`` talks the Redis protocol (RESP2) over a plain socket, so
+several uvicorn workers can share one cache tier. Any Redis-compatible
+server works, including the stand-in in :mod:`services.resp_server`.
+
+Both backends also carry invalidation broadcasts. A cache that drops a
+user's entries publishes a message, and every other worker subscribed to
+the channel drops its local copies too.
+
+Select the backend with ``CACHE_URL`` (``redis://host:port/db``). When it
+is unset, the in-process backend is used.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+
+INVALIDATION_CHANNEL = "wealthwise:invalidate"
+
+InvalidationHandler = Callable[[str, Optional[List[str]]], None]
+
+
+class CacheBackendError(Exception):
+    """Raised when the shared cache cannot be reached or replies with an error."""
+
+
+class CacheBackend:
+    """Interface shared by all backends.
+
+    ``shared`` tells callers whether values stored here are visible to other
+    processes (and therefore worth a network round trip).
+    """
+
+    shared = False
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, InvalidationHandler] = {}
+        self._subscribed = False
+        self._handler_lock = threading.Lock()
+
+    # -- key/value -------------------------------------------------------
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        """Set ``key`` only if it does not exist; returns whether it was set."""
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def delete(self, keys: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    # -- pub/sub ---------------------------------------------------------
+
+    def publish(self, channel: str, message: bytes) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    # -- invalidation broadcast -----------------------------------------
+
+    def on_invalidate(self, name: str, handler: InvalidationHandler) -> None:
+        """Run ``handler(user_id, domains)`` when another worker invalidates ``name``."""
+        with self._handler_lock:
+            self._handlers[name] = handler
+            if self._subscribed:
+                return
+            self._subscribed = True
+        self.subscribe(INVALIDATION_CHANNEL, self._dispatch)
+
+    def broadcast_invalidation(self, name: str, user_id: str, domains: Optional[Iterable[str]] = None) -> None:
+        message = {
+            "origin": self.origin,
+            "cache": name,
+            "user_id": user_id,
+            "domains": sorted(domains) if domains is not None else None,
+        }
+        try:
+            self.publish(INVALIDATION_CHANNEL, json.dumps(message).encode())
+        except CacheBackendError as exc:
+            print(f">>> CACHE: invalidation broadcast failed: {exc}")
+
+    def _dispatch(self, payload: bytes) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == self.origin:
+            return  # Already applied locally before publishing.
+        handler = self._handlers.get(message.get("cache"))
+        if handler is not None:
+            handler(message["user_id"], message.get("domains"))
+
+
+class InProcessBackend(CacheBackend):
+    """Dictionary backend; pub/sub only reaches this process."""
+
+    def __init__(self):
+        super().__init__()
+        self._data: Dict[str, tuple] = {}
+        self._subscribers: Dict[str, List[Callable[[bytes], None]]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        with self._lock:
+            values = []
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and entry[0] is not None and entry[0] <= now:
+                    del self._data[key]
+                    entry = None
+                values.append(entry[1] if entry else None)
+            return values
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+
+    def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                return False
+            self._data[key] = (now + ttl_seconds, value)
+            return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            _, value = self._data.get(key, (None, b"0"))
+            new_value = int(value) + 1
+            self._data[key] = (None, str(new_value).encode())
+            return new_value
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def publish(self, channel: str, message: bytes) -> None:
+        for callback in list(self._subscribers.get(channel, [])):
+            callback(message)
+
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        self._subscribers.setdefault(channel, []).append(callback)
+
+
+# --- RESP client ---------------------------------------------------------------
+
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(reader):
+    """Parse one RESP2 reply from a buffered binary file object."""
+    line = reader.readline()
+    if not line:
+        raise CacheBackendError("connection closed by cache server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        raise CacheBackendError(rest.decode(errors="replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        if count < 0:
+            return None
+        return [read_reply(reader) for _ in range(count)]
+    raise CacheBackendError(f"unexpected reply type {kind!r}")
+
+
+class _RespConnection:
+    def __init__(self, host: str, port: int, db: int, timeout: Optional[float]):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile("rb")
+        if db:
+            self.call("SELECT", db)
+
+    def call(self, *args):
+        self.sock.sendall(encode_command(*args))
+        return read_reply(self.reader)
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisBackend(CacheBackend):
+    """Minimal Redis client: one connection per thread plus a subscriber thread."""
+
+    shared = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0, timeout: float = 0.5):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self._local = threading.local()
+        self._subscriptions: Dict[str, List[Callable[[bytes], None]]] = {}
+        self._subscriber: Optional[threading.Thread] = None
+        self._sub_conn: Optional[_RespConnection] = None
+        self._closed = False
+
+    def _call(self, *args):
+        conn = getattr(self._local, "conn", None)
+        try:
+            if conn is None:
+                conn = _RespConnection(self.host, self.port, self.db, self.timeout)
+                self._local.conn = conn
+            return conn.call(*args)
+        except (OSError, CacheBackendError) as exc:
+            if conn is not None:
+                conn.close()
+            self._local.conn = None
+            if isinstance(exc, CacheBackendError):
+                raise
+            raise CacheBackendError(str(exc)) from exc
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        return self._call("MGET", *keys)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._call("SET", key, value, "PX", max(1, int(ttl_seconds * 1000)))
+
+    def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        return self._call("SET", key, value, "PX", max(1, int(ttl_seconds * 1000)), "NX") is not None
+
+    def incr(self, key: str) -> int:
+        return self._call("INCR", key)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            self._call("DEL", *keys)
+
+    def publish(self, channel: str, message: bytes) -> None:
+        self._call("PUBLISH", channel, message)
+
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        is_new = channel not in self._subscriptions
+        self._subscriptions.setdefault(channel, []).append(callback)
+        if is_new and self._sub_conn is not None:
+            try:
+                self._sub_conn.sock.sendall(encode_command("SUBSCRIBE", channel))
+            except OSError:
+                pass  # The listener reconnects and subscribes to every channel.
+        if self._subscriber is None:
+            self._subscriber = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+            self._subscriber.start()
+
+    def _listen(self) -> None:
+        backoff = 0.5
+        while not self._closed:
+            conn = None
+            try:
+                # No read timeout: the subscriber blocks until a message arrives.
+                conn = _RespConnection(self.host, self.port, self.db, None)
+                conn.sock.sendall(encode_command("SUBSCRIBE", *self._subscriptions))
+                self._sub_conn = conn
+                backoff = 0.5
+                while not self._closed:
+                    reply = read_reply(conn.reader)
+                    if isinstance(reply, list) and reply and reply[0] == b"message":
+                        channel = reply[1].decode()
+                        for callback in self._subscriptions.get(channel, []):
+                            try:
+                                callback(reply[2])
+                            except Exception as exc:  # pragma: no cover - keep listening
+                                print(f">>> CACHE: invalidation handler failed: {exc}")
+            except (OSError, CacheBackendError) as exc:
+                if not self._closed:
+                    print(f">>> CACHE: subscriber disconnected ({exc}); retrying in {backoff:.1f}s")
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+            finally:
+                self._sub_conn = None
+                if conn is not None:
+                    conn.close()
+
+    def close(self) -> None:
+        self._closed = True
+        if self._sub_conn is not None:
+            self._sub_conn.close()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def cache_backend_from_url(url: Optional[str]) -> CacheBackend:
+    """Build a backend from ``redis://host:port/db`` or ``memory://`` (default)."""
+    if not url or url.startswith("memory://"):
+        return InProcessBackend()
+    parsed = urlparse(url)
+    if parsed.scheme != "redis":
+        raise ValueError(f"Unsupported CACHE_URL scheme: {parsed.scheme}")
+    db = int(parsed.path.lstrip("/") or 0)
+    return RedisBackend(parsed.hostname or "127.0.0.1", parsed.port or 6379, db)
+
+
+cache_backend = cache_backend_from_url(os.getenv("CACHE_URL"))
@@ -0,0 +1,99 @@
+"""Normalized category labels and their ids in the ``categories`` table.
+
+Transactions and budgets store the user's free-text category alongside a
+``category_id`` that points at the normalized label ("groceries" and
+"Restaurant" both resolve to "Food"). Labels are resolved once, when a row
+is written, so reports can group by the integer key. The SQL function
+``category_label`` in migrations/SETUP_CATEGORIES.sql applies the same
+rules for the backfill.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+
+# Category normalization map
+CATEGORY_MAP = {
+    'food': 'Food', 'restaurant': 'Food', 'groceries': 'Food',
+    'transport': 'Transport', 'travel': 'Transport', 'taxi': 'Transport', 'uber': 'Transport',
+    'healthcare': 'Healthcare', 'medical': 'Healthcare', 'doctor': 'Healthcare',
+    'entertainment': 'Entertainment', 'movie': 'Entertainment', 'games': 'Entertainment',
+    'shopping': 'Shopping', 'clothes': 'Shopping', 'fashion': 'Shopping',
+    'bills': 'Bills', 'utilities': 'Bills', 'electricity': 'Bills',
+    'education': 'Education', 'school': 'Education', 'course': 'Education',
+    'personal': 'Personal', 'gifts': 'Personal',
+}
+
+
+def normalize_category(cat_name: Optional[str]) -> str:
+    """Normalize category name to standard format."""
+    cat_name = str(cat_name).strip() if cat_name else ""
+    if not cat_name:
+        return "Uncategorized"
+
+    # Event-specific categories (containing numbers) are grouped as Personal.
+    if any(char.isdigit() for char in cat_name):
+        return 'Personal'
+
+    return CATEGORY_MAP.get(cat_name.lower(), cat_name.title())
+
+
+class CategoryDirectory:
+    """Process-wide cache of ``categories.name -> id``.
+
+    Labels are never deleted or renamed, so a committed id can be cached
+    forever. An id that is not committed yet is never cached: the
+    transaction that inserted it (usually the caller's) may still roll
+    back, and Postgres shows that transaction its own rows.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, cur, raw_category: Optional[str]) -> int:
+        """Return the category_id for ``raw_category``, creating the label if needed."""
+        label = normalize_category(raw_category)
+        category_id = self._ids.get(label)
+        if category_id is not None:
+            return category_id
+
+        # ``own`` is true when the visible row version was written by this
+        # transaction, i.e. the label was inserted earlier in it.
+        cur.execute(
+            """
+            SELECT id, xmin::text = (pg_current_xact_id_if_assigned()::text::bigint %% 4294967296)::text
+            FROM categories
+            WHERE name = %s;
+            """,
+            (label,),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            category_id, own = row
+            if not own:
+                with self._lock:
+                    self._ids[label] = category_id
+            return category_id
+
+        # DO UPDATE (rather than DO NOTHING) so RETURNING yields the id on conflict too.
+        cur.execute(
+            """
+            INSERT INTO categories (name) VALUES (%s)
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+            RETURNING id;
+            """,
+            (label,),
+        )
+        return cur.fetchone()[0]
+
+    def resolve_many(self, cur, raw_categories: Iterable[Optional[str]]) -> Dict[Optional[str], int]:
+        """Resolve each distinct raw category once; returns {raw: category_id}."""
+        return {raw: self.resolve(cur, raw) for raw in set(raw_categories)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+
+category_directory = CategoryDirectory()
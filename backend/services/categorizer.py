@@ -0,0 +1,237 @@
+"""Transaction categorization engine.
+
+Combines three layers, tried in order:
+
+1. A per-user merchant -> category map learned from the user's own
+   categorized transactions (exact match on the normalized description).
+2. The built-in keyword rules, compiled into a single regex.
+3. A small multinomial naive Bayes model over description tokens, trained
+   on the same per-user history.
+
+Per-user models are cached in memory with a TTL and rebuilt lazily from a
+``history_loader`` callable, so this module has no database dependency.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.cache_backend import CacheBackend, cache_backend
+
+
+# Order matters: when several categories match, the earliest one wins.
+CATEGORY_KEYWORDS = {
+    "groceries": ["grocery", "supermarket", "whole foods", "kroger", "safeway", "produce", "dairy", "meat", "noodles", "sugar", "salt", "soap", "bazaar"],
+    "shopping": ["mall", "retail", "shop", "store", "amazon", "ebay", "clothes", "apparel", "bazaar", "plaza"],
+    "dining": ["restaurant", "cafe", "coffee", "pizza", "burger", "bistro", "bar"],
+    "transportation": ["fuel", "gas", "petrol", "uber", "lyft", "taxi", "parking", "toll"],
+    "entertainment": ["movie", "cinema", "theater", "concert", "game", "spotify", "netflix"],
+    "utilities": ["electric", "water", "internet", "phone", "gas bill", "utility"],
+    "health": ["pharmacy", "doctor", "hospital", "medical", "clinic", "health"],
+}
+
+# (description, category, count) rows for a single user.
+HistoryLoader = Callable[[str], Iterable[Tuple[Optional[str], Optional[str], int]]]
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def normalize_merchant(text: Optional[str]) -> str:
+    """Reduce a description to a stable merchant key ("NETFLIX.COM 649" -> "netflix com")."""
+    if not text:
+        return ""
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+
+class KeywordMatcher:
+    """All keyword rules compiled into one regex.
+
+    A zero-width lookahead finds every (possibly overlapping) keyword in a
+    single pass, and the lowest category priority wins, which matches the
+    old nested substring loop exactly.
+    """
+
+    def __init__(self, category_keywords: Dict[str, List[str]]):
+        self._priority: Dict[str, Tuple[int, str]] = {}
+        for priority, (category, keywords) in enumerate(category_keywords.items()):
+            for keyword in keywords:
+                self._priority.setdefault(keyword.lower(), (priority, category))
+        # At any one position the first listed alternative wins, so order by priority.
+        ordered = sorted(self._priority, key=lambda keyword: (self._priority[keyword][0], -len(keyword)))
+        alternation = "|".join(re.escape(keyword) for keyword in ordered)
+        self._pattern = re.compile(f"(?=({alternation}))") if alternation else None
+
+    def match(self, text: Optional[str]) -> Optional[str]:
+        if not text or self._pattern is None:
+            return None
+        best: Optional[Tuple[int, str]] = None
+        for found in self._pattern.finditer(text.lower()):
+            candidate = self._priority[found.group(1)]
+            if best is None or candidate[0] < best[0]:
+                best = candidate
+                if best[0] == 0:
+                    break
+        return best[1] if best else None
+
+
+class UserCategoryModel:
+    """Merchant map plus naive Bayes token model for one user."""
+
+    def __init__(self, history: Iterable[Tuple[Optional[str], Optional[str], int]]):
+        merchant_votes: Dict[str, Counter] = defaultdict(Counter)
+        self.token_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.category_docs: Counter = Counter()
+        self.vocabulary = set()
+
+        for description, category, count in history:
+            if not description or not category:
+                continue
+            count = int(count or 1)
+            key = normalize_merchant(description)
+            if not key:
+                continue
+            merchant_votes[key][category] += count
+            self.category_docs[category] += count
+            for token in key.split():
+                self.token_counts[category][token] += count
+                self.vocabulary.add(token)
+
+        self.merchant_map = {
+            key: votes.most_common(1)[0][0] for key, votes in merchant_votes.items()
+        }
+        self.total_docs = sum(self.category_docs.values())
+        self._token_totals = {
+            category: sum(tokens.values()) for category, tokens in self.token_counts.items()
+        }
+
+    def lookup(self, text: Optional[str]) -> Optional[str]:
+        return self.merchant_map.get(normalize_merchant(text))
+
+    def predict(self, text: Optional[str]) -> Tuple[Optional[str], float]:
+        """Return (category, posterior) from the token model, or (None, 0.0)."""
+        tokens = [token for token in normalize_merchant(text).split() if token in self.vocabulary]
+        if not tokens or len(self.category_docs) < 2:
+            return None, 0.0
+
+        vocab_size = len(self.vocabulary)
+        scores = {}
+        for category, docs in self.category_docs.items():
+            counts = self.token_counts[category]
+            denominator = self._token_totals.get(category, 0) + vocab_size
+            score = math.log(docs / self.total_docs)
+            for token in tokens:
+                score += math.log((counts[token] + 1) / denominator)
+            scores[category] = score
+
+        top = max(scores.values())
+        norm = sum(math.exp(score - top) for score in scores.values())
+        category = max(scores, key=scores.get)
+        return category, 1.0 / norm
+
+
+class CategoryEngine:
+    """Thread-safe categorizer with an LRU/TTL cache of per-user models."""
+
+    def __init__(
+        self,
+        category_keywords: Dict[str, List[str]] = CATEGORY_KEYWORDS,
+        ttl_seconds: float = 600.0,
+        max_users: int = 1024,
+        min_confidence: float = 0.6,
+        backend: Optional[CacheBackend] = None,
+    ):
+        self.keywords = KeywordMatcher(category_keywords)
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.min_confidence = min_confidence
+        self._models: "OrderedDict[str, Tuple[float, UserCategoryModel]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.backend = backend
+        if backend is not None:
+            backend.on_invalidate("categories", lambda user_id, _domains: self.invalidate_local(user_id))
+
+    def _model_for(self, user_id: Optional[str], history_loader: Optional[HistoryLoader]) -> Optional[UserCategoryModel]:
+        if not user_id:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            cached = self._models.get(user_id)
+            if cached and now - cached[0] < self.ttl_seconds:
+                self._models.move_to_end(user_id)
+                return cached[1]
+        if history_loader is None:
+            return None
+
+        model = UserCategoryModel(history_loader(user_id))
+        with self._lock:
+            self._models[user_id] = (now, model)
+            self._models.move_to_end(user_id)
+            while len(self._models) > self.max_users:
+                self._models.popitem(last=False)
+        return model
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user's cached model here and in every other worker."""
+        self.invalidate_local(user_id)
+        if self.backend is not None:
+            self.backend.broadcast_invalidation("categories", user_id)
+
+    def invalidate_local(self, user_id: str) -> None:
+        """Drop a user's cached model so the next call relearns from history."""
+        with self._lock:
+            self._models.pop(user_id, None)
+
+    def _classify(self, text: Optional[str], model: Optional[UserCategoryModel]) -> Optional[str]:
+        if model is not None:
+            learned = model.lookup(text)
+            if learned:
+                return learned
+        matched = self.keywords.match(text)
+        if matched:
+            return matched
+        if model is not None:
+            category, confidence = model.predict(text)
+            if category and confidence >= self.min_confidence:
+                return category
+        return None
+
+    def guess(
+        self,
+        text: Optional[str],
+        user_id: Optional[str] = None,
+        history_loader: Optional[HistoryLoader] = None,
+    ) -> Optional[str]:
+        """Guess a category for one description or receipt text."""
+        return self._classify(text, self._model_for(user_id, history_loader))
+
+    def guess_receipt(
+        self,
+        vendor: Optional[str],
+        text: Optional[str],
+        user_id: Optional[str] = None,
+        history_loader: Optional[HistoryLoader] = None,
+    ) -> Optional[str]:
+        """Guess a receipt's category from its vendor line, then from the whole text.
+
+        The learned merchant map matches whole descriptions, so it can only
+        recognise the vendor, never the full OCR text.
+        """
+        model = self._model_for(user_id, history_loader)
+        return self._classify(vendor, model) or self._classify(text, model)
+
+    def categorize_many(
+        self,
+        texts: Iterable[Optional[str]],
+        user_id: Optional[str] = None,
+        history_loader: Optional[HistoryLoader] = None,
+    ) -> List[Optional[str]]:
+        """Categorize a batch of descriptions with a single model lookup."""
+        model = self._model_for(user_id, history_loader)
+        return [self._classify(text, model) for text in texts]
+
+
+# Shared engine used by the transaction routes.
+category_engine = CategoryEngine(backend=cache_backend)
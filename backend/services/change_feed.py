@@ -0,0 +1,167 @@
+"""Postgres LISTEN/NOTIFY change feed.
+
+Database triggers (migrations/SETUP_CHANGE_FEED.sql) publish one small JSON
+event per user and statement whenever transactions, incomes, budgets or
+goals change, whoever made the change. :class:`ChangeFeed` keeps a
+dedicated connection LISTENing on the channel in a background thread and
+hands parsed :class:`ChangeEvent` objects to its subscribers. Nothing is
+polled: the thread sleeps in ``select()`` until Postgres delivers a
+notification.
+
+Notifications sent while the listener is disconnected are lost. After it
+reconnects, ``resync`` callbacks run so subscribers can drop anything
+they might have missed.
+"""
+
+import json
+import select
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+CHANGE_CHANNEL = "wealthwise_changes"
+
+
+class ChangeEvent:
+    __slots__ = ("user_id", "domain", "op", "version", "ids")
+
+    def __init__(self, user_id: str, domain: str, op: str, version: Optional[int] = None, ids: Optional[List[int]] = None):
+        self.user_id = user_id
+        self.domain = domain
+        self.op = op
+        self.version = version
+        self.ids = ids
+
+    @classmethod
+    def from_payload(cls, payload: str) -> Optional["ChangeEvent"]:
+        try:
+            data = json.loads(payload)
+            return cls(data["user_id"], data["domain"], data["op"], data.get("version"), data.get("ids"))
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def to_dict(self) -> dict:
+        return {
+            "domain": self.domain,
+            "op": self.op,
+            "version": self.version,
+            "ids": self.ids,
+        }
+
+
+ChangeCallback = Callable[[ChangeEvent], None]
+
+
+class ChangeFeed:
+    """Background LISTEN loop fanning change events out to subscribers."""
+
+    def __init__(
+        self,
+        connect: Callable[[], object],
+        channel: str = CHANGE_CHANNEL,
+        poll_interval: float = 1.0,
+    ):
+        self.connect = connect
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._subscribers: List[ChangeCallback] = []
+        self._resync: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.connected = False
+        self.events = 0
+        self.reconnects = 0
+        self.last_event_at: Optional[float] = None
+
+    def subscribe(self, callback: ChangeCallback) -> Callable[[], None]:
+        """Register ``callback(event)``; returns a function that unregisters it."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def on_resync(self, callback: Callable[[], None]) -> None:
+        """Run ``callback()`` after a reconnect, when events may have been missed."""
+        self._resync.append(callback)
+
+    def dispatch(self, payload: str) -> None:
+        event = ChangeEvent.from_payload(payload)
+        if event is None:
+            print(f">>> CHANGE FEED: ignoring malformed payload {payload[:200]!r}")
+            return
+        self.events += 1
+        self.last_event_at = time.time()
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as exc:  # pragma: no cover - one bad subscriber must not stop the feed
+                print(f">>> CHANGE FEED: subscriber failed: {exc}")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        backoff = 0.5
+        first = True
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = self.connect()
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel};")
+                self.connected = True
+                backoff = 0.5
+                if not first:
+                    self.reconnects += 1
+                    for callback in list(self._resync):
+                        callback()
+                first = False
+                while not self._stopped.is_set():
+                    # Wakes on a notification or after poll_interval to check for stop().
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.dispatch(conn.notifies.pop(0).payload)
+            except Exception as exc:
+                if not self._stopped.is_set():
+                    print(f">>> CHANGE FEED: listener error ({exc}); reconnecting in {backoff:.1f}s")
+                    self._stopped.wait(backoff)
+                    backoff = min(backoff * 2, 30.0)
+            finally:
+                self.connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def stats(self) -> dict:
+        return {
+            "channel": self.channel,
+            "connected": self.connected,
+            "subscribers": len(self._subscribers),
+            "events": self.events,
+            "reconnects": self.reconnects,
+            "last_event_at": self.last_event_at,
+        }
@@ -0,0 +1,132 @@
+"""Dashboard widgets computed from one monthly aggregate of a user's data.
+
+:class:`MonthlySeries` is built from two small GROUP BY results: expenses
+and income transactions per (year, month, txn_type, category), and income
+rows per (year, month). Every home-page widget is derived from it in
+memory: all-time and monthly totals, category breakdowns, trend lines,
+budget spend and the AI insight inputs. None of them needs another scan
+of the transactions table.
+
+Totals are kept as integer paise (the database unit) and converted to
+rupees only when a widget value is returned.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.insights import summarize
+from services.money import from_minor
+
+
+YearMonth = Tuple[int, int]
+
+
+class MonthlySeries:
+    def __init__(
+        self,
+        txn_rows: Iterable[Tuple[int, int, str, Optional[str], int, int]],
+        income_rows: Iterable[Tuple[int, int, int]],
+    ):
+        # (year, month) -> txn_type -> category -> [total paise, count]
+        self.transactions: Dict[YearMonth, Dict[str, Dict[Optional[str], List[int]]]] = defaultdict(
+            lambda: defaultdict(dict)
+        )
+        for year, month, txn_type, category, total, count in txn_rows:
+            bucket = self.transactions[(int(year), int(month))][txn_type]
+            entry = bucket.setdefault(category, [0, 0])
+            entry[0] += int(total)
+            entry[1] += int(count)
+        self.incomes: Dict[YearMonth, int] = defaultdict(int)
+        for year, month, total in income_rows:
+            self.incomes[(int(year), int(month))] += int(total)
+
+    def _months(self, period: Optional[YearMonth]) -> List[YearMonth]:
+        return list(self.transactions) if period is None else [period]
+
+    def txn_total_minor(self, txn_type: str, period: Optional[YearMonth] = None) -> int:
+        return sum(
+            entry[0]
+            for key in self._months(period)
+            for entry in self.transactions.get(key, {}).get(txn_type, {}).values()
+        )
+
+    def txn_total(self, txn_type: str, period: Optional[YearMonth] = None) -> float:
+        return from_minor(self.txn_total_minor(txn_type, period))
+
+    def income_total_minor(self, period: Optional[YearMonth] = None) -> int:
+        if period is None:
+            return sum(self.incomes.values())
+        return self.incomes.get(period, 0)
+
+    def income_total(self, period: Optional[YearMonth] = None) -> float:
+        return from_minor(self.income_total_minor(period))
+
+    def expenses_by_category(self, period: Optional[YearMonth] = None) -> Dict[Optional[str], List[int]]:
+        """category -> [total paise, count] of expenses, all-time when period is None."""
+        merged: Dict[Optional[str], List[int]] = {}
+        for key in self._months(period):
+            for category, (total, count) in self.transactions.get(key, {}).get("expense", {}).items():
+                entry = merged.setdefault(category, [0, 0])
+                entry[0] += total
+                entry[1] += count
+        return merged
+
+    def category_expense(self, category: str, period: YearMonth) -> float:
+        entry = self.transactions.get(period, {}).get("expense", {}).get(category)
+        return from_minor(entry[0]) if entry else 0.0
+
+    def transaction_summary(self, period: Optional[YearMonth] = None) -> Dict:
+        """Same totals as GET /transactions/summary."""
+        by_category = sorted(self.expenses_by_category(period).items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "total_expense": self.txn_total("expense", period),
+            "total_income": self.txn_total("income", period),
+            "expenses_by_category": {category or "uncategorized": from_minor(total) for category, (total, _) in by_category},
+        }
+
+    def category_breakdown(self, period: Optional[YearMonth] = None) -> Dict:
+        """Same shape as GET /reports/breakdown/category-spending."""
+        rows = sorted(self.expenses_by_category(period).items(), key=lambda item: item[1][0], reverse=True)
+        total = sum(entry[0] for _, entry in rows)
+        breakdown = [
+            {
+                "category": category,
+                "total_amount": from_minor(amount),
+                "percentage": round(amount / total * 100, 2) if total > 0 else 0,
+                "transaction_count": count,
+                "average_transaction": round(from_minor(amount) / count, 2) if count else 0.0,
+            }
+            for category, (amount, count) in rows
+        ]
+        return {"breakdown": breakdown, "total_spent": from_minor(total)}
+
+    def savings_trend(self, months: Iterable[YearMonth]) -> List[Dict]:
+        """Income (from incomes) vs expense per month, with savings rate."""
+        trend = []
+        for period in months:
+            income = self.income_total(period)
+            expense = self.txn_total("expense", period)
+            net_savings = income - expense
+            trend.append({
+                "year": period[0],
+                "month": period[1],
+                "income": income,
+                "expense": expense,
+                "net_savings": net_savings,
+                "savings_rate_percentage": round(net_savings / income * 100, 2) if income > 0 else 0,
+            })
+        return trend
+
+    def insights(self, until: Optional[YearMonth] = None) -> Dict:
+        """Same figures as GET /reports/insights/summary for months up to ``until``."""
+        expense_rows = [
+            (year, month, category or "Uncategorized", total)
+            for (year, month), by_type in self.transactions.items()
+            if until is None or (year, month) <= until
+            for category, (total, _) in by_type.get("expense", {}).items()
+        ]
+        income_rows = [
+            (year, month, total) for (year, month), total in self.incomes.items()
+            if until is None or (year, month) <= until
+        ]
+        return summarize(expense_rows, income_rows)
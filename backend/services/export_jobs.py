@@ -0,0 +1,261 @@
+"""Background export jobs backed by a content-addressed artifact store.
+
+An artifact's key is a hash of (user, export params, data versions), so an
+export of unchanged data resolves to a file that already exists and is
+served without touching the database. Any change to the underlying
+tables bumps a data version and produces a new key. The job id *is* the
+key: every worker can answer status and download requests for a finished
+artifact, while queued/running state is tracked in the process that
+builds it.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Tuple, Union
+
+
+QUEUED = "queued"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+def artifact_key(user_id: str, params: Dict[str, Any], versions: Dict[str, int]) -> str:
+    """Content address for an export of ``params`` at the given data versions."""
+    raw = json.dumps(
+        {"user": user_id, "params": params, "versions": versions},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ExportStore:
+    """Artifacts on local disk under ``root/<user hash>/<key>.<extension>``."""
+
+    def __init__(self, root: str, retention_seconds: float = 24 * 3600):
+        self.root = root
+        self.retention_seconds = retention_seconds
+
+    def _user_dir(self, user_id: str) -> str:
+        return os.path.join(self.root, hashlib.sha1(user_id.encode()).hexdigest()[:16])
+
+    def find(self, user_id: str, key: str) -> Optional[str]:
+        """Path of the user's artifact ``key``, or None if it was never built or was pruned."""
+        user_dir = self._user_dir(user_id)
+        try:
+            names = os.listdir(user_dir)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if name.startswith(key + "."):
+                return os.path.join(user_dir, name)
+        return None
+
+    def write(self, user_id: str, key: str, extension: str, build: Callable[[BinaryIO], None]) -> str:
+        """Run ``build(fileobj)`` into a temp file and publish it atomically."""
+        user_dir = self._user_dir(user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=user_dir, prefix=".building-")
+        try:
+            with os.fdopen(fd, "wb") as fileobj:
+                build(fileobj)
+            path = os.path.join(user_dir, f"{key}.{extension}")
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return path
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete artifacts older than the retention window; returns how many were removed."""
+        cutoff = (now or time.time()) - self.retention_seconds
+        removed = 0
+        try:
+            user_dirs = os.listdir(self.root)
+        except FileNotFoundError:
+            return 0
+        for user_dir in user_dirs:
+            user_path = os.path.join(self.root, user_dir)
+            if not os.path.isdir(user_path):
+                continue
+            for name in os.listdir(user_path):
+                path = os.path.join(user_path, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+
+class ExportJob:
+    __slots__ = ("id", "user_id", "extension", "status", "error", "created_at", "finished_at", "path")
+
+    def __init__(self, job_id: str, user_id: str, extension: str, status: str = QUEUED, path: Optional[str] = None):
+        self.id = job_id
+        self.user_id = user_id
+        self.extension = extension
+        self.status = status
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = self.created_at if status == READY else None
+        self.path = path
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"id": self.id, "status": self.status, "format": self.extension}
+        if self.status == READY and self.path:
+            data["size"] = os.path.getsize(self.path)
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class ExportJobManager:
+    """Builds artifacts on a small thread pool, de-duplicating identical requests."""
+
+    def __init__(self, store: ExportStore, max_workers: int = 2, max_jobs: int = 1000):
+        self.store = store
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._cache_hits = 0
+        self._built = 0
+        self._failed = 0
+
+    def _ready_job(self, user_id: str, key: str) -> Optional[ExportJob]:
+        path = self.store.find(user_id, key)
+        if path is None:
+            return None
+        return ExportJob(key, user_id, path.rsplit(".", 1)[-1], status=READY, path=path)
+
+    def submit(self, user_id: str, key: str, extension: str, build: Callable[[BinaryIO], None]) -> ExportJob:
+        """Return the job for ``key``; starts a build only if no artifact or build exists."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.user_id == user_id and job.status in (QUEUED, RUNNING):
+                return job
+            ready = self._ready_job(user_id, key)
+            if ready is not None:
+                self._cache_hits += 1
+                return ready
+            job = ExportJob(key, user_id, extension)
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, build)
+        return job
+
+    def get(self, user_id: str, key: str) -> Optional[ExportJob]:
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is not None and job.user_id != user_id:
+            job = None
+        if job is not None and job.status in (QUEUED, RUNNING):
+            return job
+        # Finished artifacts are looked up on disk, so any worker can serve them.
+        ready = self._ready_job(user_id, key)
+        if ready is not None:
+            return ready
+        return job if job is not None and job.status == FAILED else None
+
+    def _run(self, job: ExportJob, build: Callable[[BinaryIO], None]) -> None:
+        job.status = RUNNING
+        try:
+            job.path = self.store.write(job.user_id, job.id, job.extension, build)
+            job.status = READY
+            with self._lock:
+                self._built += 1
+        except Exception as exc:
+            print(f">>> EXPORT: job {job.id[:12]} failed: {exc}")
+            job.error = str(exc)
+            job.status = FAILED
+            with self._lock:
+                self._failed += 1
+        finally:
+            job.finished_at = time.time()
+        try:
+            self.store.prune()
+        except OSError as exc:  # pragma: no cover - best effort housekeeping
+            print(f">>> EXPORT: prune failed: {exc}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            states = [job.status for job in self._jobs.values()]
+            return {
+                "queued": states.count(QUEUED),
+                "running": states.count(RUNNING),
+                "built": self._built,
+                "failed": self._failed,
+                "cache_hits": self._cache_hits,
+                "store": self.store.root,
+            }
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive (start, end).
+
+    Returns None when the header is absent or not a byte range (serve the
+    whole file). Multi-range requests are also answered with the whole file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, sep, end_text = header[len("bytes="):].strip().partition("-")
+    if not sep or not (start_text or end_text):
+        return None
+    try:
+        start = int(start_text) if start_text else None
+        end = int(end_text) if end_text else None
+    except ValueError:
+        return None
+    if start is None:
+        # Suffix range: the last ``end`` bytes.
+        if end == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - end), size - 1
+    if start >= size or (end is not None and start > end):
+        raise RangeNotSatisfiable(header)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def iter_file_range(
+    source: Union[str, BinaryIO], start: int, end: int, block_size: int = 64 * 1024,
+) -> Iterator[bytes]:
+    """Yield bytes ``start..end`` (inclusive) of a path or open binary file in blocks.
+
+    An open file is closed once the range has been read.
+    """
+    remaining = end - start + 1
+    with (open(source, "rb") if isinstance(source, str) else source) as fileobj:
+        fileobj.seek(start)
+        while remaining > 0:
+            data = fileobj.read(min(block_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+export_jobs = ExportJobManager(
+    ExportStore(
+        os.getenv("EXPORT_STORE_DIR") or os.path.join(tempfile.gettempdir(), "wealthwise-exports"),
+        retention_seconds=float(os.getenv("EXPORT_RETENTION_HOURS", "24")) * 3600,
+    ),
+    max_workers=int(os.getenv("EXPORT_WORKERS", "2")),
+)
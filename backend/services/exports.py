@@ -0,0 +1,360 @@
+"""Row normalization and streaming encoders shared by the export endpoints.
+
+The report endpoints own the SQL. This module turns database rows into
+export rows (normalized categories, cleaned descriptions, paise as
+two-place rupee Decimals) and encodes
+them chunk by chunk, so an export never has to be held in memory whole.
+
+CSV and XLSX are always available. Parquet and Arrow IPC need ``pyarrow``,
+which is imported on first use so the API still starts without it.
+"""
+
+import csv
+import re
+import zipfile
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from services.categories import normalize_category
+from services.money import minor_to_decimal
+
+
+_PLACEHOLDER_DESCRIPTIONS = {'no description', 'none', '-', '', 'n/a', 'na'}
+
+
+def clean_description(desc: Optional[str]) -> str:
+    """Clean and standardize description/merchant names."""
+    if not desc:
+        return "N/A"
+
+    desc = str(desc).strip()
+
+    # Remove placeholder descriptions
+    if desc.lower() in _PLACEHOLDER_DESCRIPTIONS:
+        return "N/A"
+
+    # Standardize merchant names - remove extra spaces
+    return ' '.join(desc.split())
+
+
+# Transaction and budget queries select categories.name, which is already
+# normalized; goals have no category_id and are normalized here.
+def _transaction_row(row: Sequence) -> List[Any]:
+    txn_date, category, amount, txn_type, description, payment_mode = row
+    return [
+        txn_date, category, minor_to_decimal(amount), txn_type, clean_description(description), payment_mode or "N/A"
+    ]
+
+
+def _budget_row(row: Sequence) -> List[Any]:
+    category, budget_type, amount, start_date, alert_threshold = row
+    return [category, budget_type, minor_to_decimal(amount), start_date, alert_threshold]
+
+
+def _goal_progress(target_amount: int, current_amount: int) -> float:
+    return (current_amount / target_amount * 100) if target_amount > 0 else 0
+
+
+def _goal_row(row: Sequence) -> List[Any]:
+    name, category, target_amount, current_amount, deadline = row
+    progress = _goal_progress(target_amount, current_amount)
+    return [
+        name, normalize_category(category), minor_to_decimal(target_amount),
+        minor_to_decimal(current_amount), f"{progress:.2f}%", deadline,
+    ]
+
+
+def _income_row(row: Sequence) -> List[Any]:
+    received_date, income_type, amount, source, note = row
+    return [received_date, income_type, minor_to_decimal(amount), clean_description(source), clean_description(note)]
+
+
+class ExportSpec:
+    __slots__ = ("header", "format_row")
+
+    def __init__(self, header: List[str], format_row: Callable[[Sequence], List[Any]]):
+        self.header = header
+        self.format_row = format_row
+
+
+# Column order of each spec matches the SELECT list used by the endpoints.
+EXPORT_SPECS: Dict[str, ExportSpec] = {
+    "transactions": ExportSpec(
+        ["Date", "Category", "Amount", "Type", "Description", "Payment Mode"], _transaction_row
+    ),
+    "budgets": ExportSpec(
+        ["Category", "Budget Type", "Amount", "Start Date", "Alert Threshold %"], _budget_row
+    ),
+    "goals": ExportSpec(
+        ["Goal Name", "Category", "Target Amount", "Current Amount", "Progress %", "Deadline"], _goal_row
+    ),
+    "incomes": ExportSpec(
+        ["Date", "Income Type", "Amount", "Source", "Note"], _income_row
+    ),
+}
+
+
+class _LineBuffer:
+    """File-like object whose write() returns the text, for csv.writer."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(spec: ExportSpec, chunks: Iterable[Sequence[Sequence]], gzip: bool = False) -> Iterator[bytes]:
+    """Encode chunks of database rows as CSV bytes, one output block per chunk."""
+    writer = csv.writer(_LineBuffer())
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None  # wbits=31: gzip container
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    yield emit(writer.writerow(spec.header))
+    for rows in chunks:
+        block = emit("".join(writer.writerow(spec.format_row(row)) for row in rows))
+        if block:
+            yield block
+    if compressor:
+        yield compressor.flush()
+
+
+# ======================== XLSX ========================
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Style 1 is the built-in short-date format (numFmtId 14) used for date cells.
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+_XML_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def _xml_text(value: str) -> str:
+    value = _XML_INVALID_CHARS.sub("", value)
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f"<c><v>{value}</v></c>"
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return f'<c s="1"><v>{(value - _EXCEL_EPOCH).days}</v></c>'
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{_xml_text(str(value))}</t></is></c>'
+
+
+def _xlsx_row(values: Sequence) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def write_xlsx(spec: ExportSpec, chunks: Iterable[Sequence[Sequence]], fileobj, sheet_name: str = "Export") -> None:
+    """Write a single-sheet workbook to ``fileobj``, streaming the sheet XML chunk by chunk."""
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            workbook.writestr(name, content)
+        workbook.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{_xml_text(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>',
+        )
+        with workbook.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(spec.header).encode("utf-8"))
+            for rows in chunks:
+                sheet.write("".join(_xlsx_row(spec.format_row(row)) for row in rows).encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+
+
+# ======================== Columnar (Parquet / Arrow) ========================
+
+# Column kinds map to Arrow types in _arrow_type. "category" columns are
+# dictionary-encoded: a handful of distinct values repeated on every row.
+COLUMNAR_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "transactions": [
+        ("date", "date"), ("category", "category"), ("amount", "decimal"),
+        ("type", "category"), ("description", "string"), ("payment_mode", "category"),
+    ],
+    "budgets": [
+        ("category", "category"), ("budget_type", "category"), ("amount", "decimal"),
+        ("start_date", "date"), ("alert_threshold", "int"),
+    ],
+    "goals": [
+        ("name", "string"), ("category", "category"), ("target_amount", "decimal"),
+        ("current_amount", "decimal"), ("progress_pct", "float"), ("deadline", "date"),
+    ],
+    "incomes": [
+        ("date", "date"), ("income_type", "category"), ("amount", "decimal"),
+        ("source", "string"), ("note", "string"),
+    ],
+}
+
+
+def _goal_columnar_row(row: Sequence) -> List[Any]:
+    name, category, target_amount, current_amount, deadline = row
+    progress = round(_goal_progress(target_amount, current_amount), 2)
+    return [
+        name, normalize_category(category), minor_to_decimal(target_amount),
+        minor_to_decimal(current_amount), progress, deadline,
+    ]
+
+
+# Same normalization as the CSV rows; only goal progress differs (a number, not "12.50%").
+COLUMNAR_ROWS: Dict[str, Callable[[Sequence], List[Any]]] = {
+    "transactions": _transaction_row,
+    "budgets": _budget_row,
+    "goals": _goal_columnar_row,
+    "incomes": _income_row,
+}
+
+COLUMNAR_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+class ColumnarUnavailable(RuntimeError):
+    """Raised when a columnar export is requested but pyarrow is not installed."""
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401 - registers pyarrow.ipc
+        import pyarrow.parquet  # noqa: F401 - registers pyarrow.parquet
+    except ImportError as exc:
+        raise ColumnarUnavailable("Parquet/Arrow export requires the pyarrow package") from exc
+    return pyarrow
+
+
+def _arrow_type(pa, kind: str):
+    if kind == "date":
+        return pa.date32()
+    if kind == "decimal":
+        # 20 digits hold any BIGINT paise amount (|x| < 9.3e18) with two decimals.
+        return pa.decimal128(20, 2)
+    if kind == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if kind == "int":
+        return pa.int32()
+    if kind == "float":
+        return pa.float64()
+    return pa.string()
+
+
+def arrow_schema(report_type: str):
+    """Arrow schema for ``report_type`` (imports pyarrow)."""
+    pa = _import_pyarrow()
+    return pa.schema([
+        pa.field(name, _arrow_type(pa, kind)) for name, kind in COLUMNAR_COLUMNS[report_type]
+    ])
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self.closed = False
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_columnar(report_type: str, chunks: Iterable[Sequence[Sequence]], file_format: str = "parquet") -> Iterator[bytes]:
+    """Encode chunks of database rows as Parquet row groups or Arrow IPC record batches.
+
+    Each chunk becomes one row group (Parquet) or record batch (Arrow), and
+    its bytes are yielded as soon as it is written.
+    """
+    if file_format not in COLUMNAR_MEDIA_TYPES:
+        raise ValueError(f"Unsupported columnar format: {file_format}")
+    pa = _import_pyarrow()
+    schema = arrow_schema(report_type)
+    format_row = COLUMNAR_ROWS[report_type]
+
+    sink = _ChunkSink()
+    if file_format == "parquet":
+        writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for rows in chunks:
+            columns = list(zip(*(format_row(row) for row in rows)))
+            if not columns:
+                continue
+            batch = pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
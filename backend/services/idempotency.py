@@ -0,0 +1,344 @@
+"""Idempotency-Key support for the create endpoints.
+
+Clients on flaky networks retry POSTs. When a request carries an
+``Idempotency-Key`` header, the first response for that key is stored and
+later retries get the stored response back instead of creating another
+row or re-running OCR. A retry that arrives while the first request is
+still running waits for it to finish and then gets the same response.
+
+:class:`IdempotencyStore` is a bounded in-memory map with TTL eviction.
+Keys are SHA-256 digests of (user id, path, key): the caller is the
+authenticated user, not the raw Authorization header, so a retry after a
+token refresh still matches. When a shared cache backend is configured
+(``CACHE_URL``), requests are also claimed and responses stored there, so
+a retry that lands on another worker is answered from the same record.
+:class:`IdempotencyMiddleware` is a plain ASGI middleware; it does not
+depend on FastAPI or Starlette.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.cache_backend import CacheBackend, CacheBackendError
+
+
+# POST paths that create rows (compared without a trailing slash).
+IDEMPOTENT_PATHS = (
+    "/transactions",
+    "/transactions/scan-and-create",
+    "/income",
+    "/goals",
+    "/budgets",
+)
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+class IdempotencyEntry:
+    __slots__ = ("fingerprint", "expires_at", "status", "headers", "body", "done")
+
+    def __init__(self, fingerprint: bytes, expires_at: float):
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.status: Optional[int] = None
+        self.headers: Headers = []
+        self.body = b""
+        self.done = asyncio.Event()
+
+    @property
+    def completed(self) -> bool:
+        return self.status is not None
+
+
+class IdempotencyStore:
+    """Bounded key -> response map with TTL eviction.
+
+    All methods run on the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, IdempotencyEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        # TTL is fixed, so insertion order is expiry order.
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[key]
+
+        # Leave room for the entry about to be inserted.
+        excess = len(self._entries) + 1 - self.max_entries
+        if excess > 0:
+            # Over capacity: drop the oldest completed entries, never in-flight ones.
+            stale = []
+            for key, entry in self._entries.items():
+                if len(stale) >= excess:
+                    break
+                if entry.completed:
+                    stale.append(key)
+            for key in stale:
+                del self._entries[key]
+
+    def begin(self, key: bytes, fingerprint: bytes) -> Tuple[IdempotencyEntry, bool]:
+        """Return (entry, created). ``created`` means the caller owns the work."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            return entry, False
+        self._evict(now)
+        self._entries.pop(key, None)
+        entry = IdempotencyEntry(fingerprint, now + self.ttl_seconds)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        return entry, True
+
+    def complete(self, key: bytes, status: int, headers: Headers, body: bytes) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.status = status
+        entry.headers = headers
+        entry.body = body
+        entry.done.set()
+
+    def abort(self, key: bytes) -> None:
+        """Forget a failed request so the next retry runs it again."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", []):
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _replay(body: bytes, receive):
+    """ASGI receive that yields the already-read request body, then defers to ``receive``."""
+    body_sent = False
+
+    async def replay_receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay_receive
+
+
+def _encode_record(fingerprint: bytes, status: Optional[int] = None, headers: Headers = (), body: bytes = b"") -> bytes:
+    """Shared-tier record; without ``status`` it marks a request still in flight."""
+    record = {"fingerprint": fingerprint.hex()}
+    if status is not None:
+        record.update(
+            status=status,
+            headers=[[base64.b64encode(key).decode(), base64.b64encode(value).decode()] for key, value in headers],
+            body=base64.b64encode(body).decode(),
+        )
+    return json.dumps(record).encode()
+
+
+def _decode_record(raw: bytes) -> Dict:
+    record = json.loads(raw)
+    record["fingerprint"] = bytes.fromhex(record["fingerprint"])
+    if "status" in record:
+        record["headers"] = [(base64.b64decode(key), base64.b64decode(value)) for key, value in record["headers"]]
+        record["body"] = base64.b64decode(record["body"])
+    return record
+
+
+async def _send_json(send, status: int, body: bytes) -> None:
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Replay stored responses for repeated POSTs with the same Idempotency-Key."""
+
+    def __init__(
+        self,
+        app,
+        caller_id: Callable[[Optional[str]], Optional[str]],
+        store: Optional[IdempotencyStore] = None,
+        backend: Optional[CacheBackend] = None,
+        paths: Iterable[str] = IDEMPOTENT_PATHS,
+        wait_timeout: float = 120.0,
+        poll_interval: float = 0.1,
+    ):
+        """``caller_id`` maps the Authorization header to a user id, or None if unauthenticated.
+
+        ``backend`` is the shared tier; leave it None to keep records in this process only.
+        """
+        self.app = app
+        self.caller_id = caller_id
+        self.store = store or IdempotencyStore()
+        self.backend = backend
+        self.paths = {path.rstrip("/") for path in paths}
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    async def _claim_shared(self, key: bytes, fingerprint: bytes) -> Optional[Dict]:
+        """Claim ``key`` in the shared tier, or wait for the worker that holds it.
+
+        Returns None when this request should run, else the record it must
+        answer with (``{"status": None}`` after a timeout).
+        """
+        shared_key = "idempotency:" + key.hex()
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while True:
+                pending = _encode_record(fingerprint)
+                if await asyncio.to_thread(self.backend.add, shared_key, pending, self.wait_timeout):
+                    return None
+                raw = (await asyncio.to_thread(self.backend.get_many, [shared_key]))[0]
+                if raw is not None:
+                    record = _decode_record(raw)
+                    if record["fingerprint"] != fingerprint or "status" in record:
+                        return record
+                if time.monotonic() >= deadline:
+                    return {"fingerprint": fingerprint, "status": None}
+                await asyncio.sleep(self.poll_interval)
+        except CacheBackendError as exc:
+            print(f">>> IDEMPOTENCY: shared store unavailable, using local only: {exc}")
+            return None
+
+    async def _release_shared(self, key: bytes, record: Optional[bytes]) -> None:
+        shared_key = "idempotency:" + key.hex()
+        try:
+            if record is None:
+                await asyncio.to_thread(self.backend.delete, [shared_key])
+            else:
+                await asyncio.to_thread(self.backend.set, shared_key, record, self.store.ttl_seconds)
+        except CacheBackendError as exc:
+            print(f">>> IDEMPOTENCY: could not update shared store: {exc}")
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"].rstrip("/") not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        idem_key = _header(scope, b"idempotency-key")
+        if not idem_key:
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        authorization = _header(scope, b"authorization")
+        caller = self.caller_id(authorization.decode("latin-1") if authorization is not None else None)
+        if caller is None:
+            # Unauthenticated: the route answers 401 and nothing is worth storing.
+            await self.app(scope, _replay(body, receive), send)
+            return
+        key = hashlib.sha256(b"\0".join([caller.encode(), scope["path"].encode(), idem_key])).digest()
+        fingerprint = hashlib.sha256(body).digest()
+
+        while True:
+            entry, created = self.store.begin(key, fingerprint)
+            if created:
+                break
+            if entry.fingerprint != fingerprint:
+                await _send_json(
+                    send, 422,
+                    b'{"detail":"Idempotency-Key was already used with a different request body"}',
+                )
+                return
+            try:
+                await asyncio.wait_for(entry.done.wait(), self.wait_timeout)
+            except asyncio.TimeoutError:
+                await _send_json(
+                    send, 409,
+                    b'{"detail":"A request with this Idempotency-Key is still in progress"}',
+                )
+                return
+            if entry.completed:
+                await send({
+                    "type": "http.response.start",
+                    "status": entry.status,
+                    "headers": entry.headers + [(b"idempotent-replayed", b"true")],
+                })
+                await send({"type": "http.response.body", "body": entry.body})
+                return
+            # The first attempt failed and was released; try to take ownership.
+
+        if self.backend is not None:
+            record = await self._claim_shared(key, fingerprint)
+            if record is not None:
+                if record["fingerprint"] != fingerprint:
+                    self.store.abort(key)
+                    await _send_json(
+                        send, 422,
+                        b'{"detail":"Idempotency-Key was already used with a different request body"}',
+                    )
+                elif record["status"] is None:
+                    self.store.abort(key)
+                    await _send_json(
+                        send, 409,
+                        b'{"detail":"A request with this Idempotency-Key is still in progress"}',
+                    )
+                else:
+                    # Another worker ran it; local waiters get the same response.
+                    self.store.complete(key, record["status"], record["headers"], record["body"])
+                    await send({
+                        "type": "http.response.start",
+                        "status": record["status"],
+                        "headers": record["headers"] + [(b"idempotent-replayed", b"true")],
+                    })
+                    await send({"type": "http.response.body", "body": record["body"]})
+                return
+
+        status = 500
+        headers: Headers = []
+        response_chunks = []
+
+        async def capture_send(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, _replay(body, receive), capture_send)
+        except BaseException:
+            self.store.abort(key)
+            if self.backend is not None:
+                await self._release_shared(key, None)
+            raise
+
+        if status >= 500:
+            self.store.abort(key)
+            if self.backend is not None:
+                await self._release_shared(key, None)
+        else:
+            response_body = b"".join(response_chunks)
+            self.store.complete(key, status, headers, response_body)
+            if self.backend is not None:
+                await self._release_shared(key, _encode_record(fingerprint, status, headers, response_body))
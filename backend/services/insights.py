@@ -0,0 +1,92 @@
+"""The AI insight summary (GET /reports/insights/summary) from monthly aggregates.
+
+Inputs are expense totals per (year, month, category) and income totals
+per (year, month), in paise. ``summarize`` builds one user's summary;
+``summarize_by_user`` builds many at once for the nightly job
+(insights_batch.py). The seasonal forecasts dominate the cost, and the
+batch fits them for all users together.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Mapping, Tuple
+
+from services.money import from_minor
+from services.prediction_service import (
+    detect_anomaly,
+    monthly_matrix,
+    next_month_forecasts_by_user,
+    predict_next_month_expense,
+    savings_projection,
+)
+
+
+# Data the summary is computed from; a stored summary is current while their versions are unchanged.
+INSIGHT_DOMAINS = ("transactions", "incomes")
+
+# (year, month, category, total paise) and (year, month, total paise).
+ExpenseRow = Tuple[int, int, str, int]
+IncomeRow = Tuple[int, int, int]
+
+
+def _summary(expense_rows: List[ExpenseRow], income_rows: List[IncomeRow], forecasts: Dict) -> Dict:
+    totals_by_month: Dict[Tuple[int, int], int] = {}
+    for year, month, _, total in expense_rows:
+        key = (int(year), int(month))
+        totals_by_month[key] = totals_by_month.get(key, 0) + int(total)
+
+    monthly_expenses = []
+    expenses = []
+    for (year, month), total in sorted(totals_by_month.items()):
+        amount = from_minor(total)
+        monthly_expenses.append({"month": f"{year:04d}-{month:02d}", "expense": round(amount, 2)})
+        expenses.append(amount)
+
+    average_expense = sum(expenses) / len(expenses) if expenses else 0.0
+    latest_expense = expenses[-1] if expenses else 0.0
+    past_expenses = expenses[:-1] if len(expenses) > 1 else expenses
+    anomaly_threshold = average_expense * 1.8 if average_expense > 0 else 0.0
+
+    income_values = [from_minor(total) for _, _, total in sorted(income_rows)]
+    average_income = sum(income_values) / len(income_values) if income_values else 0.0
+
+    return {
+        "monthly_expenses": monthly_expenses,
+        "spending_forecast": {
+            "predicted_next_month": round(
+                predict_next_month_expense(list(range(1, len(expenses) + 1)), expenses), 2
+            ),
+            "average_monthly_expense": round(average_expense, 2),
+            **forecasts,
+        },
+        "anomaly_detection": {
+            "latest_month_expense": round(latest_expense, 2),
+            "average_expense": round(average_expense, 2),
+            "threshold": round(anomaly_threshold, 2),
+            "is_anomaly": detect_anomaly(past_expenses, latest_expense),
+        },
+        "savings_projection": {
+            "average_income": round(average_income, 2),
+            "average_expense": round(average_expense, 2),
+            "projected_monthly_savings": round(average_income - average_expense, 2),
+            "projected_savings_6_months": round(savings_projection(average_income, expenses, months=6), 2),
+        },
+    }
+
+
+def summarize_by_user(
+    data: Mapping[Hashable, Tuple[Iterable[ExpenseRow], Iterable[IncomeRow]]],
+) -> Dict[Hashable, Dict]:
+    """``{user: (expense_rows, income_rows)}`` -> ``{user: summary}``."""
+    data = {user: (list(expense_rows), list(income_rows)) for user, (expense_rows, income_rows) in data.items()}
+    forecasts = next_month_forecasts_by_user({
+        user: monthly_matrix((year, month, category, from_minor(total)) for year, month, category, total in expense_rows)[1]
+        for user, (expense_rows, _) in data.items()
+    })
+    return {
+        user: _summary(expense_rows, income_rows, forecasts[user])
+        for user, (expense_rows, income_rows) in data.items()
+    }
+
+
+def summarize(expense_rows: Iterable[ExpenseRow], income_rows: Iterable[IncomeRow]) -> Dict:
+    """One user's insight summary."""
+    return summarize_by_user({None: (expense_rows, income_rows)})[None]
@@ -0,0 +1,153 @@
+"""Per-user fan-out of live events to Server-Sent Events connections.
+
+Publishers run in worker threads (request handlers, the change feed
+thread). Each SSE connection is an async generator on the event loop. A
+:class:`LiveSubscription` sits between them: a small bounded buffer plus
+an ``asyncio.Event`` that publishers set with ``call_soon_threadsafe``.
+
+An idle connection holds one deque and one event and does no work until
+something is published for its user. Events that carry a ``coalesce`` key
+(such as "summary") replace any pending event with the same key, so a
+slow client only gets the latest totals. When the buffer still overflows,
+the oldest events are dropped and the client is sent a ``resync`` event
+telling it to refetch.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    payload = json.dumps(data, default=str, separators=(",", ":"))
+    lines.extend(f"data: {line}" for line in payload.splitlines() or [""])
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class LiveSubscription:
+    __slots__ = ("user_id", "max_queue", "_pending", "_lock", "_loop", "_ready", "dropped", "closed")
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.user_id = user_id
+        self.max_queue = max_queue
+        self._pending: "deque[Tuple[str, Any, Optional[str]]]" = deque()
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, event: str, data: Any, coalesce: Optional[str] = None) -> None:
+        """Queue an event; safe to call from any thread."""
+        with self._lock:
+            if coalesce is not None:
+                for index, pending in enumerate(self._pending):
+                    if pending[2] == coalesce:
+                        del self._pending[index]
+                        break
+            self._pending.append((event, data, coalesce))
+            while len(self._pending) > self.max_queue:
+                self._pending.popleft()
+                self.dropped += 1
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            self.closed = True  # Event loop already closed.
+
+    def drain(self):
+        with self._lock:
+            events = list(self._pending)
+            self._pending.clear()
+            dropped, self.dropped = self.dropped, 0
+            self._ready.clear()
+        if dropped:
+            events.insert(0, ("resync", {"dropped": dropped}, None))
+        return events
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class LiveEventHub:
+    """Registry of live subscriptions, keyed by user."""
+
+    def __init__(self, max_queue: int = 32, max_connections_per_user: int = 5):
+        self.max_queue = max_queue
+        self.max_connections_per_user = max_connections_per_user
+        self._subscriptions: Dict[str, Set[LiveSubscription]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self, user_id: str) -> LiveSubscription:
+        """Register a connection; must be called from the event loop."""
+        subscription = LiveSubscription(user_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            user_subs = self._subscriptions.setdefault(user_id, set())
+            if len(user_subs) >= self.max_connections_per_user:
+                raise OverflowError("Too many live connections for this user")
+            user_subs.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription) -> None:
+        subscription.closed = True
+        with self._lock:
+            user_subs = self._subscriptions.get(subscription.user_id)
+            if user_subs is not None:
+                user_subs.discard(subscription)
+                if not user_subs:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_capacity(self, user_id: str) -> bool:
+        """Whether ``subscribe`` would accept another connection for the user right now."""
+        with self._lock:
+            return len(self._subscriptions.get(user_id, ())) < self.max_connections_per_user
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return user_id in self._subscriptions
+
+    def publish(self, user_id: str, event: str, data: Any, coalesce: Optional[str] = None) -> int:
+        """Push an event to every connection of the user; returns how many got it."""
+        with self._lock:
+            targets = list(self._subscriptions.get(user_id, ()))
+        for subscription in targets:
+            subscription.push(event, data, coalesce)
+        self.published += len(targets)
+        return len(targets)
+
+    async def stream(self, subscription: LiveSubscription, heartbeat_seconds: float = 15.0) -> AsyncIterator[bytes]:
+        """Yield SSE frames for a subscription until it is closed."""
+        try:
+            yield b"retry: 5000\n\n"
+            while not subscription.closed:
+                if not await subscription.wait(heartbeat_seconds):
+                    # Comment line keeps proxies from timing out idle streams.
+                    yield b": keep-alive\n\n"
+                    continue
+                for event, data, _ in subscription.drain():
+                    yield format_sse(event, data, next(self._ids))
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._subscriptions),
+                "connections": sum(len(subs) for subs in self._subscriptions.values()),
+                "published": self.published,
+                "max_queue": self.max_queue,
+            }
+
+
+live_hub = LiveEventHub()
@@ -0,0 +1,55 @@
+"""Money is stored as BIGINT minor units (paise) and sent over the API in rupees.
+
+Every amount column holds an integer count of paise, so sums and
+comparisons in SQL and Python are exact integer arithmetic. The API
+contract is unchanged: requests and responses carry rupee amounts as
+JSON numbers. ``to_minor`` converts on the way in and ``from_minor`` on
+the way out.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Optional, Union
+
+
+MINOR_PER_UNIT = 100
+
+# Range of the BIGINT amount columns.
+MAX_MINOR = 2 ** 63 - 1
+MIN_MINOR = -(2 ** 63)
+
+Number = Union[int, float, Decimal, str]
+
+
+def to_minor(amount: Number) -> int:
+    """Rupees (float/Decimal/str) to paise, rounding half-up to the nearest paisa.
+
+    Raises ValueError for NaN, infinities, unparsable strings and amounts
+    that do not fit the BIGINT columns.
+    """
+    try:
+        # str() first so 0.1 + 0.2 style float noise does not leak into the result.
+        value = Decimal(str(amount)) * MINOR_PER_UNIT
+        minor = int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation as exc:
+        raise ValueError(f"Invalid amount: {amount!r}") from exc
+    if not MIN_MINOR <= minor <= MAX_MINOR:
+        raise ValueError(f"Amount out of range: {amount!r}")
+    return minor
+
+
+def to_minor_or_none(amount: Optional[Number]) -> Optional[int]:
+    return None if amount is None else to_minor(amount)
+
+
+def from_minor(minor: Optional[Number]) -> float:
+    """Paise (int, or the Decimal that SUM/AVG returns) to rupees for JSON."""
+    if minor is None:
+        return 0.0
+    if isinstance(minor, int):
+        return minor / MINOR_PER_UNIT
+    return float(Decimal(minor) / MINOR_PER_UNIT)
+
+
+def minor_to_decimal(minor: Optional[int]) -> Optional[Decimal]:
+    """``123456`` -> ``Decimal("1234.56")`` without going through float, for exports."""
+    return None if minor is None else Decimal(int(minor)).scaleb(-2)
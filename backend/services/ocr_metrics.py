@@ -0,0 +1,236 @@
+"""Per-scan telemetry for the receipt OCR endpoints.
+
+Each scan records a :class:`ScanTrace` (upload size, timing of every stage,
+field confidence and an outcome category). Finished traces are folded into
+fixed-bucket histograms held by :class:`OcrMetrics`, and scans slower than
+a threshold are kept in a bounded sample (optionally written to disk along
+with the uploaded image) so they can be replayed offline.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# Bucket upper bounds in milliseconds / bytes / ratio.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SIZE_BUCKETS_BYTES = (50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000)
+CONFIDENCE_BUCKETS = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "buckets": buckets,
+        }
+
+
+class ScanTrace:
+    """Timing and quality data for a single receipt scan."""
+
+    def __init__(self, endpoint: str, user_id: Optional[str] = None):
+        self.scan_id = uuid.uuid4().hex
+        self.endpoint = endpoint
+        self.user_id = user_id
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.upload_bytes = 0
+        self.stages_ms: Dict[str, float] = {}
+        self.field_confidence: Dict[str, float] = {}
+        self.outcome = "ok"
+        self.total_ms = 0.0
+        self.upload: Optional[bytes] = None
+        self.extracted_text: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block; repeated stage names accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stages_ms[name] = self.stages_ms.get(name, 0.0) + elapsed
+
+    def fail(self, outcome: str) -> None:
+        # Keep the first failure; later handlers only see the re-raised error.
+        if self.outcome == "ok":
+            self.outcome = outcome
+
+    @property
+    def confidence(self) -> float:
+        if not self.field_confidence:
+            return 0.0
+        return sum(self.field_confidence.values()) / len(self.field_confidence)
+
+    def finish(self) -> None:
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scan_id": self.scan_id,
+            "endpoint": self.endpoint,
+            "started_at": self.started_at,
+            "upload_bytes": self.upload_bytes,
+            "total_ms": round(self.total_ms, 2),
+            "stages_ms": {name: round(ms, 2) for name, ms in self.stages_ms.items()},
+            "field_confidence": self.field_confidence,
+            "confidence": round(self.confidence, 3),
+            "outcome": self.outcome,
+        }
+
+
+def receipt_field_confidence(receipt_data: Dict[str, Any]) -> Dict[str, float]:
+    """Score each parsed receipt field: 1.0 if extracted, 0.0 if defaulted."""
+    return {
+        "amount": 1.0 if receipt_data.get("amount") else 0.0,
+        "date": 1.0 if receipt_data.get("date") else 0.0,
+        "vendor": 1.0 if receipt_data.get("vendor") not in (None, "", "Receipt") else 0.0,
+    }
+
+
+class OcrMetrics:
+    """Thread-safe aggregate of scan traces plus a sample of slow scans."""
+
+    def __init__(
+        self,
+        slow_threshold_ms: float = 3000.0,
+        slow_sample_size: int = 50,
+        replay_dir: Optional[str] = None,
+    ):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.replay_dir = replay_dir
+        self._lock = threading.Lock()
+        self._slow: deque = deque(maxlen=slow_sample_size)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.total = Histogram(LATENCY_BUCKETS_MS)
+            self.stages: Dict[str, Histogram] = {}
+            self.upload_size = Histogram(SIZE_BUCKETS_BYTES)
+            self.confidence = Histogram(CONFIDENCE_BUCKETS)
+            self.field_hits: Dict[str, int] = {}
+            self.outcomes: Dict[str, int] = {}
+            self._slow.clear()
+
+    def record(self, trace: ScanTrace) -> None:
+        if not trace.total_ms:
+            trace.finish()
+        with self._lock:
+            self.total.observe(trace.total_ms)
+            self.upload_size.observe(trace.upload_bytes)
+            for name, elapsed in trace.stages_ms.items():
+                self.stages.setdefault(name, Histogram(LATENCY_BUCKETS_MS)).observe(elapsed)
+            if trace.field_confidence:
+                self.confidence.observe(trace.confidence)
+                for field, score in trace.field_confidence.items():
+                    self.field_hits[field] = self.field_hits.get(field, 0) + (1 if score > 0 else 0)
+            self.outcomes[trace.outcome] = self.outcomes.get(trace.outcome, 0) + 1
+            is_slow = trace.total_ms >= self.slow_threshold_ms
+            if is_slow:
+                self._slow.append(trace.to_dict())
+        if is_slow and self.replay_dir:
+            self._persist(trace)
+
+    def _persist(self, trace: ScanTrace) -> None:
+        """Write a slow scan's upload and trace to ``replay_dir`` for replay."""
+        try:
+            os.makedirs(self.replay_dir, exist_ok=True)
+            base = os.path.join(self.replay_dir, trace.scan_id)
+            if trace.upload:
+                with open(f"{base}.bin", "wb") as handle:
+                    handle.write(trace.upload)
+            payload = trace.to_dict()
+            payload["user_id"] = trace.user_id
+            payload["extracted_text"] = trace.extracted_text
+            with open(f"{base}.json", "w", encoding="utf-8") as handle:
+                json.dump(payload, handle)
+        except OSError as exc:
+            print(f">>> OCR METRICS: could not persist slow scan {trace.scan_id}: {exc}")
+
+    def slow_scans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._slow)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            scans = self.total.count
+            return {
+                "scans": scans,
+                "outcomes": dict(self.outcomes),
+                "total_ms": self.total.snapshot(),
+                "stages_ms": {name: hist.snapshot() for name, hist in self.stages.items()},
+                "upload_bytes": self.upload_size.snapshot(),
+                "confidence": self.confidence.snapshot(),
+                "field_extraction_rate": {
+                    field: round(hits / self.confidence.count, 3) if self.confidence.count else 0.0
+                    for field, hits in self.field_hits.items()
+                },
+                "slow_threshold_ms": self.slow_threshold_ms,
+                "slow_scans_retained": len(self._slow),
+            }
+
+    def prometheus(self) -> str:
+        """Render the histograms in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines: List[str] = []
+
+        def emit(name: str, hist: Dict[str, Any], labels: str = "") -> None:
+            sep = "," if labels else ""
+            for bound, count in hist["buckets"].items():
+                lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {hist['sum']}")
+            lines.append(f"{name}_count{suffix} {hist['count']}")
+
+        lines.append("# TYPE ocr_scan_duration_ms histogram")
+        emit("ocr_scan_duration_ms", snap["total_ms"])
+        lines.append("# TYPE ocr_stage_duration_ms histogram")
+        for stage, hist in snap["stages_ms"].items():
+            emit("ocr_stage_duration_ms", hist, f'stage="{stage}"')
+        lines.append("# TYPE ocr_upload_bytes histogram")
+        emit("ocr_upload_bytes", snap["upload_bytes"])
+        lines.append("# TYPE ocr_field_confidence histogram")
+        emit("ocr_field_confidence", snap["confidence"])
+        lines.append("# TYPE ocr_scans_total counter")
+        for outcome, count in snap["outcomes"].items():
+            lines.append(f'ocr_scans_total{{outcome="{outcome}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+ocr_metrics = OcrMetrics(
+    slow_threshold_ms=float(os.getenv("OCR_SLOW_SCAN_MS", "3000")),
+    slow_sample_size=int(os.getenv("OCR_SLOW_SCAN_SAMPLES", "50")),
+    replay_dir=os.getenv("OCR_REPLAY_DIR") or None,
+)
@@ -1,5 +1,63 @@
-import pandas as pd
-from sklearn.linear_model import LinearRegression
+"""Expense forecasting and savings projection for the insight endpoints.
+
+``predict_next_month_expense`` is an ordinary least-squares line through
+(month index, expense), extrapolated one month ahead. With one regressor
+the fit has a closed form, so it is a few NumPy reductions, with the same
+predictions ``sklearn.linear_model.LinearRegression`` gave, and no pandas
+or sklearn import on the request path. ``fit_linear_trend`` fits many
+series at once, one per row.
+
+``forecast_expenses`` is the seasonal engine: additive Holt-Winters with a
+damped trend, fitted to every series of a user (each category, plus the
+total) as one matrix. Smoothing parameters are picked per series from a
+small grid by one-step-ahead squared error; the grid is just another array
+axis, so the whole fit is one pass over the months.
+
+``simulate_savings`` is the Monte Carlo counterpart of
+``savings_projection``: thousands of savings paths resampled from the
+user's monthly history, as one array per batch of paths.
+"""
+
+import time
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+SEASON_LENGTH = 12
+# Damping keeps a short, noisy trend from running away over the horizon.
+DAMPING = 0.9
+# Candidate (alpha, beta*, gamma*) values; beta = alpha * beta*, gamma = (1 - alpha) * gamma*.
+_ALPHAS = (0.1, 0.3, 0.5, 0.8)
+_BETAS = (0.0, 0.1, 0.3)
+_GAMMAS = (0.1, 0.3)
+# Two-sided normal quantiles for the supported interval levels.
+_INTERVAL_Z = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.96}
+
+# Savings simulation: paths per request, paths per array batch, and the wall-clock
+# budget after which no further batch starts.
+SIMULATION_PATHS = 10_000
+SIMULATION_BATCH = 2_000
+SIMULATION_BUDGET_SECONDS = 0.05
+MAX_SIMULATION_MONTHS = 120
+PERCENTILES = (10, 50, 90)
+
+
+def fit_linear_trend(x: Sequence[float], y) -> Tuple[np.ndarray, np.ndarray]:
+    """Closed-form OLS of ``y`` on ``x``; ``y`` is one series or a (series, points) matrix.
+
+    Returns (slope, intercept), one value per series. A constant ``x`` has no
+    trend: the slope is 0 and the intercept is the mean, as lstsq gives.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x_mean = x.mean()
+    y_mean = y.mean(axis=-1)
+    x_centered = x - x_mean
+    sxx = np.dot(x_centered, x_centered)
+    sxy = (y - y_mean[..., None]) @ x_centered
+    slope = sxy / sxx if sxx > 0 else np.zeros_like(y_mean)
+    return slope, y_mean - slope * x_mean
 
 
 def predict_next_month_expense(months, expenses):
@@ -9,21 +67,174 @@ def predict_next_month_expense(months, expenses):
     if len(months) < 2:
         return round(float(expenses[-1]), 2)
 
-    df = pd.DataFrame({
-        "month": months,
-        "expense": expenses,
-    })
+    slope, intercept = fit_linear_trend(months, expenses)
+    prediction = intercept + slope * (max(months) + 1)
 
-    x_values = df[["month"]]
-    y_values = df["expense"]
+    return round(float(prediction), 2)
 
-    model = LinearRegression()
-    model.fit(x_values, y_values)
 
-    next_month = [[max(months) + 1]]
-    prediction = model.predict(next_month)[0]
+def monthly_matrix(rows: Iterable[Tuple[int, int, Hashable, float]]) -> Tuple[List[Tuple[int, int]], Dict[Hashable, List[float]]]:
+    """(year, month, key, amount) rows -> consecutive months and one zero-filled series per key."""
+    totals: Dict[Hashable, Dict[int, float]] = {}
+    for year, month, key, amount in rows:
+        index = int(year) * 12 + int(month) - 1
+        by_month = totals.setdefault(key, {})
+        by_month[index] = by_month.get(index, 0.0) + float(amount)
+    if not totals:
+        return [], {}
+    first = min(min(by_month) for by_month in totals.values())
+    last = max(max(by_month) for by_month in totals.values())
+    periods = [divmod(index, 12) for index in range(first, last + 1)]
+    return [(year, month + 1) for year, month in periods], {
+        key: [by_month.get(index, 0.0) for index in range(first, last + 1)] for key, by_month in totals.items()
+    }
 
-    return round(float(prediction), 2)
+
+def _holt_winters(y: np.ndarray, horizon: int, season_length: int) -> Tuple[np.ndarray, np.ndarray, str]:
+    """Fit each row of ``y`` (series x months).
+
+    Returns point forecasts and forecast standard deviations, both
+    (series, horizon), and the model name.
+    """
+    n_series, n_points = y.shape
+    seasonal = n_points >= 2 * season_length
+    m = season_length if seasonal else 1
+    alpha, beta, gamma = (
+        grid.ravel()[:, None] for grid in np.meshgrid(_ALPHAS, _BETAS, _GAMMAS if seasonal else (0.0,), indexing="ij")
+    )
+    beta, gamma = alpha * beta, (1 - alpha) * gamma
+
+    if seasonal:
+        # Year-over-year change of the first two yearly means gives the trend; the level
+        # and seasonal offsets are read off the detrended first year.
+        first, second = y[:, :m].mean(axis=1), y[:, m:2 * m].mean(axis=1)
+        trend0 = (second - first) / m
+        level0 = first + trend0 * (m - 1) / 2
+        season0 = y[:, :m] - (first[:, None] + trend0[:, None] * (np.arange(m) - (m - 1) / 2))
+        start = m
+    else:
+        level0, trend0 = y[:, 0], np.zeros(n_series)
+        season0 = np.zeros((n_series, 1))
+        start = 1
+
+    # State per (grid point, series); the season buffer adds a trailing axis.
+    level = np.broadcast_to(level0, (len(alpha), n_series)).copy()
+    trend = np.broadcast_to(trend0, (len(alpha), n_series)).copy()
+    season = np.broadcast_to(season0, (len(alpha), n_series, m)).copy()
+    sse = np.zeros((len(alpha), n_series))
+    for t in range(start, n_points):
+        slot = t % m
+        error = y[:, t] - (level + DAMPING * trend + season[:, :, slot])
+        sse += error ** 2
+        level = level + DAMPING * trend + alpha * error
+        trend = DAMPING * trend + beta * error
+        season[:, :, slot] += gamma * error
+
+    best = sse.argmin(axis=0)
+    pick = (best, np.arange(n_series))
+    sigma = np.sqrt(sse[pick] / max(n_points - start, 1))
+    best_alpha, best_beta, best_gamma = alpha[best, 0], beta[best, 0], gamma[best, 0]
+
+    steps = np.arange(1, horizon + 1)
+    damped = np.cumsum(DAMPING ** steps)  # phi + phi^2 + ... + phi^h
+    slots = (n_points + steps - 1) % m
+    point = level[pick][:, None] + damped[None, :] * trend[pick][:, None] + season[best, np.arange(n_series)][:, slots]
+
+    # ETS(A,Ad,A) h-step variance: sigma^2 * (1 + sum_{j<h} c_j^2), c_j = alpha + beta*phi_j + gamma*[j % m == 0].
+    lead = steps[:-1]
+    coefficients = (
+        best_alpha[:, None]
+        + best_beta[:, None] * damped[None, :-1]
+        + best_gamma[:, None] * ((lead % m == 0) & seasonal)[None, :]
+    )
+    variance_factor = 1 + np.concatenate(
+        [np.zeros((n_series, 1)), np.cumsum(coefficients ** 2, axis=1)], axis=1
+    )
+    return point, sigma[:, None] * np.sqrt(variance_factor), "holt_winters" if seasonal else "holt"
+
+
+def forecast_expenses(
+    series: Mapping[Hashable, Sequence[float]],
+    horizon: int = 1,
+    level: float = 0.8,
+    season_length: int = SEASON_LENGTH,
+) -> Dict[Hashable, Dict]:
+    """Forecast aligned monthly series (e.g. from ``monthly_matrix``) ``horizon`` months ahead.
+
+    Returns ``{key: {"model", "forecast", "lower", "upper"}}`` with one value
+    per month ahead; bounds are a ``level`` prediction interval, floored at 0.
+    Two years of history enable the seasonal term; with fewer than three
+    months the forecast is the mean so far.
+    """
+    if not series:
+        return {}
+    keys = list(series)
+    y = np.asarray([series[key] for key in keys], dtype=float)
+    z = _INTERVAL_Z[level]
+
+    if y.shape[1] < 3:
+        point = np.repeat(y.mean(axis=1, keepdims=True), horizon, axis=1)
+        spread = np.repeat(y.std(axis=1, keepdims=True), horizon, axis=1)
+        model = "mean"
+    else:
+        point, spread, model = _holt_winters(y, horizon, season_length)
+
+    point = np.maximum(point, 0.0)
+    lower = np.maximum(point - z * spread, 0.0)
+    upper = point + z * spread
+    return {
+        key: {
+            "model": model,
+            "forecast": np.round(point[row], 2).tolist(),
+            "lower": np.round(lower[row], 2).tolist(),
+            "upper": np.round(upper[row], 2).tolist(),
+        }
+        for row, key in enumerate(keys)
+    }
+
+
+def next_month_forecasts_by_user(series_by_user: Mapping[Hashable, Mapping[str, Sequence[float]]]) -> Dict[Hashable, Dict]:
+    """Seasonal next-month forecast of the total and of each category, with 80% intervals.
+
+    Takes ``{user: {category: monthly series}}``. Each user's total is fitted
+    alongside their categories, and users with the same number of months
+    share one ``forecast_expenses`` call, so a batch of users costs a handful
+    of matrix fits rather than one per user. Series are fitted independently,
+    so the result for a user does not depend on who else is in the batch.
+    """
+    by_length: Dict[int, Dict[Hashable, Sequence[float]]] = {}
+    for user, category_series in series_by_user.items():
+        if not category_series:
+            continue
+        total = [sum(values) for values in zip(*category_series.values())]
+        batch = by_length.setdefault(len(total), {})
+        batch[(user, None)] = total
+        for category, values in category_series.items():
+            batch[(user, category)] = values
+
+    def summary(forecast):
+        return {
+            "predicted_next_month": forecast["forecast"][0],
+            "lower_80": forecast["lower"][0],
+            "upper_80": forecast["upper"][0],
+            "model": forecast["model"],
+        }
+
+    results = {user: {"seasonal": None, "by_category": []} for user in series_by_user}
+    for batch in by_length.values():
+        for (user, category), forecast in forecast_expenses(batch).items():
+            if category is None:
+                results[user]["seasonal"] = summary(forecast)
+            else:
+                results[user]["by_category"].append({"category": category, **summary(forecast)})
+    for result in results.values():
+        result["by_category"].sort(key=lambda item: item["predicted_next_month"], reverse=True)
+    return results
+
+
+def next_month_forecasts(category_series: Mapping[str, Sequence[float]]) -> Dict:
+    """``next_month_forecasts_by_user`` for a single user's ``{category: monthly series}``."""
+    return next_month_forecasts_by_user({None: category_series})[None]
 
 
 def detect_anomaly(expenses, new_expense, threshold=1.8):
@@ -44,3 +255,81 @@ def savings_projection(income, expenses, months=6):
     avg_expense = sum(expenses) / len(expenses)
     monthly_saving = income - avg_expense
     return round(float(monthly_saving * months), 2)
+
+
+def simulate_savings(
+    incomes: Sequence[float],
+    expenses: Sequence[float],
+    months: int = 6,
+    goals: Iterable[Tuple[str, str, float, int]] = (),
+    paths: int = SIMULATION_PATHS,
+    time_budget: float = SIMULATION_BUDGET_SECONDS,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Monte Carlo savings over the next ``months``, resampled from monthly history.
+
+    Every simulated month draws one income from ``incomes`` and one expense
+    from ``expenses`` with replacement, so the spread of the paths is the
+    spread the user has actually seen. Returns P10/P50/P90 cumulative
+    savings per month and, for each ``(goal_id, name, amount needed, months
+    remaining)`` goal, the share of paths on which it is funded by its
+    deadline. Savings fund goals in deadline order: a goal is hit when the
+    savings by its deadline cover it and every goal due no later.
+
+    Paths run in batches of ``SIMULATION_BATCH``; no batch starts after
+    ``time_budget`` seconds, so a slow request returns fewer paths
+    (reported as ``paths``) rather than running late.
+    """
+    incomes = np.asarray(incomes or [0.0], dtype=float)
+    expenses = np.asarray(expenses or [0.0], dtype=float)
+    goals = list(goals)
+    months = min(months, MAX_SIMULATION_MONTHS)
+    goal_months = np.array([goal[3] for goal in goals], dtype=int)
+    needed = np.array([max(goal[2], 0.0) for goal in goals], dtype=float)
+    horizon = min(max([months, *goal_months.tolist()]), MAX_SIMULATION_MONTHS)
+
+    # Independent income and expense draws are one uniform draw over all (income, expense) pairs.
+    net_table = (incomes[:, None] - expenses[None, :]).ravel()
+    index_type = np.uint16 if len(net_table) <= np.iinfo(np.uint16).max else np.int64
+    rng = np.random.default_rng(seed)
+    stop_at = time.perf_counter() + time_budget
+    # Column m is the cumulative saving after m months; column 0 is today.
+    savings = np.zeros((paths, horizon + 1))
+    done = 0
+    while done < paths:
+        size = min(SIMULATION_BATCH, paths - done)
+        net = net_table[rng.integers(0, len(net_table), (size, horizon), dtype=index_type)]
+        np.cumsum(net, axis=1, out=savings[done:done + size, 1:])
+        done += size
+        if time.perf_counter() >= stop_at:
+            break
+    savings = savings[:done]
+
+    bands = np.percentile(savings[:, 1:months + 1], PERCENTILES, axis=0)
+    trajectory = [
+        {"month": month, **{f"p{q}": round(float(band[month - 1]), 2) for q, band in zip(PERCENTILES, bands)}}
+        for month in range(1, months + 1)
+    ]
+
+    goal_results = []
+    for index, (goal_id, name, _, months_remaining) in enumerate(goals):
+        if months_remaining > horizon:
+            probability = None
+        else:
+            required = needed[goal_months <= months_remaining].sum()
+            probability = round(float(np.mean(savings[:, months_remaining] >= required)), 4)
+        goal_results.append({
+            "goal_id": goal_id,
+            "goal_name": name,
+            "amount_needed": round(float(needed[index]), 2),
+            "months_remaining": months_remaining,
+            "probability": probability,
+        })
+
+    return {
+        "paths": done,
+        "months": months,
+        "expected_monthly_savings": round(float(incomes.mean() - expenses.mean()), 2),
+        "trajectory": trajectory,
+        "goals": goal_results,
+    }
@@ -0,0 +1,208 @@
+"""Recurring-payment detection over a user's expense history.
+
+Descriptions are reduced to a merchant key ("NETFLIX.COM 649" and
+"Netflix" are both "netflix"). Within a merchant, amounts are clustered
+so that small changes (a rent revision, a price rise) stay in one series
+while unrelated purchases at the same merchant split off. Each series is
+then classified as weekly, monthly or annual from the median gap between
+payments, and kept only if most gaps agree with that cadence.
+
+Everything after the merchant key is vectorized with NumPy over the whole
+input, so a batch of all users costs the same sorts as a single user.
+"""
+
+import calendar
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.money import from_minor
+
+
+class Cadence(NamedTuple):
+    name: str
+    days: float
+    tolerance: float  # days either side of ``days`` that still count
+    min_occurrences: int
+    months: int  # calendar step for the next date; 0 means step by ``days``
+
+
+# Annual series rarely have more than two payments of history.
+CADENCES: Tuple[Cadence, ...] = (
+    Cadence("weekly", 7, 2, 3, 0),
+    Cadence("monthly", 30.44, 4, 3, 1),
+    Cadence("annual", 365.25, 15, 2, 12),
+)
+
+# Amounts within 10% of their neighbour belong to the same series.
+AMOUNT_TOLERANCE = 0.10
+# Share of gaps that must match the cadence.
+MIN_REGULARITY = 0.6
+
+# Payment-rail and domain tokens that say nothing about the merchant.
+_NOISE_TOKENS = frozenset({
+    "www", "com", "in", "co", "net", "org", "upi", "pos", "ach", "nach", "imps", "neft",
+    "ecs", "si", "autopay", "payment", "pymt", "to", "ref", "txn", "debit", "card",
+    "ltd", "pvt", "inc", "llc", "subscription", "bill",
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# (description, category, amount_minor, txn_date) for one user.
+ExpenseRow = Tuple[Optional[str], Optional[str], int, date]
+# (user_id, description, category, amount_minor, txn_date) for batch mode.
+UserExpenseRow = Tuple[Hashable, Optional[str], Optional[str], int, date]
+
+
+def merchant_key(description: Optional[str]) -> str:
+    """Stable merchant key: "NETFLIX.COM", "Netflix" and "UPI-netflix 649" -> "netflix".
+
+    Purely numeric tokens (amounts, reference numbers) are dropped, but
+    alphanumeric ones are kept, so "Rent - Flat 4B" and "Rent - Flat 7B"
+    stay apart.
+    """
+    tokens = [
+        token for token in _TOKEN_RE.findall((description or "").lower())
+        if token not in _NOISE_TOKENS and not token.isdigit()
+    ]
+    return " ".join(tokens)
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def next_occurrence(last: date, cadence: Cadence) -> date:
+    """Next expected payment after ``last``; monthly and annual keep the day of month."""
+    if cadence.months:
+        return _add_months(last, cadence.months)
+    return last + timedelta(days=cadence.days)
+
+
+def detect_recurring(
+    rows: Iterable[ExpenseRow],
+    as_of: Optional[date] = None,
+    amount_tolerance: float = AMOUNT_TOLERANCE,
+    min_regularity: float = MIN_REGULARITY,
+) -> List[Dict[str, Any]]:
+    """Recurring series in one user's expenses, most frequent first."""
+    batch = detect_recurring_by_user(
+        ((None, *row) for row in rows),
+        as_of=as_of,
+        amount_tolerance=amount_tolerance,
+        min_regularity=min_regularity,
+    )
+    return batch.get(None, [])
+
+
+def detect_recurring_by_user(
+    rows: Iterable[UserExpenseRow],
+    as_of: Optional[date] = None,
+    amount_tolerance: float = AMOUNT_TOLERANCE,
+    min_regularity: float = MIN_REGULARITY,
+) -> Dict[Hashable, List[Dict[str, Any]]]:
+    """Batch mode: ``{user_id: recurring series}`` for rows of any number of users."""
+    as_of = as_of or date.today()
+    groups: Dict[Tuple[Hashable, str], int] = {}
+    kept: List[Sequence] = []
+    codes: List[int] = []
+    amounts: List[int] = []
+    days: List[int] = []
+    for row in rows:
+        user_id, description, _category, amount, txn_date = row
+        key = merchant_key(description)
+        if not key or amount is None or txn_date is None:
+            continue
+        codes.append(groups.setdefault((user_id, key), len(groups)))
+        amounts.append(int(amount))
+        days.append(txn_date.toordinal())
+        kept.append(row)
+    if not kept:
+        return {}
+
+    code_arr = np.asarray(codes, dtype=np.int64)
+    amount_arr = np.asarray(amounts, dtype=np.int64)
+    day_arr = np.asarray(days, dtype=np.int64)
+
+    # 1. Amount clusters: sort by (merchant, amount) and start a new series
+    # wherever the merchant changes or the amount jumps by more than the tolerance.
+    order = np.lexsort((amount_arr, code_arr))
+    sorted_codes, sorted_amounts = code_arr[order], amount_arr[order]
+    starts_series = np.ones(len(order), dtype=bool)
+    starts_series[1:] = (sorted_codes[1:] != sorted_codes[:-1]) | (
+        sorted_amounts[1:] - sorted_amounts[:-1] > amount_tolerance * sorted_amounts[:-1]
+    )
+    series = np.empty(len(order), dtype=np.int64)
+    series[order] = np.cumsum(starts_series) - 1
+    n_series = int(series.max()) + 1
+
+    # 2. Chronological order inside each series; gaps between consecutive payments.
+    order = np.lexsort((day_arr, series))
+    series_sorted, days_sorted = series[order], day_arr[order]
+    counts = np.bincount(series_sorted, minlength=n_series)
+    last_index = np.cumsum(counts) - 1
+    same_series = series_sorted[1:] == series_sorted[:-1]
+    gap_series = series_sorted[1:][same_series]
+    gaps = np.diff(days_sorted)[same_series]
+
+    # 3. Median gap per series, from the gaps sorted within each series.
+    gap_counts = counts - 1
+    gap_starts = np.cumsum(gap_counts) - gap_counts
+    sorted_gaps = gaps[np.lexsort((gaps, gap_series))]
+    has_gaps = gap_counts > 0
+    median_gap = np.zeros(n_series)
+    lower = gap_starts[has_gaps] + (gap_counts[has_gaps] - 1) // 2
+    upper = gap_starts[has_gaps] + gap_counts[has_gaps] // 2
+    median_gap[has_gaps] = (sorted_gaps[lower] + sorted_gaps[upper]) / 2
+
+    # 4. Cadence whose period the median falls within, and the share of gaps that agree.
+    periods = np.array([cadence.days for cadence in CADENCES])
+    tolerances = np.array([cadence.tolerance for cadence in CADENCES])
+    min_occurrences = np.array([cadence.min_occurrences for cadence in CADENCES])
+    matches = np.abs(median_gap[:, None] - periods[None, :]) <= tolerances[None, :]
+    matches &= has_gaps[:, None]
+    cadence_index = np.where(matches.any(axis=1), matches.argmax(axis=1), -1)
+    gap_cadence = np.maximum(cadence_index[gap_series], 0)
+    on_cadence = np.abs(gaps - periods[gap_cadence]) <= tolerances[gap_cadence]
+    regularity = np.bincount(gap_series, weights=on_cadence, minlength=n_series) / np.maximum(gap_counts, 1)
+
+    recurring = (
+        (cadence_index >= 0)
+        & (counts >= min_occurrences[np.maximum(cadence_index, 0)])
+        & (regularity >= min_regularity)
+    )
+
+    amount_totals = np.bincount(series_sorted, weights=amount_arr[order], minlength=n_series)
+    keys = {code: group for group, code in groups.items()}
+    code_of_series = code_arr[order][last_index]
+
+    results: Dict[Hashable, List[Dict[str, Any]]] = {}
+    for index in np.flatnonzero(recurring):
+        cadence = CADENCES[cadence_index[index]]
+        last_row = kept[order[last_index[index]]]
+        last_date = date.fromordinal(int(days_sorted[last_index[index]]))
+        expected = next_occurrence(last_date, cadence)
+        user_id, key = keys[int(code_of_series[index])]
+        results.setdefault(user_id, []).append({
+            "description": last_row[1],
+            "merchant": key,
+            "category": last_row[2],
+            "average_amount": from_minor(int(round(amount_totals[index] / counts[index]))),
+            "last_amount": from_minor(int(last_row[3])),
+            "frequency": int(counts[index]),
+            "cadence": cadence.name,
+            "interval_days": round(float(median_gap[index]), 1),
+            "regularity": round(float(regularity[index]), 2),
+            "last_date": last_date.isoformat(),
+            "next_expected_date": expected.isoformat(),
+            # Overdue by more than twice the cadence tolerance: probably cancelled.
+            "active": (as_of - expected).days <= 2 * cadence.tolerance,
+        })
+
+    for series_list in results.values():
+        series_list.sort(key=lambda item: (-item["frequency"], -item["average_amount"]))
+    return results
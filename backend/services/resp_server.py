@@ -0,0 +1,168 @@
+"""Small Redis-protocol server for local development and tests.
+
+Implements the subset of commands the cache backend uses: PING, SELECT,
+GET, MGET, SET (with EX/PX/NX), DEL, INCR, FLUSHALL, PUBLISH and SUBSCRIBE.
+Data lives in memory and the database index passed to SELECT is ignored.
+
+Run it standalone with ``python -m services.resp_server --port 6379`` and
+point workers at it with ``CACHE_URL=redis://127.0.0.1:6379/0``.
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from services.cache_backend import CacheBackendError, read_reply
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(items: List[bytes]) -> bytes:
+    return b"*%d\r\n" % len(items) + b"".join(items)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "RespServer"
+
+    def handle(self) -> None:
+        write_lock = threading.Lock()
+        subscriptions: Set[bytes] = set()
+
+        def write(data: bytes) -> None:
+            with write_lock:
+                self.wfile.write(data)
+                self.wfile.flush()
+
+        try:
+            while True:
+                try:
+                    command = read_reply(self.rfile)
+                except CacheBackendError:
+                    break
+                if not isinstance(command, list) or not command:
+                    write(b"-ERR protocol error\r\n")
+                    continue
+                name = command[0].upper()
+                if name == b"SUBSCRIBE":
+                    for channel in command[1:]:
+                        subscriptions.add(channel)
+                        self.server.add_subscriber(channel, write)
+                        write(_array([_bulk(b"subscribe"), _bulk(channel), b":%d\r\n" % len(subscriptions)]))
+                    continue
+                write(self.server.execute(name, command[1:]))
+        except OSError:
+            pass
+        finally:
+            for channel in subscriptions:
+                self.server.remove_subscriber(channel, write)
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self._data: Dict[bytes, Tuple[Optional[float], bytes]] = {}
+        self._subscribers: Dict[bytes, list] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "RespServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="resp-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def add_subscriber(self, channel: bytes, write) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(write)
+
+    def remove_subscriber(self, channel: bytes, write) -> None:
+        with self._lock:
+            writers = self._subscribers.get(channel, [])
+            if write in writers:
+                writers.remove(write)
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[1]
+
+    def execute(self, name: bytes, args: List[bytes]) -> bytes:
+        with self._lock:
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name == b"SELECT":
+                return b"+OK\r\n"
+            if name == b"GET":
+                return _bulk(self._get(args[0]))
+            if name == b"MGET":
+                return _array([_bulk(self._get(key)) for key in args])
+            if name == b"SET":
+                expires_at = None
+                options = [arg.upper() for arg in args[2:]]
+                if b"PX" in options:
+                    expires_at = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+                elif b"EX" in options:
+                    expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+                if b"NX" in options and self._get(args[0]) is not None:
+                    return b"$-1\r\n"
+                self._data[args[0]] = (expires_at, args[1])
+                return b"+OK\r\n"
+            if name == b"DEL":
+                removed = sum(1 for key in args if self._data.pop(key, None) is not None)
+                return b":%d\r\n" % removed
+            if name == b"INCR":
+                current = self._get(args[0])
+                try:
+                    value = int(current or b"0") + 1
+                except ValueError:
+                    return b"-ERR value is not an integer or out of range\r\n"
+                expires_at = self._data.get(args[0], (None, b""))[0]
+                self._data[args[0]] = (expires_at, str(value).encode())
+                return b":%d\r\n" % value
+            if name == b"FLUSHALL":
+                self._data.clear()
+                return b"+OK\r\n"
+            if name == b"PUBLISH":
+                writers = list(self._subscribers.get(args[0], []))
+            else:
+                return b"-ERR unknown command '%s'\r\n" % name
+        message = _array([_bulk(b"message"), _bulk(args[0]), _bulk(args[1])])
+        delivered = 0
+        for write in writers:
+            try:
+                write(message)
+                delivered += 1
+            except OSError:
+                self.remove_subscriber(args[0], write)
+        return b":%d\r\n" % delivered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Redis-protocol stand-in for the WealthWise cache.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    options = parser.parse_args()
+    server = RespServer(options.host, options.port)
+    print(f"Serving RESP on {server.url}")
+    server.serve_forever()
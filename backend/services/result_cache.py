@@ -0,0 +1,292 @@
+"""Bounded LRU/TTL cache for per-user computed results.
+
+Entries are keyed on (user_id, endpoint, params) and tagged with the data
+domains they were computed from ("transactions", "incomes", "budgets",
+"goals"). When a user's data in a domain changes, only that user's entries
+tagged with that domain are dropped; nothing else is scanned.
+
+A cache given a ``name`` and a shared backend (see
+:mod:`services.cache_backend`) also keeps a second tier there, so a result
+computed by one worker is reused by the others. Shared keys embed per-user,
+per-domain generation counters; invalidating bumps the counters, which
+orphans every stale shared entry at once, and broadcasts the invalidation
+so other workers drop their local copies.
+
+A result is only stored if no invalidation for its user and domains landed
+while it was being computed; otherwise it may predate the write and is
+returned to this caller but not cached.
+"""
+
+import functools
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from services.cache_backend import CacheBackend, CacheBackendError, cache_backend
+
+
+def _json_default(value: Any) -> Any:
+    # Same conversions FastAPI applies when it serializes the response.
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class ResultCache:
+    """Thread-safe LRU cache with TTL expiry and per-user tag invalidation."""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: float = 300.0,
+        name: Optional[str] = None,
+        backend: Optional[CacheBackend] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self.backend = backend if name else None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, str, frozenset]]" = OrderedDict()
+        self._by_user: Dict[str, Dict[Hashable, frozenset]] = {}
+        # user_id -> {domain or "*": local invalidation count}; read before a compute
+        # and compared before its result is stored.
+        self._generations: Dict[str, Dict[str, int]] = {}
+        self._epoch = 0  # bumped by clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+        self.discarded = 0
+        if self.backend is not None:
+            self.backend.on_invalidate(name, self.invalidate_local)
+
+    @property
+    def shared(self) -> bool:
+        return self.backend is not None and self.backend.shared
+
+    @staticmethod
+    def make_key(user_id: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Hashable:
+        return (user_id, endpoint, tuple(sorted((params or {}).items())))
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, user_id, _ = self._entries.pop(key)
+        user_keys = self._by_user.get(user_id)
+        if user_keys is not None:
+            user_keys.pop(key, None)
+            if not user_keys:
+                del self._by_user[user_id]
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            if entry[0] <= now:
+                self._drop(key)
+                self.evictions += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: Hashable, value: Any, user_id: str, domains: Iterable[str]) -> None:
+        with self._lock:
+            self._set_locked(key, value, user_id, frozenset(domains))
+
+    def _set_locked(self, key: Hashable, value: Any, user_id: str, tags: frozenset) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value, user_id, tags)
+        self._by_user.setdefault(user_id, {})[key] = tags
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _generation_locked(self, user_id: str, domains: Tuple[str, ...]) -> Tuple[int, ...]:
+        generations = self._generations.get(user_id, {})
+        return (self._epoch, *(generations.get(scope, 0) for scope in ("*", *domains)))
+
+    def _set_if_current(
+        self, key: Hashable, value: Any, user_id: str, domains: Tuple[str, ...], generation: Tuple[int, ...],
+    ) -> bool:
+        """Store ``value`` unless the user's ``domains`` were invalidated since ``generation`` was read."""
+        with self._lock:
+            if self._generation_locked(user_id, domains) != generation:
+                self.discarded += 1
+                return False
+            self._set_locked(key, value, user_id, frozenset(domains))
+            return True
+
+    def get_or_compute(
+        self,
+        user_id: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        domains: Iterable[str],
+        compute: Callable[[], Any],
+    ) -> Any:
+        key = self.make_key(user_id, endpoint, params)
+        domains = tuple(domains)
+        with self._lock:
+            generation = self._generation_locked(user_id, domains)
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        # Shared keys embed the generations read here, so an invalidation during the
+        # compute below already makes the shared entry unreachable.
+        shared_key = self._shared_key(key, user_id, domains) if self.shared else None
+        if shared_key is not None:
+            try:
+                raw = self.backend.get_many([shared_key])[0]
+            except CacheBackendError:
+                self.shared_errors += 1
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.shared_hits += 1
+                self._set_if_current(key, value, user_id, domains, generation)
+                return value
+
+        value = compute()
+        if not self._set_if_current(key, value, user_id, domains, generation):
+            return value
+        if shared_key is not None:
+            try:
+                self.backend.set(shared_key, json.dumps(value, default=_json_default).encode(), self.ttl_seconds)
+            except (CacheBackendError, TypeError, ValueError):
+                self.shared_errors += 1
+        return value
+
+    def _generation_keys(self, user_id: str, domains: Optional[Iterable[str]]) -> List[str]:
+        # The "*" counter is bumped by a full invalidation and read by every lookup.
+        scopes = ["*"] if domains is None else sorted(domains)
+        return [f"wealthwise:gen:{user_id}:{scope}" for scope in scopes]
+
+    def _shared_key(self, key: Hashable, user_id: str, domains: Tuple[str, ...]) -> Optional[str]:
+        gen_keys = self._generation_keys(user_id, None) + self._generation_keys(user_id, domains)
+        try:
+            generations = self.backend.get_many(gen_keys)
+        except CacheBackendError:
+            self.shared_errors += 1
+            return None
+        raw = repr(key) + "|" + ",".join((gen or b"0").decode() for gen in generations)
+        return f"wealthwise:{self.name}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def invalidate(
+        self,
+        user_id: str,
+        domains: Optional[Iterable[str]] = None,
+        broadcast: bool = True,
+    ) -> int:
+        """Drop the user's entries tagged with any of ``domains`` (all if None).
+
+        With a backend, the shared tier and the other workers' local copies
+        are invalidated too. Pass ``broadcast=False`` when every worker
+        receives the same invalidation anyway; only local copies are dropped
+        then, and one of the workers should call :meth:`invalidate_shared`.
+        """
+        domains = tuple(domains) if domains is not None else None
+        dropped = self.invalidate_local(user_id, domains)
+        if self.backend is None or not broadcast:
+            return dropped
+        self.invalidate_shared(user_id, domains)
+        self.backend.broadcast_invalidation(self.name, user_id, domains)
+        return dropped
+
+    def invalidate_shared(self, user_id: str, domains: Optional[Iterable[str]] = None) -> None:
+        """Orphan the user's shared entries tagged with any of ``domains`` (all if None)."""
+        if not self.shared:
+            return
+        try:
+            for gen_key in self._generation_keys(user_id, domains):
+                self.backend.incr(gen_key)
+        except CacheBackendError:
+            self.shared_errors += 1
+
+    def invalidate_local(self, user_id: str, domains: Optional[Iterable[str]] = None) -> int:
+        """Drop matching entries from this process only."""
+        changed = frozenset(domains) if domains is not None else None
+        with self._lock:
+            generations = self._generations.setdefault(user_id, {})
+            for scope in changed if changed is not None else ("*",):
+                generations[scope] = generations.get(scope, 0) + 1
+            user_keys = self._by_user.get(user_id)
+            if not user_keys:
+                return 0
+            stale = [
+                key for key, tags in user_keys.items()
+                if changed is None or tags & changed
+            ]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            # Anything computing now may predate whatever prompted the clear.
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "shared": self.shared,
+                "shared_hits": self.shared_hits,
+                "shared_errors": self.shared_errors,
+                "discarded": self.discarded,
+            }
+
+
+report_cache = ResultCache(max_entries=4096, ttl_seconds=600.0, name="reports", backend=cache_backend)
+
+
+def cached_report(*domains: str, cache: Optional[ResultCache] = None):
+    """Cache a report route's result per (user_id, endpoint, query params).
+
+    The route must take ``user_id`` as a keyword argument (FastAPI always
+    passes dependencies by keyword). ``etag`` is ignored when building the
+    key, and today's date is added because several reports are relative
+    to it.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target = cache or report_cache
+            params = {k: v for k, v in kwargs.items() if k not in ("user_id", "etag")}
+            params["_day"] = date.today().isoformat()
+            return target.get_or_compute(
+                kwargs["user_id"],
+                func.__name__,
+                params,
+                domains,
+                lambda: func(*args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
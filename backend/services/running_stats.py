@@ -0,0 +1,150 @@
+"""Per-(user, category) running statistics of expense amounts.
+
+The ``category_stats`` table (migrations/SETUP_CATEGORY_STATS.sql) keeps,
+for every user and category, the count, mean and M2 of expense amounts
+(Welford's online algorithm) plus an exponentially weighted average of
+recent amounts. Each write in transactions.py updates the rows it
+touches in O(1), so the insert response can say whether the new amount
+is unusual and reports can read averages without scanning history.
+
+Amounts are paise. Removing a value reverses Welford exactly. The EWMA
+cannot be unwound, so a delete leaves it alone; it drifts back as new
+amounts arrive.
+"""
+
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from services.money import from_minor
+
+
+# Weight of the newest amount in the exponentially weighted average.
+EWMA_ALPHA = 0.2
+# z-score above which a new amount is flagged, once the category has history.
+ANOMALY_Z = 3.0
+MIN_ANOMALY_COUNT = 5
+
+# (category_id, amount_minor) for one expense row.
+Entry = Tuple[int, int]
+
+
+class RunningStats(NamedTuple):
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    ewma: Optional[float] = None
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def add(self, value: float) -> "RunningStats":
+        count = self.count + 1
+        delta = value - self.mean
+        mean = self.mean + delta / count
+        ewma = value if self.ewma is None else self.ewma + EWMA_ALPHA * (value - self.ewma)
+        return RunningStats(count, mean, self.m2 + delta * (value - mean), ewma)
+
+    def remove(self, value: float) -> "RunningStats":
+        if self.count <= 1:
+            return RunningStats()
+        count = self.count - 1
+        mean = (self.count * self.mean - value) / count
+        m2 = max(self.m2 - (value - mean) * (value - self.mean), 0.0)
+        return RunningStats(count, mean, m2, self.ewma)
+
+    def z_score(self, value: float) -> Optional[float]:
+        """How many standard deviations ``value`` is above the mean, if that is defined."""
+        std_dev = self.std_dev
+        if self.count < 2 or std_dev == 0:
+            return None
+        return (value - self.mean) / std_dev
+
+    def is_anomaly(self, value: float) -> bool:
+        z_score = self.z_score(value)
+        return self.count >= MIN_ANOMALY_COUNT and z_score is not None and z_score > ANOMALY_Z
+
+    def to_dict(self) -> Dict:
+        return {
+            "transaction_count": self.count,
+            "average_amount": from_minor(round(self.mean)),
+            "std_dev": from_minor(round(self.std_dev)),
+            "recent_average": from_minor(round(self.ewma)) if self.ewma is not None else None,
+        }
+
+
+def _lock_stats(cur, user_id: str, category_ids: List[int]) -> Dict[int, RunningStats]:
+    # Create missing rows first so concurrent writers contend on the same row lock;
+    # lock in id order so two multi-category writes cannot deadlock.
+    cur.execute(
+        """
+        INSERT INTO category_stats (user_id, category_id)
+        SELECT %s, unnest(%s::int[])
+        ON CONFLICT (user_id, category_id) DO NOTHING;
+        """,
+        (user_id, category_ids),
+    )
+    cur.execute(
+        """
+        SELECT category_id, count, mean, m2, ewma
+        FROM category_stats
+        WHERE user_id = %s AND category_id = ANY(%s)
+        ORDER BY category_id
+        FOR UPDATE;
+        """,
+        (user_id, category_ids),
+    )
+    return {row[0]: RunningStats(row[1], row[2], row[3], row[4]) for row in cur.fetchall()}
+
+
+def apply_stat_changes(
+    cur,
+    user_id: str,
+    removed: Iterable[Entry] = (),
+    added: Iterable[Entry] = (),
+) -> Dict[int, Tuple[RunningStats, RunningStats]]:
+    """Remove and add expense amounts in the caller's transaction.
+
+    Returns ``{category_id: (before, after)}`` for every category touched.
+    ``added`` entries are applied in order, which is the order the EWMA sees.
+    """
+    removed = [entry for entry in removed if entry[0] is not None]
+    added = [entry for entry in added if entry[0] is not None]
+    category_ids = sorted({category_id for category_id, _ in removed + added})
+    if not category_ids:
+        return {}
+
+    before = _lock_stats(cur, user_id, category_ids)
+    after = dict(before)
+    for category_id, amount in removed:
+        after[category_id] = after[category_id].remove(amount)
+    for category_id, amount in added:
+        after[category_id] = after[category_id].add(amount)
+
+    cur.executemany(
+        """
+        UPDATE category_stats
+        SET count = %s, mean = %s, m2 = %s, ewma = %s, updated_at = NOW()
+        WHERE user_id = %s AND category_id = %s;
+        """,
+        [
+            (stats.count, stats.mean, stats.m2, stats.ewma, user_id, category_id)
+            for category_id, stats in after.items()
+        ],
+    )
+    return {category_id: (before[category_id], after[category_id]) for category_id in category_ids}
+
+
+def describe_amount(before: RunningStats, after: RunningStats, amount: int) -> Dict:
+    """Insert-response summary: the category's stats, and how ``amount`` compares to its history."""
+    z_score = before.z_score(amount)
+    return {
+        **after.to_dict(),
+        "z_score": round(z_score, 2) if z_score is not None else None,
+        "is_anomaly": before.is_anomaly(amount),
+    }
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np  # noqa: E402
+
+from services.anomalies import detect_anomalies, detect_anomalies_by_user, group_median  # noqa: E402
+
+
+AS_OF = date(2026, 6, 20)
+
+
+def test_group_median_handles_odd_even_and_empty_groups():
+    values = np.array([5.0, 1.0, 3.0, 10.0, 20.0])
+    groups = np.array([0, 0, 0, 2, 2])
+
+    medians, counts = group_median(values, groups, 3)
+
+    assert medians[0] == 3.0 and medians[2] == 15.0 and np.isnan(medians[1])
+    assert counts.tolist() == [3, 0, 2]
+
+
+def test_single_large_purchase_is_flagged_but_normal_spread_is_not():
+    amounts = [180000, 220000, 250000, 199900, 210000, 240000, 5000000]
+    rows = [(index, "Shopping", amount, date(2026, 5, index + 1)) for index, amount in enumerate(amounts)]
+    rows += [(100 + index, "Food", 30000 + 1000 * index, date(2026, 5, index + 1)) for index in range(6)]
+
+    found = detect_anomalies(rows, as_of=AS_OF)["transactions"]
+
+    assert [item["id"] for item in found] == [6]
+    assert found[0]["amount"] == 50000.0
+    assert found[0]["typical_amount"] == 2200.0
+    assert found[0]["times_typical"] > 20
+
+
+def test_category_months_use_seasonal_baseline_when_available():
+    rows = []
+    for year in (2023, 2024, 2025):
+        for month in range(1, 13):
+            # Festive spending every October; a steady ₹3k otherwise.
+            amount = 2000000 if month == 10 else 300000
+            rows.append((len(rows), "Personal", amount, date(year, month, 10)))
+    rows.append((len(rows), "Personal", 900000, date(2026, 1, 10)))
+
+    months = detect_anomalies(rows, as_of=date(2026, 2, 1))["category_months"]
+
+    # The first two Octobers have no seasonal history yet and stand out; by 2025
+    # October is normal against earlier Octobers and only the January spike is flagged.
+    assert [(item["period"], item["type"]) for item in months] == [
+        ("2026-01", "High Spending"), ("2024-10", "High Spending"), ("2023-10", "High Spending"),
+    ]
+    assert months[0]["baseline"] == 3000.0
+    assert months[0]["seasonal"] is True
+
+
+def test_low_months_only_flagged_once_complete_and_users_are_separate():
+    rows = [("u1", month, "Bills", 500000, date(2026, month, 1)) for month in range(1, 6)]
+    rows += [("u1", 99, "Food", 10000, date(2026, 6, 2))]
+    rows += [("u2", 200 + month, "Bills", 500000, date(2026, month, 1)) for month in range(1, 3)]
+
+    in_june = detect_anomalies_by_user(rows, as_of=AS_OF)
+    in_july = detect_anomalies_by_user(rows, as_of=date(2026, 7, 1))
+
+    assert "u1" not in in_june
+    assert [(item["period"], item["type"]) for item in in_july["u1"]["category_months"]] == [
+        ("2026-06", "Low Spending")
+    ]
+    assert "u2" not in in_july
+
+
+def test_one_old_row_does_not_change_other_users():
+    rows = [("u1", month, "Bills", 500000, date(2026, month, 1)) for month in range(1, 6)]
+    rows += [("u1", 6, "Bills", 2500000, date(2026, 6, 1))]
+    alone = detect_anomalies_by_user(rows, as_of=AS_OF)
+
+    rows += [("u2", 99, "Food", 10000, date(1990, 1, 1)), ("u2", 100, "Food", 10000, date(2026, 6, 1))]
+    together = detect_anomalies_by_user(rows, as_of=AS_OF)
+
+    assert together["u1"] == alone["u1"]
+    assert [item["period"] for item in alone["u1"]["category_months"]] == ["2026-06"]
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks.backtest import MODELS, backtest, regressions, run, synthetic_datasets  # noqa: E402
+
+
+def test_rolling_origin_errors_of_a_naive_forecast():
+    # Last-month forecasts of [100, 200, 100, 0] from two months of history:
+    # origin 2 predicts 200 for 100, origin 3 predicts 100 for 0 (no MAPE term).
+    result = backtest([[100.0, 200.0, 100.0, 0.0]], MODELS["last_month"], min_history=2, repeat=1)
+
+    assert result["forecasts"] == 2
+    assert result["mae"] == 100.0
+    assert result["mape"] == 100.0
+
+
+def test_batched_holt_winters_matches_one_series_at_a_time():
+    datasets = synthetic_datasets(users=5, months=14)
+    models = {name: MODELS[name] for name in ("linear_trend", "holt_winters", "holt_winters_batch")}
+
+    results = run(datasets, models, repeat=1)
+
+    for by_model in results.values():
+        assert by_model["holt_winters"]["mae"] == by_model["holt_winters_batch"]["mae"]
+    assert results["short"]["linear_trend"]["forecasts"] == 5 * (9 - 3)
+
+
+def test_regressions_flags_accuracy_and_latency_but_not_timer_noise():
+    baseline = {"seasonal": {
+        "holt_winters": {"mape": 14.0, "us_per_forecast": 400.0},
+        "last_month": {"mape": 24.0, "us_per_forecast": 0.1},
+    }}
+    current = {"seasonal": {
+        "holt_winters": {"mape": 15.0, "us_per_forecast": 1000.0},
+        "last_month": {"mape": 24.2, "us_per_forecast": 0.5},
+    }}
+
+    assert regressions(baseline, current, mape_tolerance=0.5, latency_tolerance=2.0) == [
+        "seasonal/holt_winters: MAPE 14.0% -> 15.0%",
+        "seasonal/holt_winters: 400.0 -> 1000.0 us/forecast",
+    ]
@@ -0,0 +1,61 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from services.batch import run_batch
+
+
+def make_app(delays=None):
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scope)
+        await asyncio.sleep((delays or {}).get(scope["path"], 0))
+        if scope["path"] == "/missing":
+            status, body = 404, {"detail": "Not Found"}
+        else:
+            status, body = 200, {
+                "path": scope["path"],
+                "query": parse_qs(scope["query_string"].decode()),
+                "auth": dict(scope["headers"]).get(b"authorization", b"").decode(),
+            }
+        payload = json.dumps(body).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"etag", b'W/"abc"')],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    return app, seen
+
+
+def test_results_keyed_by_id_with_per_item_status():
+    app, seen = make_app()
+    items = [
+        {"id": "budgets", "path": "/budgets/", "params": {"month": 2, "year": 2026}},
+        {"id": "gone", "path": "/missing"},
+        {"id": "goal", "path": "/goals/42?verbose=1"},
+    ]
+    results = asyncio.run(run_batch(app, items, [(b"authorization", b"Bearer test_user")]))
+
+    assert results["budgets"]["status"] == 200
+    assert results["budgets"]["body"]["query"] == {"month": ["2"], "year": ["2026"]}
+    assert results["budgets"]["body"]["auth"] == "Bearer test_user"
+    assert results["budgets"]["etag"] == 'W/"abc"'
+    assert results["gone"] == {"status": 404, "body": {"detail": "Not Found"}, "etag": 'W/"abc"'}
+    assert results["goal"]["body"]["path"] == "/goals/42"
+    assert all(scope["method"] == "GET" for scope in seen)
+
+
+def test_sub_requests_run_concurrently():
+    app, _ = make_app(delays={"/slow": 0.2})
+    items = [{"id": str(i), "path": "/slow"} for i in range(4)]
+
+    async def timed():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await run_batch(app, items)
+        return loop.time() - start
+
+    assert asyncio.run(timed()) < 0.5
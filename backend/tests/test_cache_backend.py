@@ -0,0 +1,89 @@
+import time
+from decimal import Decimal
+
+import pytest
+
+from services.cache_backend import RedisBackend, cache_backend_from_url
+from services.resp_server import RespServer
+from services.result_cache import ResultCache
+
+
+@pytest.fixture
+def server():
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_resp_round_trip(server):
+    backend = cache_backend_from_url(server.url)
+    assert isinstance(backend, RedisBackend)
+    backend.set("k", b"value", 60)
+    assert backend.get_many(["k", "missing"]) == [b"value", None]
+    assert backend.incr("n") == 1
+    assert backend.incr("n") == 2
+    assert backend.add("claim", b"first", 60) is True
+    assert backend.add("claim", b"second", 60) is False
+    assert backend.get_many(["claim"]) == [b"first"]
+    backend.delete(["k"])
+    assert backend.get_many(["k"]) == [None]
+    backend.close()
+
+
+def test_shared_tier_serves_other_workers(server):
+    worker_a = ResultCache(name="reports", backend=cache_backend_from_url(server.url))
+    worker_b = ResultCache(name="reports", backend=cache_backend_from_url(server.url))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"total": Decimal("12.50"), "day": "2024-01-01"}
+
+    assert worker_a.get_or_compute("u1", "summary", None, ["transactions"], compute)["total"] == Decimal("12.50")
+    assert worker_b.get_or_compute("u1", "summary", None, ["transactions"], compute) == {"total": 12.5, "day": "2024-01-01"}
+    assert len(calls) == 1
+    assert worker_b.stats()["shared_hits"] == 1
+
+
+def test_invalidation_reaches_other_workers(server):
+    worker_a = ResultCache(name="reports", backend=cache_backend_from_url(server.url))
+    worker_b = ResultCache(name="reports", backend=cache_backend_from_url(server.url))
+    key = ResultCache.make_key("u1", "summary")
+    worker_a.get_or_compute("u1", "summary", None, ["transactions"], lambda: 1)
+    worker_b.get_or_compute("u1", "summary", None, ["transactions"], lambda: 1)
+    assert worker_b.get(key)[0]
+
+    worker_a.invalidate("u1", ["transactions"])
+
+    assert _wait_for(lambda: not worker_b.get(key)[0])
+    # The shared copy is orphaned by the generation bump, so B recomputes.
+    assert worker_b.get_or_compute("u1", "summary", None, ["transactions"], lambda: 2) == 2
+
+
+def test_unreachable_backend_degrades_to_local():
+    cache = ResultCache(name="reports", backend=RedisBackend("127.0.0.1", 1, timeout=0.1))
+    assert cache.get_or_compute("u1", "summary", None, ["transactions"], lambda: 5) == 5
+    assert cache.get_or_compute("u1", "summary", None, ["transactions"], lambda: 6) == 5
+    assert cache.stats()["shared_errors"] >= 1
+
+
+def test_local_only_invalidation_leaves_shared_generations_alone(server):
+    backend = cache_backend_from_url(server.url)
+    workers = [ResultCache(name="reports", backend=backend) for _ in range(3)]
+    gen_key = "wealthwise:gen:u1:transactions"
+
+    for worker in workers:
+        worker.invalidate("u1", ["transactions"], broadcast=False)
+    assert backend.get_many([gen_key]) == [None]
+
+    workers[0].invalidate_shared("u1", ["transactions"])
+    assert backend.get_many([gen_key]) == [b"1"]
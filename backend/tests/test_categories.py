@@ -0,0 +1,94 @@
+import os
+import re
+
+from services.categories import CATEGORY_MAP, CategoryDirectory, normalize_category
+
+
+MIGRATION = os.path.join(os.path.dirname(__file__), "..", "migrations", "SETUP_CATEGORIES.sql")
+
+
+class FakeCursor:
+    """Models Postgres visibility: a transaction sees its own uncommitted rows."""
+
+    def __init__(self, existing):
+        self.committed = dict(existing)
+        self.uncommitted = {}
+        self.next_id = 100
+        self.statements = []
+        self._result = None
+
+    def execute(self, sql, params):
+        sql = sql.strip()
+        self.statements.append(sql.split()[0])
+        label = params[0]
+        if sql.startswith("SELECT"):
+            if label in self.uncommitted:
+                self._result = (self.uncommitted[label], True)
+            elif label in self.committed:
+                self._result = (self.committed[label], False)
+            else:
+                self._result = None
+        else:
+            category_id = self.committed.get(label) or self.uncommitted.get(label)
+            if category_id is None:
+                category_id = self.uncommitted[label] = self.next_id
+                self.next_id += 1
+            self._result = (category_id,)
+
+    def fetchone(self):
+        return self._result
+
+    def commit(self):
+        self.committed.update(self.uncommitted)
+        self.uncommitted.clear()
+
+    def rollback(self):
+        self.uncommitted.clear()
+
+
+def test_normalize_category():
+    assert normalize_category(" groceries ") == "Food"
+    assert normalize_category("uber") == "Transport"
+    assert normalize_category("pet care") == "Pet Care"
+    assert normalize_category("Diwali 2025") == "Personal"
+    assert normalize_category(None) == "Uncategorized"
+    assert normalize_category("   ") == "Uncategorized"
+
+
+def test_resolve_caches_committed_labels_only():
+    directory = CategoryDirectory()
+    cur = FakeCursor({"Food": 4})
+
+    assert directory.resolve(cur, "groceries") == 4
+    assert directory.resolve(cur, "Restaurant") == 4
+    assert cur.statements == ["SELECT"]
+
+    # A label created inside the caller's transaction may still roll back,
+    # even once the transaction's own SELECT finds it.
+    assert directory.resolve(cur, "pet care") == 100
+    assert directory.resolve(cur, "Pet Care") == 100
+    assert cur.statements == ["SELECT", "SELECT", "INSERT", "SELECT"]
+
+    cur.rollback()
+    assert directory.resolve(cur, "pet care") == 101
+    cur.commit()
+    assert directory.resolve(cur, "Pet Care") == 101
+    cur.statements.clear()
+    assert directory.resolve(cur, "pet care") == 101
+    assert cur.statements == []
+
+
+def test_resolve_many_queries_each_distinct_label_once():
+    cur = FakeCursor({"Food": 4, "Transport": 7})
+    ids = CategoryDirectory().resolve_many(cur, ["uber", "food", "uber", "taxi"])
+
+    assert ids == {"uber": 7, "food": 4, "taxi": 7}
+    assert len(cur.statements) == 2
+
+
+def test_sql_category_label_matches_category_map():
+    with open(MIGRATION) as handle:
+        sql = handle.read()
+    aliases = dict(re.findall(r"\('([a-z]+)', '([A-Za-z]+)'\)", sql))
+
+    assert aliases == CATEGORY_MAP
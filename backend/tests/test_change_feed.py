@@ -0,0 +1,45 @@
+import json
+
+from services.change_feed import ChangeEvent, ChangeFeed
+
+
+def _payload(**overrides):
+    event = {"user_id": "u1", "domain": "transactions", "op": "insert", "version": 7, "ids": [41, 42]}
+    event.update(overrides)
+    return json.dumps(event)
+
+
+def test_dispatch_parses_and_fans_out():
+    feed = ChangeFeed(connect=lambda: None)
+    seen = []
+    unsubscribe = feed.subscribe(seen.append)
+
+    feed.dispatch(_payload())
+    feed.dispatch("not json")
+    unsubscribe()
+    feed.dispatch(_payload(op="delete"))
+
+    assert len(seen) == 1
+    assert (seen[0].user_id, seen[0].domain, seen[0].op, seen[0].version) == ("u1", "transactions", "insert", 7)
+    assert seen[0].to_dict()["ids"] == [41, 42]
+    assert feed.stats()["events"] == 2
+
+
+def test_bulk_events_may_omit_ids():
+    event = ChangeEvent.from_payload(_payload(ids=None))
+    assert event.ids is None
+    assert ChangeEvent.from_payload(json.dumps({"user_id": "u1"})) is None
+
+
+def test_listener_retries_until_stopped():
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        raise OSError("database unavailable")
+
+    feed = ChangeFeed(connect, poll_interval=0.05)
+    feed.start()
+    feed.stop()
+    assert attempts
+    assert not feed.stats()["connected"]
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from services.dashboard import MonthlySeries
+
+
+# Totals are paise, as stored in the database.
+TXN_ROWS = [
+    (2026, 1, "expense", "groceries", 30000, 3),
+    (2026, 1, "expense", None, 5000, 1),
+    (2026, 2, "expense", "groceries", 20000, 2),
+    (2026, 2, "expense", "transportation", 10000, 4),
+    (2026, 2, "income", "salary", 100000, 1),
+]
+INCOME_ROWS = [(2026, 1, 90000), (2026, 2, 120000)]
+
+
+def test_totals_and_summary():
+    series = MonthlySeries(TXN_ROWS, INCOME_ROWS)
+    assert series.txn_total("expense") == 650.0
+    assert series.income_total() == 2100.0
+    assert series.txn_total_minor("expense", (2026, 2)) == 30000
+    assert series.income_total_minor((2026, 2)) == 120000
+    summary = series.transaction_summary((2026, 2))
+    assert summary == {
+        "total_expense": 300.0,
+        "total_income": 1000.0,
+        "expenses_by_category": {"groceries": 200.0, "transportation": 100.0},
+    }
+    assert series.transaction_summary()["expenses_by_category"]["uncategorized"] == 50.0
+
+
+def test_category_breakdown_and_trend():
+    series = MonthlySeries(TXN_ROWS, INCOME_ROWS)
+    breakdown = series.category_breakdown()
+    assert breakdown["total_spent"] == 650.0
+    assert breakdown["breakdown"][0] == {
+        "category": "groceries",
+        "total_amount": 500.0,
+        "percentage": 76.92,
+        "transaction_count": 5,
+        "average_transaction": 100.0,
+    }
+    trend = series.savings_trend([(2026, 1), (2026, 2), (2026, 3)])
+    assert [point["net_savings"] for point in trend] == [550.0, 900.0, 0.0]
+    assert trend[1]["savings_rate_percentage"] == 75.0
+
+
+def test_insights_respect_selected_month():
+    series = MonthlySeries(TXN_ROWS, INCOME_ROWS)
+    insights = series.insights((2026, 1))
+    assert insights["monthly_expenses"] == [{"month": "2026-01", "expense": 350.0}]
+    assert insights["savings_projection"]["average_income"] == 900.0
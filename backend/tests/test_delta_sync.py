@@ -0,0 +1,23 @@
+import time
+
+import pytest
+
+from services.delta_sync import decode_sync_token, encode_sync_token, token_expired
+
+
+def test_token_round_trip():
+    token = encode_sync_token(123456789, issued_at=1_700_000_000)
+    assert "=" not in token
+    assert decode_sync_token(token) == (123456789, 1_700_000_000)
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "MjoxOjE"])  # "MjoxOjE" is version 2
+def test_malformed_tokens_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_sync_token(token)
+
+
+def test_tokens_expire_with_tombstone_retention():
+    now = time.time()
+    assert not token_expired(int(now - 86400), now=now)
+    assert token_expired(int(now - 31 * 86400), now=now)
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+
+import pytest
+
+from services.export_jobs import (
+    FAILED,
+    READY,
+    ExportJobManager,
+    ExportStore,
+    RangeNotSatisfiable,
+    artifact_key,
+    iter_file_range,
+    parse_range,
+)
+
+
+def wait_for(manager, user_id, key, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(user_id, key)
+        if job.status in (READY, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("export job did not finish")
+
+
+def test_artifact_key_changes_with_data_version():
+    params = {"report_type": "transactions", "format": "csv", "year": 2026, "month": 3}
+    key = artifact_key("u1", params, {"transactions": 4})
+
+    assert key == artifact_key("u1", dict(reversed(list(params.items()))), {"transactions": 4})
+    assert key != artifact_key("u1", params, {"transactions": 5})
+    assert key != artifact_key("u2", params, {"transactions": 4})
+
+
+def test_identical_exports_build_once_and_reuse_the_artifact(tmp_path):
+    manager = ExportJobManager(ExportStore(str(tmp_path)), max_workers=1)
+    release = threading.Event()
+    builds = []
+
+    def build(fileobj):
+        builds.append(1)
+        release.wait(1)
+        fileobj.write(b"Date,Amount\r\n2026-03-01,10.00\r\n")
+
+    first = manager.submit("u1", "k1", "csv", build)
+    second = manager.submit("u1", "k1", "csv", build)
+    assert second is first
+    release.set()
+
+    job = wait_for(manager, "u1", "k1")
+    assert job.status == READY
+    assert open(job.path, "rb").read().startswith(b"Date,Amount")
+
+    again = manager.submit("u1", "k1", "csv", build)
+    assert again.status == READY
+    assert len(builds) == 1
+    assert manager.get("u2", "k1") is None
+    assert manager.stats()["cache_hits"] == 1
+
+
+def test_failed_build_leaves_no_artifact(tmp_path):
+    manager = ExportJobManager(ExportStore(str(tmp_path)), max_workers=1)
+
+    def build(fileobj):
+        fileobj.write(b"partial")
+        raise RuntimeError("db went away")
+
+    manager.submit("u1", "k2", "csv", build)
+    job = wait_for(manager, "u1", "k2")
+
+    assert job.status == FAILED
+    assert job.to_dict()["error"] == "db went away"
+    assert manager.store.find("u1", "k2") is None
+    assert all(not files for _, _, files in os.walk(tmp_path))
+
+
+def test_prune_removes_expired_artifacts(tmp_path):
+    store = ExportStore(str(tmp_path), retention_seconds=60)
+    path = store.write("u1", "old", "csv", lambda f: f.write(b"x"))
+    store.write("u1", "new", "csv", lambda f: f.write(b"y"))
+    os.utime(path, (time.time() - 120, time.time() - 120))
+
+    assert store.prune() == 1
+    assert store.find("u1", "old") is None
+    assert store.find("u1", "new") is not None
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=9-3", 100)
+
+
+def test_iter_file_range_resumes_mid_file(tmp_path):
+    path = tmp_path / "artifact.csv"
+    path.write_bytes(bytes(range(256)) * 10)
+
+    assert b"".join(iter_file_range(str(path), 250, 1029, block_size=64)) == path.read_bytes()[250:1030]
+
+
+def test_iter_file_range_reads_an_open_file_after_prune(tmp_path):
+    path = tmp_path / "artifact.csv"
+    path.write_bytes(b"id,amount\n1,250\n")
+    fileobj = open(path, "rb")
+    path.unlink()
+
+    assert b"".join(iter_file_range(fileobj, 3, 8)) == b"amount"
+    assert fileobj.closed
@@ -0,0 +1,95 @@
+import csv
+import gzip
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from services.exports import (
+    EXPORT_SPECS,
+    clean_description,
+    iter_columnar,
+    iter_csv,
+    write_xlsx,
+)
+
+
+def test_clean_description():
+    assert clean_description("  Coffee   Shop ") == "Coffee Shop"
+    assert clean_description("No description") == "N/A"
+    assert clean_description(None) == "N/A"
+
+
+def test_iter_csv_streams_one_block_per_chunk():
+    chunks = [
+        [(date(2026, 3, 2), "Food", 1250, "expense", "Lunch  out", None)],
+        [(date(2026, 3, 1), "Personal", 90000, "income", "-", "UPI")],
+    ]
+    blocks = list(iter_csv(EXPORT_SPECS["transactions"], chunks))
+
+    assert len(blocks) == 3
+    rows = list(csv.reader(io.StringIO(b"".join(blocks).decode("utf-8"))))
+    assert rows == [
+        ["Date", "Category", "Amount", "Type", "Description", "Payment Mode"],
+        ["2026-03-02", "Food", "12.50", "expense", "Lunch out", "N/A"],
+        ["2026-03-01", "Personal", "900.00", "income", "N/A", "UPI"],
+    ]
+
+
+def test_iter_csv_gzip_round_trip():
+    chunks = [[("Car", "transport", 100000, 25000, date(2027, 1, 1))]] * 50
+    plain = b"".join(iter_csv(EXPORT_SPECS["goals"], chunks))
+    packed = b"".join(iter_csv(EXPORT_SPECS["goals"], chunks, gzip=True))
+
+    assert gzip.decompress(packed) == plain
+    assert len(packed) < len(plain)
+    assert b"Car,Transport,1000.00,250.00,25.00%,2027-01-01" in plain
+
+
+def test_columnar_exports_keep_types_and_normalization():
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    chunks = [
+        [(date(2026, 3, 2), "Transport", 1250, "expense", "Ride  home", None)],
+        [(date(2026, 3, 1), "Food", 4000, "expense", None, "UPI")],
+    ]
+    parquet = b"".join(iter_columnar("transactions", chunks, "parquet"))
+    table = pq.read_table(io.BytesIO(parquet))
+
+    assert pq.ParquetFile(io.BytesIO(parquet)).num_row_groups == 2
+    assert table.schema.field("date").type == pa.date32()
+    assert table.schema.field("amount").type == pa.decimal128(20, 2)
+    assert pa.types.is_dictionary(table.schema.field("category").type)
+    assert table.column("amount").to_pylist() == [Decimal("12.50"), Decimal("40.00")]
+    assert table.column("category").to_pylist() == ["Transport", "Food"]
+    assert table.column("description").to_pylist() == ["Ride home", "N/A"]
+
+    stream = b"".join(iter_columnar("transactions", chunks, "arrow"))
+    assert pa.ipc.open_stream(stream).read_all().equals(table)
+
+
+def test_columnar_exports_hold_the_bigint_amount_range():
+    pa = pytest.importorskip("pyarrow")
+
+    largest = 2 ** 63 - 1
+    chunks = [[(date(2026, 3, 1), "Food", largest, "expense", None, "UPI")]]
+    table = pa.ipc.open_stream(b"".join(iter_columnar("transactions", chunks, "arrow"))).read_all()
+
+    assert table.column("amount").to_pylist() == [Decimal("92233720368547758.07")]
+
+
+def test_write_xlsx_produces_typed_sheet():
+    import zipfile
+
+    buffer = io.BytesIO()
+    chunks = [[(date(2026, 3, 2), "Transport", 1250, "expense", "Tea & <snacks>", None)]]
+    write_xlsx(EXPORT_SPECS["transactions"], chunks, buffer, sheet_name="Transactions")
+
+    workbook = zipfile.ZipFile(io.BytesIO(buffer.getvalue()))
+    sheet = workbook.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert "[Content_Types].xml" in workbook.namelist()
+    assert '<c s="1"><v>46083</v></c>' in sheet  # 2026-03-02 as an Excel date serial
+    assert "<c><v>12.50</v></c>" in sheet
+    assert "Tea &amp; &lt;snacks&gt;" in sheet
@@ -0,0 +1,143 @@
+import asyncio
+import json
+
+from services.cache_backend import InProcessBackend
+from services.idempotency import IdempotencyMiddleware, IdempotencyStore
+
+
+# Both tokens belong to the same user, as before and after a refresh.
+USERS = {"Bearer token-1": "user-1", "Bearer token-2": "user-1"}
+
+
+def middleware(app, **kwargs):
+    return IdempotencyMiddleware(app, caller_id=USERS.get, **kwargs)
+
+
+def make_app(calls, delay=0.0, status=201):
+    async def app(scope, receive, send):
+        message = await receive()
+        calls.append(message["body"])
+        await asyncio.sleep(delay)
+        body = json.dumps({"n": len(calls)}).encode()
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+async def post(app, path="/transactions/", key=b"k1", body=b'{"amount": 5}', token=b"Bearer token-1"):
+    scope = {"type": "http", "method": "POST", "path": path,
+             "headers": [(b"idempotency-key", key), (b"authorization", token)]}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    headers = dict(sent[0]["headers"])
+    return sent[0]["status"], sent[1]["body"], headers
+
+
+def test_retry_replays_stored_response():
+    calls = []
+    app = middleware(make_app(calls))
+
+    async def run():
+        first = await post(app)
+        second = await post(app)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert first[1] == second[1]
+    assert second[2][b"idempotent-replayed"] == b"true"
+
+
+def test_concurrent_retry_waits_for_in_flight_request():
+    calls = []
+    app = middleware(make_app(calls, delay=0.05))
+
+    async def run():
+        return await asyncio.gather(post(app), post(app), post(app))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert len({body for _, body, _ in results}) == 1
+
+
+def test_key_reuse_with_different_body_is_rejected():
+    app = middleware(make_app([]))
+
+    async def run():
+        await post(app)
+        return await post(app, body=b'{"amount": 6}')
+
+    assert asyncio.run(run())[0] == 422
+
+
+def test_server_errors_are_not_stored():
+    calls = []
+    app = middleware(make_app(calls, status=500))
+
+    async def run():
+        await post(app)
+        await post(app)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_retry_after_token_refresh_is_the_same_caller():
+    calls = []
+    app = middleware(make_app(calls))
+
+    async def run():
+        await post(app)
+        return await post(app, token=b"Bearer token-2")
+
+    assert asyncio.run(run())[2][b"idempotent-replayed"] == b"true"
+    assert len(calls) == 1
+
+
+def test_unauthenticated_requests_are_not_recorded():
+    calls = []
+    app = middleware(make_app(calls))
+
+    async def run():
+        await post(app, token=b"Bearer unknown")
+        await post(app, token=b"Bearer unknown")
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_retry_on_another_worker_replays_through_shared_backend():
+    calls = []
+    shared = InProcessBackend()
+    worker_a = middleware(make_app(calls, delay=0.05), backend=shared, poll_interval=0.01)
+    worker_b = middleware(make_app(calls), backend=shared, poll_interval=0.01)
+
+    async def run():
+        # The second worker sees the claim, waits, then replays the first worker's response.
+        return await asyncio.gather(post(worker_a), post(worker_b))
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert first[1] == second[1]
+    assert second[2][b"idempotent-replayed"] == b"true"
+
+    async def mismatch():
+        return await post(worker_b, body=b'{"amount": 6}')
+
+    assert asyncio.run(mismatch())[0] == 422
+
+
+def test_store_evicts_oldest_completed_entries():
+    store = IdempotencyStore(max_entries=2)
+    for key in (b"a", b"b", b"c"):
+        store.begin(key, b"fp")
+        store.complete(key, 200, [], b"{}")
+    store.begin(b"d", b"fp")
+    assert len(store) == 2
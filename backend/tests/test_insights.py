@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from services.insights import summarize, summarize_by_user  # noqa: E402
+
+
+def _expenses(monthly_food, rent=0):
+    rows = [(2026, month, "Food", amount) for month, amount in enumerate(monthly_food, start=1)]
+    if rent:
+        rows += [(2026, month, "Rent", rent) for month in range(1, len(monthly_food) + 1)]
+    return rows
+
+
+def test_summary_totals_categories_per_month():
+    summary = summarize(_expenses([100000, 120000, 110000], rent=900000), [(2026, 1, 5000000), (2026, 2, 5000000)])
+
+    assert summary["monthly_expenses"] == [
+        {"month": "2026-01", "expense": 10000.0},
+        {"month": "2026-02", "expense": 10200.0},
+        {"month": "2026-03", "expense": 10100.0},
+    ]
+    assert summary["savings_projection"]["projected_monthly_savings"] == 39900.0
+    assert [item["category"] for item in summary["spending_forecast"]["by_category"]] == ["Rent", "Food"]
+    assert summary["anomaly_detection"]["is_anomaly"] is False
+
+
+def test_batch_matches_one_user_at_a_time():
+    data = {
+        "u1": (_expenses([100000, 120000, 110000, 130000], rent=900000), [(2026, 1, 5000000)]),
+        "u2": (_expenses([50000, 70000, 40000, 90000]), []),
+        "u3": (_expenses([20000]), [(2026, 1, 100000)]),
+        "u4": ([], []),
+    }
+
+    batch = summarize_by_user(data)
+
+    assert batch == {user: summarize(*rows) for user, rows in data.items()}
+    assert batch["u4"]["spending_forecast"]["seasonal"] is None
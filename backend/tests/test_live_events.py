@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.live_events import LiveEventHub, format_sse
+
+
+def test_format_sse_frame():
+    frame = format_sse("summary", {"total": 5}, event_id=3)
+    assert frame == b'id: 3\nevent: summary\ndata: {"total":5}\n\n'
+
+
+def test_publish_from_thread_reaches_stream():
+    async def scenario():
+        hub = LiveEventHub()
+        subscription = hub.subscribe("u1")
+        stream = hub.stream(subscription, heartbeat_seconds=1.0)
+        assert await stream.__anext__() == b"retry: 5000\n\n"
+
+        thread = threading.Thread(target=hub.publish, args=("u1", "budget_alert", {"percentage": 91.0}))
+        thread.start()
+        frame = await asyncio.wait_for(stream.__anext__(), 1.0)
+        thread.join()
+        assert b"event: budget_alert" in frame
+
+        assert hub.publish("u2", "summary", {}) == 0
+        await stream.aclose()
+        assert not hub.has_subscribers("u1")
+
+    asyncio.run(scenario())
+
+
+def test_bounded_queue_coalesces_and_signals_resync():
+    async def scenario():
+        hub = LiveEventHub(max_queue=3)
+        subscription = hub.subscribe("u1")
+        for total in range(10):
+            hub.publish("u1", "summary", {"total": total}, coalesce="summary")
+        events = subscription.drain()
+        assert events == [("summary", {"total": 9}, "summary")]
+
+        for index in range(5):
+            hub.publish("u1", "changed", {"index": index})
+        events = subscription.drain()
+        assert events[0] == ("resync", {"dropped": 2}, None)
+        assert [data["index"] for _, data, _ in events[1:]] == [2, 3, 4]
+
+    asyncio.run(scenario())
+
+
+def test_connection_limit_per_user():
+    async def scenario():
+        hub = LiveEventHub(max_connections_per_user=1)
+        subscription = hub.subscribe("u1")
+        assert not hub.has_capacity("u1")
+        with pytest.raises(OverflowError):
+            hub.subscribe("u1")
+        hub.unsubscribe(subscription)
+        assert hub.has_capacity("u1")
+
+    asyncio.run(scenario())
+
+
+def test_stream_ticket_is_single_use():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("jwt")
+    from auth import issue_stream_ticket, redeem_stream_ticket
+
+    ticket = issue_stream_ticket("u1")
+    assert redeem_stream_ticket(ticket) == "u1"
+    assert redeem_stream_ticket(ticket) is None
+    assert redeem_stream_ticket("forged") is None
@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+import pytest
+
+from services.money import from_minor, minor_to_decimal, to_minor, to_minor_or_none
+
+
+def test_to_minor_rounds_half_up_without_float_noise():
+    assert to_minor(12.5) == 1250
+    assert to_minor(0.1 + 0.2) == 30
+    assert to_minor("19.995") == 2000
+    assert to_minor(Decimal("0.004")) == 0
+    assert to_minor(-2.345) == -235
+    assert to_minor_or_none(None) is None
+
+
+def test_from_minor_returns_rupees():
+    assert from_minor(1250) == 12.5
+    assert from_minor(Decimal("99999")) == 999.99
+    assert from_minor(None) == 0.0
+
+
+def test_minor_to_decimal_keeps_two_places():
+    assert str(minor_to_decimal(123456)) == "1234.56"
+    assert str(minor_to_decimal(100000)) == "1000.00"
+    assert str(minor_to_decimal(-5)) == "-0.05"
+    assert minor_to_decimal(None) is None
+
+
+def test_to_minor_rejects_non_finite_and_out_of_range_amounts():
+    for amount in (float("inf"), float("-inf"), float("nan"), "abc", 1e30, Decimal("92233720368547758.08")):
+        with pytest.raises(ValueError):
+            to_minor(amount)
+    assert to_minor(Decimal("92233720368547758.07")) == 2 ** 63 - 1
@@ -0,0 +1,41 @@
+import json
+
+from services.ocr_metrics import Histogram, OcrMetrics, ScanTrace, receipt_field_confidence
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram((10, 100))
+    for value in (5, 50, 500):
+        hist.observe(value)
+    assert hist.snapshot()["buckets"] == {"10": 1, "100": 2, "+Inf": 3}
+
+
+def test_record_aggregates_stages_and_outcomes():
+    metrics = OcrMetrics(slow_threshold_ms=10_000)
+    trace = ScanTrace("scan-receipt", "u1")
+    trace.upload_bytes = 1234
+    with trace.stage("ocr"):
+        pass
+    trace.field_confidence = receipt_field_confidence({"amount": 12.5, "date": "", "vendor": "Cafe"})
+    trace.fail("empty_text")
+    metrics.record(trace)
+
+    snap = metrics.snapshot()
+    assert snap["scans"] == 1
+    assert snap["outcomes"] == {"empty_text": 1}
+    assert snap["stages_ms"]["ocr"]["count"] == 1
+    assert snap["field_extraction_rate"] == {"amount": 1.0, "date": 0.0, "vendor": 1.0}
+    assert "ocr_scans_total{outcome=\"empty_text\"} 1" in metrics.prometheus()
+
+
+def test_slow_scans_are_sampled_and_persisted(tmp_path):
+    metrics = OcrMetrics(slow_threshold_ms=0, replay_dir=str(tmp_path))
+    trace = ScanTrace("scan-and-create", "u1")
+    trace.upload = b"image-bytes"
+    trace.extracted_text = "TOTAL 10.00"
+    metrics.record(trace)
+
+    assert [scan["scan_id"] for scan in metrics.slow_scans()] == [trace.scan_id]
+    assert (tmp_path / f"{trace.scan_id}.bin").read_bytes() == b"image-bytes"
+    saved = json.loads((tmp_path / f"{trace.scan_id}.json").read_text())
+    assert saved["extracted_text"] == "TOTAL 10.00"
@@ -0,0 +1,116 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services.prediction_service import (  # noqa: E402
+    MAX_SIMULATION_MONTHS,
+    SIMULATION_BATCH,
+    fit_linear_trend,
+    forecast_expenses,
+    monthly_matrix,
+    next_month_forecasts,
+    predict_next_month_expense,
+    savings_projection,
+    simulate_savings,
+)
+
+
+def test_predict_next_month_extrapolates_least_squares_line():
+    # y = 100 + 50x exactly, plus one noisy case checked against the normal equations.
+    assert predict_next_month_expense([1, 2, 3, 4], [150, 200, 250, 300]) == 350.0
+    assert predict_next_month_expense([1, 2, 3], [10.0, 40.0, 20.0]) == 33.33
+    assert predict_next_month_expense([4], [123.456]) == 123.46
+    assert predict_next_month_expense([], []) == 0.0
+    assert predict_next_month_expense([1, 2], [5.0]) == 0.0
+
+
+def test_fit_linear_trend_handles_many_series_and_constant_x():
+    slope, intercept = fit_linear_trend([1, 2, 3], [[1, 2, 3], [6, 4, 2], [5, 5, 5]])
+
+    assert slope.tolist() == [1.0, -2.0, 0.0]
+    assert intercept.tolist() == [0.0, 8.0, 5.0]
+
+    slope, intercept = fit_linear_trend([2, 2], [3.0, 5.0])
+    assert slope == 0.0 and intercept == 4.0
+
+
+def test_matches_previous_sklearn_implementation():
+    pytest.importorskip("sklearn")
+    from benchmarks.prediction import legacy_predict_next_month_expense, synthetic_cases
+
+    for months, expenses in synthetic_cases(12, count=20):
+        assert predict_next_month_expense(months, expenses) == legacy_predict_next_month_expense(months, expenses)
+
+
+def test_monthly_matrix_aligns_and_zero_fills_series():
+    periods, series = monthly_matrix([
+        (2025, 11, "Food", 100.0), (2026, 1, "Food", 50.0), (2026, 1, "Food", 25.0), (2025, 12, "Rent", 900.0),
+    ])
+
+    assert periods == [(2025, 11), (2025, 12), (2026, 1)]
+    assert series == {"Food": [100.0, 0.0, 75.0], "Rent": [0.0, 900.0, 0.0]}
+    assert monthly_matrix([]) == ([], {})
+
+
+def test_seasonal_forecast_repeats_the_yearly_peak():
+    # Three years of a steady ₹3k with a festive ₹20k every October, ending in December.
+    festive = [20000.0 if month == 10 else 3000.0 for _ in range(3) for month in range(1, 13)]
+    steady = [1000.0 + 10 * index for index in range(36)]
+
+    forecasts = forecast_expenses({"Personal": festive, "Bills": steady}, horizon=12)
+    personal = forecasts["Personal"]
+
+    assert personal["model"] == "holt_winters"
+    assert personal["forecast"].index(max(personal["forecast"])) == 9
+    assert personal["forecast"][0] == pytest.approx(3000.0, rel=0.1)
+    assert forecasts["Bills"]["forecast"][0] == pytest.approx(1360.0, rel=0.05)
+    for forecast in forecasts.values():
+        assert all(lower <= point <= upper for lower, point, upper in zip(forecast["lower"], forecast["forecast"], forecast["upper"]))
+    widths = np.subtract(forecasts["Bills"]["upper"], forecasts["Bills"]["lower"])
+    assert all(np.diff(widths) >= 0)
+
+
+def test_short_histories_fall_back_to_holt_and_mean():
+    assert forecast_expenses({"Food": [100.0, 110.0, 120.0, 130.0]})["Food"]["model"] == "holt"
+    assert forecast_expenses({"Food": [100.0, 300.0]}, level=0.95) == {
+        "Food": {"model": "mean", "forecast": [200.0], "lower": [4.0], "upper": [396.0]}
+    }
+    assert forecast_expenses({}) == {}
+
+
+def test_next_month_forecasts_adds_total_and_sorts_categories():
+    summary = next_month_forecasts({"Food": [100.0, 100.0, 100.0], "Rent": [900.0, 900.0, 900.0]})
+
+    assert [item["category"] for item in summary["by_category"]] == ["Rent", "Food"]
+    assert summary["seasonal"]["predicted_next_month"] == pytest.approx(1000.0)
+    assert next_month_forecasts({}) == {"seasonal": None, "by_category": []}
+
+
+def test_simulation_without_variability_is_the_plain_projection():
+    result = simulate_savings([50000.0], [30000.0, 30000.0], months=6, seed=1)
+
+    assert result["trajectory"][-1] == {"month": 6, "p10": 120000.0, "p50": 120000.0, "p90": 120000.0}
+    assert result["expected_monthly_savings"] * 6 == savings_projection(50000.0, [30000.0], months=6)
+    assert result["paths"] == 10000
+
+
+def test_goals_are_funded_in_deadline_order():
+    goals = [
+        ("g1", "Trip", 40000.0, 2),
+        ("g2", "Laptop", 30000.0, 3),
+        ("g3", "House", 1e9, 2 * MAX_SIMULATION_MONTHS),
+    ]
+
+    found = simulate_savings([50000.0], [30000.0], months=3, goals=goals, seed=1)["goals"]
+
+    # 60k by month 3 covers the trip but not the trip plus the laptop.
+    assert [goal["probability"] for goal in found] == [1.0, 0.0, None]
+
+
+def test_simulation_bands_spread_and_respect_the_time_budget():
+    result = simulate_savings([50000.0, 60000.0], [20000.0, 45000.0], months=12, time_budget=0, seed=3)
+
+    assert result["paths"] == SIMULATION_BATCH
+    final = result["trajectory"][-1]
+    assert final["p10"] < final["p50"] < final["p90"]
+    assert final["p50"] == pytest.approx(12 * 22500.0, rel=0.05)
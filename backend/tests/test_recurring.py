@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from services.recurring import detect_recurring, detect_recurring_by_user, merchant_key  # noqa: E402
+
+
+AS_OF = date(2026, 6, 20)
+
+
+def monthly(description, amount, months, day=5, category="entertainment"):
+    return [(description, category, amount, date(2026, month, day)) for month in months]
+
+
+def test_merchant_key_ignores_case_domains_and_payment_rails():
+    assert merchant_key("NETFLIX.COM") == "netflix"
+    assert merchant_key("Netflix") == "netflix"
+    assert merchant_key("UPI-netflix 649") == "netflix"
+    assert merchant_key(None) == ""
+
+
+def test_merchant_key_keeps_alphanumeric_tokens():
+    assert merchant_key("Rent - Flat 4B") == "rent flat 4b"
+    assert merchant_key("Rent - Flat 7B") != merchant_key("Rent - Flat 4B")
+
+
+def test_fuzzy_descriptions_and_rounding_form_one_monthly_series():
+    rows = (
+        monthly("Netflix", 64900, [1, 3, 5])
+        + monthly("NETFLIX.COM", 64900, [2, 4, 6])
+        + [("Netflix gift card", "entertainment", 200000, date(2026, 3, 18))]
+    )
+
+    (series,) = detect_recurring(rows, as_of=AS_OF)
+
+    assert series["merchant"] == "netflix"
+    assert series["cadence"] == "monthly"
+    assert series["frequency"] == 6
+    assert series["average_amount"] == 649.0
+    assert series["last_date"] == "2026-06-05"
+    assert series["next_expected_date"] == "2026-07-05"
+    assert series["active"] is True
+
+
+def test_small_amount_changes_stay_in_series_and_cadences_are_classified():
+    rent = monthly("Rent - Flat 4B", 1500000, [1, 2, 3]) + monthly("Rent - Flat 4B", 1550000, [4, 5, 6])
+    gym = [("Gym", "health", 50000, date(2026, 5, 4) + timedelta(weeks=week)) for week in range(5)]
+    insurance = [("Car Insurance", "bills", 1200000, date(2024, 1, 31)), ("Car insurance", "bills", 1210000, date(2025, 1, 28))]
+    one_off = [("Amazon", "shopping", 9900, date(2026, 2, 11)), ("Amazon", "shopping", 9900, date(2026, 2, 13))]
+
+    series = {item["merchant"]: item for item in detect_recurring(rent + gym + insurance + one_off, as_of=AS_OF)}
+
+    assert set(series) == {"rent flat 4b", "gym", "car insurance"}
+    assert series["rent flat 4b"]["frequency"] == 6
+    assert series["rent flat 4b"]["last_amount"] == 15500.0
+    assert series["gym"]["cadence"] == "weekly"
+    assert series["gym"]["next_expected_date"] == "2026-06-08"
+    assert series["car insurance"]["cadence"] == "annual"
+    assert series["car insurance"]["next_expected_date"] == "2026-01-28"
+    assert series["car insurance"]["active"] is False
+
+
+def test_batch_mode_keeps_users_apart():
+    rows = [("u1", *row) for row in monthly("Spotify", 11900, [1, 2, 3])]
+    rows += [("u2", *row) for row in monthly("Spotify", 11900, [1, 2])]
+    rows += [("u2", *row) for row in monthly("Spotify", 11900, [3], day=20)]
+
+    result = detect_recurring_by_user(rows, as_of=AS_OF)
+
+    assert [item["frequency"] for item in result["u1"]] == [3]
+    # u2 paid on Jan 5, Feb 5 and Mar 20: a 37-day median gap is not monthly.
+    assert "u2" not in result
@@ -0,0 +1,68 @@
+import time
+
+from services.result_cache import ResultCache, cached_report
+
+
+def test_hit_after_first_compute():
+    cache = ResultCache()
+    calls = []
+    compute = lambda: calls.append(1) or {"total": 10}
+    for _ in range(3):
+        assert cache.get_or_compute("u1", "summary", {"month": 2}, ["transactions"], compute) == {"total": 10}
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_invalidation_is_per_user_and_domain():
+    cache = ResultCache()
+    cache.get_or_compute("u1", "breakdown", None, ["transactions"], lambda: 1)
+    cache.get_or_compute("u1", "goals", None, ["goals"], lambda: 2)
+    cache.get_or_compute("u2", "breakdown", None, ["transactions"], lambda: 3)
+
+    assert cache.invalidate("u1", ["transactions"]) == 1
+    assert cache.get(cache.make_key("u1", "goals"))[0]
+    assert cache.get(cache.make_key("u2", "breakdown"))[0]
+    assert not cache.get(cache.make_key("u1", "breakdown"))[0]
+
+
+def test_result_computed_across_an_invalidation_is_not_cached():
+    cache = ResultCache()
+
+    def compute_then_write_lands():
+        # The write commits and invalidates while this (now stale) result is built.
+        cache.invalidate("u1", ["transactions"])
+        return "stale"
+
+    assert cache.get_or_compute("u1", "summary", None, ["transactions"], compute_then_write_lands) == "stale"
+    assert cache.get_or_compute("u1", "summary", None, ["transactions"], lambda: "fresh") == "fresh"
+    assert cache.stats()["discarded"] == 1
+
+    # Invalidating an unrelated domain does not discard.
+    cache.invalidate("u1", ["goals"])
+    assert cache.get_or_compute("u1", "summary", None, ["transactions"], lambda: "other") == "fresh"
+
+
+def test_lru_and_ttl_eviction():
+    cache = ResultCache(max_entries=2, ttl_seconds=0.05)
+    for name in ("a", "b", "c"):
+        cache.set(cache.make_key("u1", name), name, "u1", ["transactions"])
+    assert not cache.get(cache.make_key("u1", "a"))[0]
+    time.sleep(0.06)
+    assert not cache.get(cache.make_key("u1", "c"))[0]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_cached_report_decorator_keys_on_params():
+    cache = ResultCache()
+    calls = []
+
+    @cached_report("transactions", cache=cache)
+    def report(year=None, user_id=None, etag=None):
+        calls.append(year)
+        return {"year": year}
+
+    report(year=2025, user_id="u1", etag="a")
+    report(year=2025, user_id="u1", etag="b")
+    report(year=2026, user_id="u1", etag="b")
+    assert calls == [2025, 2026]
@@ -0,0 +1,86 @@
+import statistics
+
+import pytest
+
+from services.running_stats import RunningStats, apply_stat_changes, describe_amount
+
+
+class FakeCursor:
+    """Holds category_stats rows in a dict and answers the three statements apply_stat_changes runs."""
+
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.statements = []
+        self._result = None
+
+    def execute(self, sql, params):
+        verb = sql.split()[0]
+        self.statements.append(verb)
+        user_id, category_ids = params
+        if verb == "INSERT":
+            for category_id in category_ids:
+                self.rows.setdefault((user_id, category_id), RunningStats())
+        else:
+            self._result = [
+                (category_id, *self.rows[(user_id, category_id)]) for category_id in sorted(category_ids)
+            ]
+
+    def executemany(self, sql, seq):
+        self.statements.append("UPDATE")
+        for count, mean, m2, ewma, user_id, category_id in seq:
+            self.rows[(user_id, category_id)] = RunningStats(count, mean, m2, ewma)
+
+    def fetchall(self):
+        return self._result
+
+
+def test_welford_add_and_remove_match_batch_statistics():
+    values = [120000, 95000, 143000, 99900, 101000, 250000]
+    stats = RunningStats()
+    for value in values:
+        stats = stats.add(value)
+
+    assert stats.count == 6
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+
+    stats = stats.remove(250000)
+    assert stats.mean == pytest.approx(statistics.mean(values[:-1]))
+    assert stats.variance == pytest.approx(statistics.variance(values[:-1]))
+    assert stats.remove(1).remove(1).remove(1).remove(1).remove(1) == RunningStats()
+
+
+def test_ewma_weights_recent_amounts():
+    stats = RunningStats().add(10000)
+    assert stats.ewma == 10000
+    stats = stats.add(20000)
+    assert stats.ewma == pytest.approx(12000)
+    assert stats.remove(20000).ewma == stats.ewma
+
+
+def test_apply_stat_changes_moves_amounts_between_categories():
+    cur = FakeCursor()
+    for amount in (10000, 12000, 11000, 9000, 10500):
+        apply_stat_changes(cur, "u1", added=[(1, amount)])
+
+    changes = apply_stat_changes(cur, "u1", removed=[(1, 12000)], added=[(2, 12000)])
+
+    assert set(changes) == {1, 2}
+    assert cur.rows[("u1", 1)].count == 4
+    assert cur.rows[("u1", 2)].count == 1 and cur.rows[("u1", 2)].mean == 12000
+    assert cur.statements[-3:] == ["INSERT", "SELECT", "UPDATE"]
+    assert apply_stat_changes(cur, "u1", added=[(None, 500)]) == {}
+
+
+def test_describe_amount_flags_outliers_against_prior_history():
+    before = RunningStats()
+    for amount in (200000, 210000, 190000, 205000, 195000):
+        before = before.add(amount)
+
+    usual = describe_amount(before, before.add(202000), 202000)
+    spike = describe_amount(before, before.add(5000000), 5000000)
+
+    assert usual["is_anomaly"] is False
+    assert spike["is_anomaly"] is True
+    assert spike["transaction_count"] == 6
+    assert usual["average_amount"] == pytest.approx(2003.33)
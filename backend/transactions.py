@@ -1,8 +1,9 @@
 """Transaction feature routes for WealthWise backend."""
 
+import io
+import logging
 import os
 import re
-import io
 from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 import numpy
@@ -21,11 +22,20 @@ if os.name == 'nt':
     pytesseract.pytesseract.pytesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
 from auth import get_current_user_id
+from data_versions import data_changed, etag_guard
 from database import get_db_connection
+from services.categories import category_directory
+from services.categorizer import category_engine
+from services.money import from_minor, to_minor, to_minor_or_none
+from services.ocr_metrics import ScanTrace, ocr_metrics, receipt_field_confidence
+from services.running_stats import apply_stat_changes, describe_amount
 
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
+# Receipt text stays out of stdout; enable DEBUG on this logger to see it.
+logger = logging.getLogger(__name__)
+
 
 class TransactionCreate(BaseModel):
     amount: float
@@ -39,10 +49,14 @@ class TransactionCreate(BaseModel):
     @field_validator("amount")
     @classmethod
     def validate_amount(cls, value: float) -> float:
-        if value <= 0:
+        if to_minor(value) <= 0:
             raise ValueError("Amount must be greater than zero")
         return value
 
+    @property
+    def amount_minor(self) -> int:
+        return to_minor(self.amount)
+
     @field_validator("txn_type")
     @classmethod
     def validate_type(cls, value: str) -> str:
@@ -62,10 +76,14 @@ class TransactionUpdate(BaseModel):
     @field_validator("amount")
     @classmethod
     def validate_amount(cls, value: Optional[float]) -> Optional[float]:
-        if value is not None and value <= 0:
+        if value is not None and to_minor(value) <= 0:
             raise ValueError("Amount must be greater than zero")
         return value
 
+    @property
+    def amount_minor(self) -> Optional[int]:
+        return to_minor_or_none(self.amount)
+
 
 # --- Helpers -----------------------------------------------------------------
 
@@ -80,8 +98,7 @@ def _extract_receipt_data(text: str) -> Dict[str, Any]:
     """
     lines = [line.strip() for line in text.split('\n') if line.strip()]
     amount = None
-    print(f">>> RAW OCR TEXT:\n{text}\n>>> END RAW TEXT")
-    print(f">>> Total lines: {len(lines)}")
+    logger.debug("raw OCR text (%d lines):\n%s", len(lines), text)
 
     # Strict amount extraction: Always prefer GRAND TOTAL if present
     grand_total_found = False
@@ -89,15 +106,13 @@ def _extract_receipt_data(text: str) -> Dict[str, Any]:
         line_upper = line.upper()
         if "GRAND" in line_upper and "TOTAL" in line_upper:
             grand_total_found = True
-            print(f"[OCR DEBUG] GRAND TOTAL line: '{line}'")
-            if i + 1 < len(lines):
-                print(f"[OCR DEBUG] Next line after GRAND TOTAL: '{lines[i+1]}'")
+            logger.debug("GRAND TOTAL line: %r", line)
             # Remove currency symbols and non-numeric chars except dot and comma
             clean_line = re.sub(r"[^0-9.,]", "", line)
             matches = re.findall(r'(\d{1,3}[.,]\d{2})', clean_line)
             if matches:
                 amount = float(matches[-1].replace(",", ""))
-                print(f">>> GRAND TOTAL FLEX: ₹{amount} from line: {line}")
+                logger.debug("grand total %s from line %r", amount, line)
                 break
             # If not found on the same line, check the next line (common in receipts)
             if i + 1 < len(lines):
@@ -105,7 +120,7 @@ def _extract_receipt_data(text: str) -> Dict[str, Any]:
                 matches = re.findall(r'(\d{1,3}[.,]\d{2})', clean_next)
                 if matches:
                     amount = float(matches[-1].replace(",", ""))
-                    print(f">>> GRAND TOTAL FLEX (next line): ₹{amount} from line: {lines[i+1]}")
+                    logger.debug("grand total %s from next line %r", amount, lines[i + 1])
                     break
     # Fallback: If not found, look for TOTAL (but not GST or other lines)
     if not amount and not grand_total_found:
@@ -121,7 +136,7 @@ def _extract_receipt_data(text: str) -> Dict[str, Any]:
                 matches = re.findall(r'(\d{1,5}[.,]\d{2})', clean_line)
                 if matches:
                     amount = float(matches[-1].replace(",", ""))  # Always pick the last match
-                    print(f">>> TOTAL FLEX (last match): ₹{amount} from line: {line}")
+                    logger.debug("total %s from line %r", amount, line)
                     break
 
     # Strict date extraction: Try multiple formats
@@ -171,25 +186,37 @@ def _extract_receipt_data(text: str) -> Dict[str, Any]:
     }
 
 
-def _guess_category(text: str) -> str:
-    """Guess transaction category based on receipt content."""
-    text_lower = text.lower()
-    category_keywords = {
-        "groceries": ["grocery", "supermarket", "whole foods", "kroger", "safeway", "produce", "dairy", "meat", "noodles", "sugar", "salt", "soap", "bazaar"],
-        "shopping": ["mall", "retail", "shop", "store", "amazon", "ebay", "clothes", "apparel", "bazaar", "plaza"],
-        "dining": ["restaurant", "cafe", "coffee", "pizza", "burger", "bistro", "bar"],
-        "transportation": ["fuel", "gas", "petrol", "uber", "lyft", "taxi", "parking", "toll"],
-        "entertainment": ["movie", "cinema", "theater", "concert", "game", "spotify", "netflix"],
-        "utilities": ["electric", "water", "internet", "phone", "gas bill", "utility"],
-        "health": ["pharmacy", "doctor", "hospital", "medical", "clinic", "health"],
-    }
-    for category, keywords in category_keywords.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                return category
+def _load_category_history(user_id: str) -> List[tuple]:
+    """Return (description, category, count) rows used to train the categorizer."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT description, category, COUNT(*)
+                FROM transactions
+                WHERE user_id = %s
+                    AND description IS NOT NULL
+                    AND category IS NOT NULL AND category != ''
+                GROUP BY description, category;
+                """,
+                (user_id,),
+            )
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def _guess_receipt_category(vendor: Optional[str], text: str, user_id: Optional[str] = None) -> Optional[str]:
+    """Guess a receipt's category from the user's history, then keyword rules; vendor line first."""
+    return category_engine.guess_receipt(vendor, text, user_id, _load_category_history)
 
-def _check_budget_warning(user_id: str, category: str, new_amount: float, txn_date: date) -> dict:
-    """Check if adding this transaction would exceed budget threshold or limit."""
+
+def _check_budget_warning(user_id: str, category: str, new_amount: int, txn_date: date) -> dict:
+    """Check if adding this transaction would exceed budget threshold or limit.
+
+    ``new_amount`` is in paise; the returned amounts are in rupees.
+    """
     if not category:
         return {}
 
@@ -244,25 +271,25 @@ def _check_budget_warning(user_id: str, category: str, new_amount: float, txn_da
                     (user_id, category, start_date, end_date),
                 )
 
-            current_spent = float(cur.fetchone()[0])
+            current_spent = int(cur.fetchone()[0])
             new_total = current_spent + new_amount
-            percentage = (new_total / float(budget_amount)) * 100
+            percentage = (new_total / budget_amount) * 100
 
             warning_data = {
                 "budget_id": budget_id,
-                "budget_amount": float(budget_amount),
-                "current_spent": current_spent,
-                "new_total": new_total,
+                "budget_amount": from_minor(budget_amount),
+                "current_spent": from_minor(current_spent),
+                "new_total": from_minor(new_total),
                 "percentage": round(percentage, 1),
                 "alert_threshold": alert_threshold,
             }
 
             if percentage >= 100:
                 warning_data["warning"] = "budget_exceeded"
-                warning_data["message"] = f"⚠️ Budget exceeded! You've spent ₹{new_total:.2f} of ₹{budget_amount:.2f} ({percentage:.1f}%)"
+                warning_data["message"] = f"⚠️ Budget exceeded! You've spent ₹{from_minor(new_total):.2f} of ₹{from_minor(budget_amount):.2f} ({percentage:.1f}%)"
             elif percentage >= alert_threshold:
                 warning_data["warning"] = "threshold_exceeded"
-                warning_data["message"] = f"⚠️ Alert: You've reached {percentage:.1f}% of your {category} budget (₹{new_total:.2f}/₹{budget_amount:.2f})"
+                warning_data["message"] = f"⚠️ Alert: You've reached {percentage:.1f}% of your {category} budget (₹{from_minor(new_total):.2f}/₹{from_minor(budget_amount):.2f})"
 
             return warning_data
     finally:
@@ -274,7 +301,7 @@ def _row_to_transaction(row):
     return {
         "id": row[0],
         "user_id": row[1],
-        "amount": row[2],
+        "amount": from_minor(row[2]),
         "txn_type": row[3],
         "category": row[4],
         "description": row[5],
@@ -303,21 +330,30 @@ def update_transaction(
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
+            cur.execute(
+                "SELECT amount, txn_type, category_id FROM transactions WHERE id = %s AND user_id = %s FOR UPDATE;",
+                (txn_id, user_id),
+            )
+            old = cur.fetchone()
+            if not old:
+                raise HTTPException(status_code=404, detail="Transaction not found")
             cur.execute(
                 """
                 UPDATE transactions
                 SET amount = %s,
                     category = %s,
+                    category_id = %s,
                     description = %s,
                     payment_mode = %s,
                     txn_date = %s,
                     updated_at = NOW()
                 WHERE id = %s AND user_id = %s
-                RETURNING id, user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at;
+                RETURNING id, user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at, category_id;
                 """,
                 (
-                    payload.get("amount"),
+                    to_minor_or_none(payload.get("amount")),
                     payload.get("category"),
+                    category_directory.resolve(cur, payload.get("category")),
                     payload.get("description"),
                     payload.get("payment_mode"),
                     payload.get("txn_date"),
@@ -328,7 +364,13 @@ def update_transaction(
             row = cur.fetchone()
             if not row:
                 raise HTTPException(status_code=404, detail="Transaction not found")
+            old_entry = (old[2], old[0]) if old[1] == "expense" else None
+            new_entry = (row[13], row[2]) if row[3] == "expense" else None
+            if old_entry != new_entry:
+                apply_stat_changes(cur, user_id, removed=[old_entry] if old_entry else [], added=[new_entry] if new_entry else [])
             conn.commit()
+            data_changed(user_id, "transactions")
+            category_engine.invalidate(user_id)
             return _row_to_transaction(row)
     except Exception as exc:
         conn.rollback()
@@ -349,24 +391,27 @@ def create_transaction(payload: TransactionCreate, user_id: str = Depends(get_cu
     budget_warning = {}
     if payload.txn_type == "expense" and payload.category:
         # Use the authenticated user_id from the dependency, not the payload
-        budget_warning = _check_budget_warning(user_id, payload.category, payload.amount, txn_dt)
+        budget_warning = _check_budget_warning(user_id, payload.category, payload.amount_minor, txn_dt)
 
+    spending_stats = None
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
+            category_id = category_directory.resolve(cur, payload.category)
             cur.execute(
                 """
                 INSERT INTO transactions (
-                    user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at
+                    user_id, amount, txn_type, category, category_id, description, payment_mode, txn_date, month, year, source, created_at, updated_at
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
                 RETURNING id, user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at;
                 """,
                 (
                     user_id,
-                    payload.amount,
+                    payload.amount_minor,
                     payload.txn_type,
                     payload.category,
+                    category_id,
                     payload.description,
                     payload.payment_mode,
                     txn_dt,
@@ -376,13 +421,22 @@ def create_transaction(payload: TransactionCreate, user_id: str = Depends(get_cu
                 )
             )
             row = cur.fetchone()
+            if payload.txn_type == "expense":
+                stats = apply_stat_changes(cur, user_id, added=[(category_id, payload.amount_minor)])
+                spending_stats = describe_amount(*stats[category_id], payload.amount_minor)
         conn.commit()
+        data_changed(user_id, "transactions")
+        if payload.category:
+            category_engine.invalidate(user_id)
 
         result = _row_to_transaction(row)
 
         # Add budget warning to response if present
         if budget_warning:
             result["budget_warning"] = budget_warning
+        # Running stats for the category, and whether this amount is unusual for it
+        if spending_stats:
+            result["spending_stats"] = spending_stats
 
         return result
     except Exception as exc:  # pragma: no cover - runtime guard
@@ -450,6 +504,7 @@ def transaction_summary(
     month: int | None = None,
     year: int | None = None,
     user_id: str = Depends(get_current_user_id),
+    etag: str = Depends(etag_guard("transactions")),
 ):
     conn = get_db_connection()
     try:
@@ -482,10 +537,10 @@ def transaction_summary(
 
                 return {
                     "user_id": user_id,
-                    "total_expense": float(totals_row[0]) if totals_row else 0.0,
-                    "total_income": float(totals_row[1]) if totals_row else 0.0,
+                    "total_expense": from_minor(totals_row[0]) if totals_row else 0.0,
+                    "total_income": from_minor(totals_row[1]) if totals_row else 0.0,
                     "expenses_by_category": {
-                        row[0] or "uncategorized": float(row[1]) for row in category_rows
+                        row[0] or "uncategorized": from_minor(row[1]) for row in category_rows
                     },
                 }
             else:
@@ -522,10 +577,10 @@ def transaction_summary(
                     "user_id": user_id,
                     "month": month,
                     "year": year,
-                    "total_expense": float(totals_row[0]) if totals_row else 0.0,
-                    "total_income": float(totals_row[1]) if totals_row else 0.0,
+                    "total_expense": from_minor(totals_row[0]) if totals_row else 0.0,
+                    "total_income": from_minor(totals_row[1]) if totals_row else 0.0,
                     "expenses_by_category": {
-                        row[0] or "uncategorized": float(row[1]) for row in category_rows
+                        row[0] or "uncategorized": from_minor(row[1]) for row in category_rows
                     },
                 }
     except Exception as exc:  # pragma: no cover - runtime guard
@@ -568,14 +623,18 @@ def delete_transaction(txn_id: int, user_id: str = Depends(get_current_user_id))
                 """
                 DELETE FROM transactions
                 WHERE id = %s AND user_id = %s
-                RETURNING id;
+                RETURNING id, amount, txn_type, category_id;
                 """,
                 (txn_id, user_id),
             )
             row = cur.fetchone()
             if not row:
                 raise HTTPException(status_code=404, detail="Transaction not found")
+            if row[2] == "expense":
+                apply_stat_changes(cur, user_id, removed=[(row[3], row[1])])
             conn.commit()
+            data_changed(user_id, "transactions")
+            category_engine.invalidate(user_id)
             return {"status": "deleted", "id": row[0]}
     except Exception as exc:  # pragma: no cover - runtime guard
         conn.rollback()
@@ -583,6 +642,78 @@ def delete_transaction(txn_id: int, user_id: str = Depends(get_current_user_id))
     finally:
         conn.close()
 
+
+@router.post("/recategorize")
+def recategorize_transactions(
+    only_uncategorized: bool = Query(True, description="Skip rows that already have a category"),
+    dry_run: bool = Query(False, description="Return proposed changes without saving them"),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Re-run the categorization engine over the user's historical transactions."""
+    where_sql = "user_id = %s AND txn_type = 'expense'"
+    if only_uncategorized:
+        where_sql += " AND (category IS NULL OR category = '')"
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT id, description, category, category_id, amount
+                FROM transactions
+                WHERE {where_sql}
+                ORDER BY txn_date, id;
+                """,
+                (user_id,),
+            )
+            rows = cur.fetchall()
+
+            guesses = category_engine.categorize_many(
+                (row[1] for row in rows), user_id, _load_category_history
+            )
+            changes = [
+                {"id": row[0], "description": row[1], "old_category": row[2], "new_category": guess}
+                for row, guess in zip(rows, guesses)
+                if guess and guess != row[2]
+            ]
+
+            if changes and not dry_run:
+                category_ids = category_directory.resolve_many(cur, (change["new_category"] for change in changes))
+                cur.executemany(
+                    "UPDATE transactions SET category = %s, category_id = %s, updated_at = NOW() WHERE id = %s AND user_id = %s;",
+                    [
+                        (change["new_category"], category_ids[change["new_category"]], change["id"], user_id)
+                        for change in changes
+                    ],
+                )
+                # Recategorize only scans expenses, so every moved amount is in the stats.
+                moved = [
+                    (row[3], category_ids[guess], row[4])
+                    for row, guess in zip(rows, guesses)
+                    if guess and guess != row[2] and category_ids[guess] != row[3]
+                ]
+                apply_stat_changes(
+                    cur,
+                    user_id,
+                    removed=[(old_id, amount) for old_id, _, amount in moved],
+                    added=[(new_id, amount) for _, new_id, amount in moved],
+                )
+                conn.commit()
+                data_changed(user_id, "transactions")
+                category_engine.invalidate(user_id)
+
+        return {
+            "scanned": len(rows),
+            "updated": 0 if dry_run else len(changes),
+            "dry_run": dry_run,
+            "changes": changes,
+        }
+    except Exception as exc:  # pragma: no cover - runtime guard
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to recategorize transactions: {exc}") from exc
+    finally:
+        conn.close()
+
 @router.post("/scan-and-create")
 async def scan_receipt_and_create(file: UploadFile = File(...), user_id: str = Depends(get_current_user_id)):
     """
@@ -590,55 +721,76 @@ async def scan_receipt_and_create(file: UploadFile = File(...), user_id: str = D
     This is the new simplified flow - no need to fill in forms.
     """
     print(f"\n>>> OCR: SCAN-AND-CREATE endpoint called - File: {file.filename}, User: {user_id}")
+    trace = ScanTrace("scan-and-create", user_id)
     try:
         # Validate file type
         allowed_types = {"image/jpeg", "image/png", "image/jpg", "application/pdf"}
         if file.content_type not in allowed_types:
+            trace.fail("invalid_type")
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid file type. Allowed: JPEG, PNG, PDF. Got: {file.content_type}"
             )
         
         # Read file
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
+        with trace.stage("upload"):
+            contents = await file.read()
+        trace.upload_bytes = len(contents)
+        trace.upload = contents
+        try:
+            with trace.stage("decode"):
+                image = Image.open(io.BytesIO(contents))
+                image.load()
+        except Exception:
+            trace.fail("decode_error")
+            raise
         
         # Preprocess image
-        if image.mode != 'L':
-            image = image.convert('L')
-        
         from PIL import ImageFilter, ImageEnhance, ImageOps
         
-        if image.width < 300 or image.height < 300:
-            scale_factor = max(300 / image.width, 300 / image.height)
-            new_size = (int(image.width * scale_factor), int(image.height * scale_factor))
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
+        with trace.stage("grayscale"):
+            if image.mode != 'L':
+                image = image.convert('L')
         
-        image = image.filter(ImageFilter.GaussianBlur(radius=0.3))
-        enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(3.5)
-        enhancer = ImageEnhance.Brightness(image)
-        image = enhancer.enhance(1.2)
-        enhancer = ImageEnhance.Sharpness(image)
-        image = enhancer.enhance(2.5)
+        with trace.stage("resize"):
+            if image.width < 300 or image.height < 300:
+                scale_factor = max(300 / image.width, 300 / image.height)
+                new_size = (int(image.width * scale_factor), int(image.height * scale_factor))
+                image = image.resize(new_size, Image.Resampling.LANCZOS)
+        
+        with trace.stage("blur"):
+            image = image.filter(ImageFilter.GaussianBlur(radius=0.3))
+        with trace.stage("enhance"):
+            enhancer = ImageEnhance.Contrast(image)
+            image = enhancer.enhance(3.5)
+            enhancer = ImageEnhance.Brightness(image)
+            image = enhancer.enhance(1.2)
+            enhancer = ImageEnhance.Sharpness(image)
+            image = enhancer.enhance(2.5)
         
         # Run OCR
         try:
-            extracted_text = pytesseract.image_to_string(image)
+            with trace.stage("ocr"):
+                extracted_text = pytesseract.image_to_string(image)
         except Exception as e:
+            trace.fail("ocr_error")
             raise HTTPException(
                 status_code=500,
                 detail=f"OCR processing failed. Ensure Tesseract is installed: {str(e)}"
             )
+        trace.extracted_text = extracted_text
         
         if not extracted_text or not extracted_text.strip():
+            trace.fail("empty_text")
             raise HTTPException(
                 status_code=400,
                 detail="Could not extract any text from image. Please ensure receipt is clear and readable."
             )
         
         # Parse extracted text
-        receipt_data = _extract_receipt_data(extracted_text)
+        with trace.stage("parse"):
+            receipt_data = _extract_receipt_data(extracted_text)
+        trace.field_confidence = receipt_field_confidence(receipt_data)
         print(f">>> OCR: Extracted - Vendor: {receipt_data['vendor']}, Amount: {receipt_data['amount']}, Date: {receipt_data['date']}")
         
         # Create transaction directly with source='ocr'
@@ -655,6 +807,7 @@ async def scan_receipt_and_create(file: UploadFile = File(...), user_id: str = D
                             # Try dd-mm-yyyy
                             txn_date = datetime.strptime(receipt_data["date"], "%d-%m-%Y").date()
                         except ValueError:
+                            trace.fail("bad_date")
                             raise HTTPException(
                                 status_code=400,
                                 detail=f"Invalid date format in receipt: '{receipt_data['date']}'. Please use dd/mm/yyyy or dd-mm-yyyy."
@@ -664,31 +817,38 @@ async def scan_receipt_and_create(file: UploadFile = File(...), user_id: str = D
                 month = txn_date.month
                 year = txn_date.year
                 
-                cur.execute(
-                    """
-                    INSERT INTO transactions (
-                        user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
-                    RETURNING id, user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at;
-                    """,
-                    (
-                        user_id,
-                        receipt_data["amount"],
-                        "expense",
-                        receipt_data["category"],
-                        receipt_data["vendor"],
-                        "card",
-                        txn_date,
-                        month,
-                        year,
-                        "ocr"
+                with trace.stage("db_insert"):
+                    amount_minor = to_minor(receipt_data["amount"])
+                    category_id = category_directory.resolve(cur, receipt_data["category"])
+                    cur.execute(
+                        """
+                        INSERT INTO transactions (
+                            user_id, amount, txn_type, category, category_id, description, payment_mode, txn_date, month, year, source, created_at, updated_at
+                        )
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                        RETURNING id, user_id, amount, txn_type, category, description, payment_mode, txn_date, month, year, source, created_at, updated_at;
+                        """,
+                        (
+                            user_id,
+                            amount_minor,
+                            "expense",
+                            receipt_data["category"],
+                            category_id,
+                            receipt_data["vendor"],
+                            "card",
+                            txn_date,
+                            month,
+                            year,
+                            "ocr"
+                        )
                     )
-                )
-                row = cur.fetchone()
-            conn.commit()
+                    row = cur.fetchone()
+                    stats = apply_stat_changes(cur, user_id, added=[(category_id, amount_minor)])
+                    conn.commit()
+                    data_changed(user_id, "transactions")
             
             result = _row_to_transaction(row)
+            result["spending_stats"] = describe_amount(*stats[category_id], amount_minor)
             print(f">>> OCR: Transaction created with ID={result['id']}, source='{result['source']}'")
             
             return {
@@ -696,14 +856,23 @@ async def scan_receipt_and_create(file: UploadFile = File(...), user_id: str = D
                 "transaction": result,
                 "message": f"Receipt scanned and transaction created: ₹{receipt_data['amount']} from {receipt_data['vendor']}"
             }
+        except HTTPException:
+            raise
+        except Exception:
+            trace.fail("db_error")
+            raise
         finally:
             conn.close()
     
     except HTTPException:
         raise
     except Exception as exc:
+        trace.fail("error")
         print(f">>> OCR: Error in scan-and-create: {str(exc)}")
         raise HTTPException(status_code=500, detail=f"Failed to process receipt: {str(exc)}") from exc
+    finally:
+        trace.finish()
+        ocr_metrics.record(trace)
 
 
 @router.post("/scan-receipt")
@@ -713,10 +882,12 @@ async def scan_receipt(file: UploadFile = File(...), user_id: str = Depends(get_
     Extracts vendor name, amount, date, and guesses category.
     """
     print(f"\n>>> SCAN RECEIPT CALLED - File: {file.filename}, User: {user_id}")
+    trace = ScanTrace("scan-receipt", user_id)
     try:
         # Validate file type
         allowed_types = {"image/jpeg", "image/png", "image/jpg", "application/pdf"}
         if file.content_type not in allowed_types:
+            trace.fail("invalid_type")
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid file type. Allowed: JPEG, PNG, PDF. Got: {file.content_type}"
@@ -725,84 +896,101 @@ async def scan_receipt(file: UploadFile = File(...), user_id: str = Depends(get_
         print(f"File type OK: {file.content_type}")
         
         # Read file
-        contents = await file.read()
+        with trace.stage("upload"):
+            contents = await file.read()
+        trace.upload_bytes = len(contents)
+        trace.upload = contents
         print(f"File size: {len(contents)} bytes")
         
-        image = Image.open(io.BytesIO(contents))
+        try:
+            with trace.stage("decode"):
+                image = Image.open(io.BytesIO(contents))
+                image.load()
+        except Exception:
+            trace.fail("decode_error")
+            raise
         print(f"Image size: {image.size}, Format: {image.format}")
         
         # Preprocess image for better OCR accuracy
         # Convert to grayscale
-        if image.mode != 'L':
-            image = image.convert('L')
+        with trace.stage("grayscale"):
+            if image.mode != 'L':
+                image = image.convert('L')
         
         # Apply additional preprocessing for better handwriting recognition
         from PIL import ImageFilter, ImageEnhance, ImageOps
         
         # Resize if image is very small (improves OCR accuracy)
-        if image.width < 300 or image.height < 300:
-            scale_factor = max(300 / image.width, 300 / image.height)
-            new_size = (int(image.width * scale_factor), int(image.height * scale_factor))
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
-            print(f"Image resized to {new_size}")
+        with trace.stage("resize"):
+            if image.width < 300 or image.height < 300:
+                scale_factor = max(300 / image.width, 300 / image.height)
+                new_size = (int(image.width * scale_factor), int(image.height * scale_factor))
+                image = image.resize(new_size, Image.Resampling.LANCZOS)
+                print(f"Image resized to {new_size}")
         
         # Apply slight blur to reduce noise FIRST (before contrast)
-        image = image.filter(ImageFilter.GaussianBlur(radius=0.3))
+        with trace.stage("blur"):
+            image = image.filter(ImageFilter.GaussianBlur(radius=0.3))
         
-        # Increase contrast - critical for handwritten text visibility
-        enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(3.5)  # Increased to 3.5x for better handwriting clarity
-        
-        # Enhance brightness for faded/light ink
-        enhancer = ImageEnhance.Brightness(image)
-        image = enhancer.enhance(1.2)  # Increased to 1.2 for better visibility
-        
-        # Enhance sharpness for crisp text edges (after contrast/brightness)
-        enhancer = ImageEnhance.Sharpness(image)
-        image = enhancer.enhance(2.5)  # Slightly reduced to prevent over-sharpening
+        with trace.stage("enhance"):
+            # Increase contrast - critical for handwritten text visibility
+            enhancer = ImageEnhance.Contrast(image)
+            image = enhancer.enhance(3.5)  # Increased to 3.5x for better handwriting clarity
+            
+            # Enhance brightness for faded/light ink
+            enhancer = ImageEnhance.Brightness(image)
+            image = enhancer.enhance(1.2)  # Increased to 1.2 for better visibility
+            
+            # Enhance sharpness for crisp text edges (after contrast/brightness)
+            enhancer = ImageEnhance.Sharpness(image)
+            image = enhancer.enhance(2.5)  # Slightly reduced to prevent over-sharpening
         
         # Apply a small median filter to clean up noise while preserving edges
-        image = image.filter(ImageFilter.MedianFilter(size=3))
+        with trace.stage("median"):
+            image = image.filter(ImageFilter.MedianFilter(size=3))
         
         # Optional: Apply adaptive histogram equalization-like effect
         # by normalizing the image distribution
-        img_array = numpy.array(image)
-        p2, p98 = numpy.percentile(img_array, (2, 98))
-        img_array = numpy.clip((img_array - p2) / (p98 - p2) * 255, 0, 255).astype(numpy.uint8)
-        image = Image.fromarray(img_array)
+        with trace.stage("normalize"):
+            img_array = numpy.array(image)
+            p2, p98 = numpy.percentile(img_array, (2, 98))
+            img_array = numpy.clip((img_array - p2) / (p98 - p2) * 255, 0, 255).astype(numpy.uint8)
+            image = Image.fromarray(img_array)
         print(f"Applied adaptive normalization for better contrast")
         
         # Extract text using Tesseract OCR with optimized settings
         try:
             # Use PSM (Page Segmentation Mode) 6 for mixed text blocks
             # Use OEM (OCR Engine Mode) 3 for legacy + LSTM (better for handwriting)
-            extracted_text = pytesseract.image_to_string(
-                image,
-                config='--psm 6 --oem 3'
-            )
-            print(f"OCR completed")
-            print(f">>> RAW OCR TEXT:\n{extracted_text}\n>>> END RAW TEXT")
+            with trace.stage("ocr"):
+                extracted_text = pytesseract.image_to_string(
+                    image,
+                    config='--psm 6 --oem 3'
+                )
+            logger.debug("raw OCR text:\n%s", extracted_text)
         except Exception as e:
+            trace.fail("ocr_error")
             print(f"OCR ERROR: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail=f"OCR processing failed. Ensure Tesseract is installed: {str(e)}"
             )
+        trace.extracted_text = extracted_text
         
         if not extracted_text or not extracted_text.strip():
+            trace.fail("empty_text")
             raise HTTPException(
                 status_code=400,
                 detail="Could not extract any text from image. Please ensure receipt is clear and readable."
             )
         
         # Parse extracted text to get structured data
-        receipt_data = _extract_receipt_data(extracted_text)
+        with trace.stage("parse"):
+            receipt_data = _extract_receipt_data(extracted_text)
+            suggested_category = _guess_receipt_category(receipt_data["vendor"], extracted_text, user_id)
+        trace.field_confidence = receipt_field_confidence(receipt_data)
         
-        # DEBUG: Log what was extracted
-        print(f"\n=== OCR DEBUG ===")
-        print(f"Extracted Text:\n{extracted_text}")
-        print(f"\nParsed Data: {receipt_data}")
-        print(f"=== END DEBUG ===\n")
+        logger.debug("parsed receipt: %s", receipt_data)
         
         return {
             "success": True,
@@ -811,11 +999,18 @@ async def scan_receipt(file: UploadFile = File(...), user_id: str = Depends(get_
                 "vendor": receipt_data["vendor"],
                 "amount": receipt_data["amount"],
                 "date": receipt_data["date"],
-                "category": receipt_data["category"]
-            }
+                "category": receipt_data["category"],
+                # Suggestion only; the user still picks the final category
+                "suggested_category": suggested_category,
+            },
+            "confidence": trace.field_confidence,
         }
     
     except HTTPException:
         raise
     except Exception as exc:  # pragma: no cover - runtime guard
-        raise HTTPException(status_code=500, detail=f"Failed to process receipt: {str(exc)}") from exc
\ No newline at end of file
+        trace.fail("error")
+        raise HTTPException(status_code=500, detail=f"Failed to process receipt: {str(exc)}") from exc
+    finally:
+        trace.finish()
+        ocr_metrics.record(trace)